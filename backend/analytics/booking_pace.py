@@ -0,0 +1,248 @@
+"""
+Booking pace and pickup.
+Cell (D, L) of the pace matrix counts room-nights for night D on the books
+L days before D: bookings made on or before that day and not yet cancelled.
+The matrix is built from one streaming query with vectorized numpy and
+cached; refreshes re-read only bookings changed since the last one (with
+an overlap, as updated_at is set before the change commits).
+Bookings carry no cancellation time, so a cancelled booking leaves the books
+on the date of its last update (the cancellation).
+"""
+
+from database.db_manager import get_db_session
+from database.models import Booking
+from sqlalchemy import func, select
+from datetime import date, datetime, timedelta
+import threading
+import time
+import numpy as np
+import pandas as pd
+import config
+
+
+class BookingPace:
+    """Cached stay date x lead time on-the-books matrix."""
+    
+    NEVER = 2 ** 40  # cancellation day of bookings still on the books
+    
+    def __init__(self, max_lead=None):
+        self.max_lead = config.PACE_MAX_LEAD_DAYS if max_lead is None else max_lead
+        self._lock = threading.Lock()
+        self._diff = None  # per night, +1/-1 where a booking's lead range starts/ends
+        self._first = 0  # day number of the first night row
+        self._matrix = None  # cumulative sum of _diff, rebuilt after changes
+        # Per booking, sorted by id: day numbers made, cancelled, check-in, check-out
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._days = np.zeros((0, 4), dtype=np.int64)
+        self._watermark = None  # latest updated_at read
+        self._checked_at = None
+    
+    @staticmethod
+    def _day_numbers(values):
+        """Days since 1970-01-01 for datetimes or dates."""
+        return np.array(values, dtype='datetime64[s]').astype('datetime64[D]').astype(np.int64)
+    
+    @staticmethod
+    def _query():
+        return select(
+            Booking.booking_id,
+            func.coalesce(Booking.created_at, Booking.check_in_date),
+            func.coalesce(Booking.updated_at, Booking.created_at, Booking.check_in_date),
+            Booking.booking_status,
+            Booking.check_in_date,
+            Booking.check_out_date
+        ).execution_options(yield_per=config.PACE_FETCH_CHUNK_SIZE)
+    
+    def _read_chunk(self, rows):
+        """Booking ids, a (made, cancelled, check-in, check-out) day array, and the latest update."""
+        ids, created, updated, statuses, check_ins, check_outs = zip(*rows)
+        days = np.empty((len(rows), 4), dtype=np.int64)
+        days[:, 0] = self._day_numbers(created)
+        days[:, 1] = np.where(np.array(statuses) == 'cancelled', self._day_numbers(updated), self.NEVER)
+        days[:, 2] = self._day_numbers(check_ins)
+        days[:, 3] = self._day_numbers(check_outs)
+        return np.array(ids, dtype=np.int64), days, max(updated)
+    
+    def _apply(self, days, sign):
+        """Add (sign 1) or remove (sign -1) bookings' room-nights from the matrix."""
+        made, cancelled, check_in, check_out = days.T
+        stay_nights = np.maximum(check_out - check_in, 0)
+        total = int(stay_nights.sum())
+        if total == 0:
+            return
+        
+        # One entry per booked night
+        night = np.repeat(check_in, stay_nights) + (
+            np.arange(total) - np.repeat(np.cumsum(stay_nights) - stay_nights, stay_nights)
+        )
+        # On the books for leads lo..hi: made on or before D - L, cancelled after it
+        lo = np.maximum(night - np.repeat(cancelled, stay_nights) + 1, 0)
+        hi = np.minimum(night - np.repeat(made, stay_nights), self.max_lead)
+        held = lo <= hi
+        night, lo, hi = night[held], lo[held], hi[held]
+        if len(night) == 0:
+            return
+        
+        self._ensure_nights(int(night.min()), int(night.max()))
+        width = self._diff.shape[1]
+        rows = night - self._first
+        size = self._diff.size
+        change = np.bincount(rows * width + lo, minlength=size) - np.bincount(rows * width + hi + 1, minlength=size)
+        self._diff += (sign * change).reshape(self._diff.shape).astype(self._diff.dtype)
+        self._matrix = None
+    
+    def _ensure_nights(self, first, last):
+        """Grow the matrix to cover nights first..last (day numbers)."""
+        if self._diff is None or self._diff.shape[0] == 0:
+            self._first = first
+            self._diff = np.zeros((last - first + 1, self.max_lead + 2), dtype=np.int32)
+            return
+        before = max(self._first - first, 0)
+        after = max(last - (self._first + self._diff.shape[0] - 1), 0)
+        if before or after:
+            self._diff = np.pad(self._diff, ((before, after), (0, 0)))
+            self._first -= before
+    
+    def _build(self, session):
+        """Full build from one streaming query."""
+        self._diff = None
+        self._matrix = None
+        self._watermark = None
+        ids, days = [], []
+        for rows in session.execute(self._query()).partitions():
+            chunk_ids, chunk_days, latest = self._read_chunk(rows)
+            self._apply(chunk_days, 1)
+            ids.append(chunk_ids)
+            days.append(chunk_days)
+            self._watermark = latest if self._watermark is None else max(self._watermark, latest)
+        
+        self._ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+        self._days = np.concatenate(days) if days else np.zeros((0, 4), dtype=np.int64)
+        order = np.argsort(self._ids)
+        self._ids, self._days = self._ids[order], self._days[order]
+        if self._diff is None:
+            self._diff = np.zeros((0, self.max_lead + 2), dtype=np.int32)
+    
+    def _update(self, session):
+        """
+        Re-read bookings updated since the last read: remove their old
+        room-nights and add the new ones. Falls back to a full build when
+        bookings were deleted.
+        """
+        # updated_at is set before commit: a change committed after the last
+        # read can carry an older timestamp. Re-reading a booking is harmless.
+        since = self._watermark - timedelta(seconds=config.PACE_REREAD_SECONDS)
+        stmt = self._query().where(Booking.updated_at >= since)
+        for rows in session.execute(stmt).partitions():
+            chunk_ids, chunk_days, latest = self._read_chunk(rows)
+            self._watermark = max(self._watermark, latest)
+            
+            pos = np.searchsorted(self._ids, chunk_ids)
+            known = pos < len(self._ids)
+            known[known] = self._ids[pos[known]] == chunk_ids[known]
+            self._apply(self._days[pos[known]], -1)
+            self._days[pos[known]] = chunk_days[known]
+            self._apply(chunk_days, 1)
+            
+            if not known.all():
+                self._ids = np.concatenate([self._ids, chunk_ids[~known]])
+                self._days = np.concatenate([self._days, chunk_days[~known]])
+                order = np.argsort(self._ids)
+                self._ids, self._days = self._ids[order], self._days[order]
+        
+        if session.query(func.count(Booking.booking_id)).scalar() != len(self._ids):
+            self._build(session)
+    
+    def refresh(self, full=False):
+        """Bring the matrix up to date now (a full rebuild if full)."""
+        with self._lock:
+            with get_db_session() as session:
+                if full or self._watermark is None:
+                    self._build(session)
+                else:
+                    self._update(session)
+            self._checked_at = time.monotonic()
+    
+    def invalidate(self):
+        """Rebuild from scratch on the next read."""
+        with self._lock:
+            self._watermark = None
+    
+    def _current(self):
+        """Refresh if stale; return (cumulative matrix, first night day number)."""
+        stale = (
+            self._watermark is None or self._checked_at is None
+            or time.monotonic() - self._checked_at >= config.PACE_REFRESH_SECONDS
+        )
+        if stale:
+            self.refresh()
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.cumsum(self._diff, axis=1)[:, :self.max_lead + 1]
+            return self._matrix, self._first
+    
+    def get_matrix(self, start, end, max_lead=None):
+        """
+        Room-nights on the books for nights [start, end) by lead time.
+        Returns a DataFrame indexed by night with one column per lead
+        (0..max_lead days before the night); cells whose as-of date is still
+        in the future are NaN.
+        """
+        max_lead = self.max_lead if max_lead is None else min(max_lead, self.max_lead)
+        start = start.date() if isinstance(start, datetime) else start
+        end = end.date() if isinstance(end, datetime) else end
+        num_nights = max((end - start).days, 1)
+        nights = [start + timedelta(days=i) for i in range(num_nights)]
+        try:
+            matrix, first = self._current()
+            night_days = self._day_numbers([start])[0] + np.arange(num_nights)
+            wanted = night_days - first
+            inside = (wanted >= 0) & (wanted < matrix.shape[0])
+            values = np.zeros((num_nights, max_lead + 1))
+            values[inside] = matrix[wanted[inside], :max_lead + 1]
+            
+            # As-of date D - L after today is not known yet
+            days_ahead = night_days - self._day_numbers([date.today()])[0]
+            values[np.arange(max_lead + 1)[None, :] < days_ahead[:, None]] = np.nan
+            return pd.DataFrame(values, index=pd.Index(nights, name='night'),
+                                columns=pd.Index(range(max_lead + 1), name='lead_days'))
+        except Exception as e:
+            print(f"Error building pace matrix: {e}")
+            return pd.DataFrame()
+    
+    def get_pickup_curve(self, start, end, max_lead=None):
+        """
+        Total room-nights on the books for nights [start, end) by days before
+        arrival. Leads not yet reached for every night are NaN.
+        Returns a Series indexed by lead days.
+        """
+        matrix = self.get_matrix(start, end, max_lead)
+        if matrix.empty:
+            return pd.Series(dtype=float)
+        return matrix.sum(axis=0, min_count=len(matrix))
+    
+    def get_pickup(self, start, end, days=7):
+        """
+        Room-nights picked up over the last `days` days for nights [start, end).
+        Returns a DataFrame indexed by night with 'on_books' (today, or final
+        for past nights), 'on_books_before' (`days` days ago) and 'pickup'.
+        """
+        matrix = self.get_matrix(start, end)
+        if matrix.empty:
+            return pd.DataFrame(columns=['on_books', 'on_books_before', 'pickup'])
+        
+        today = date.today()
+        rows = []
+        for night, counts in matrix.iterrows():
+            ahead = (night - today).days
+            now = counts.iloc[min(max(ahead, 0), self.max_lead)] if ahead <= self.max_lead else np.nan
+            lead_before = max(ahead + days, 0)
+            before = counts.iloc[lead_before] if lead_before <= self.max_lead else np.nan
+            rows.append((now, before))
+        pickup = pd.DataFrame(rows, index=matrix.index, columns=['on_books', 'on_books_before'])
+        pickup['pickup'] = pickup['on_books'] - pickup['on_books_before']
+        return pickup
+
+
+# Process-wide pace matrix shared by all Streamlit sessions
+booking_pace = BookingPace()
@@ -0,0 +1,156 @@
+"""
+Demand forecasting.
+Per-room-type forecasts of rooms sold, occupancy and revenue for the coming
+nights. A seasonal baseline (recent demand level x day-of-week x month
+factors fitted on the booking history) is combined with what is already on
+the books: the part of the baseline that usually books after the current
+lead time is added to the rooms already sold. Forecasts are cached for the day.
+"""
+
+from database.db_manager import get_db_session
+from backend.analytics.occupancy_analytics import OccupancyAnalytics
+from backend.analytics.booking_pace import booking_pace
+from backend.room.room_type_inventory import RoomTypeInventory
+from backend.room.room_catalog import room_catalog
+from datetime import date, timedelta
+import threading
+import numpy as np
+import config
+
+
+class DemandForecast:
+    """Seasonal baseline plus pickup forecasts by room type."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day = None
+        self._forecast = None
+    
+    @staticmethod
+    def _weekday(days):
+        """Weekday (Monday 0) of datetime64[D] values; 1970-01-01 was a Thursday."""
+        return (days.astype(np.int64) + 3) % 7
+    
+    @staticmethod
+    def _month(days):
+        """Month (January 0) of datetime64[D] values."""
+        return days.astype('datetime64[M]').astype(np.int64) % 12
+    
+    @staticmethod
+    def _factors(sold, categories, num_values):
+        """
+        Per-type demand factor for each category value (weekday or month):
+        its mean nightly demand over the overall mean, 1 without history.
+        sold is (types, nights), categories gives each night's value.
+        """
+        one_hot = np.eye(num_values)[categories]
+        nights = one_hot.sum(axis=0)
+        overall = sold.mean(axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = (sold @ one_hot) / nights / overall
+        return np.where(np.isfinite(factors) & (nights > 0), factors, 1.0)
+    
+    @staticmethod
+    def _pickup_shares(first, stop, horizon):
+        """
+        Share of a night's final room-nights already on the books L days
+        ahead, for L in 0..horizon, from the pace history of nights [first, stop).
+        """
+        shares = np.zeros(horizon + 1)
+        shares[0] = 1.0
+        matrix = booking_pace.get_matrix(first, stop, horizon)
+        if matrix.empty:
+            return shares
+        totals = matrix.fillna(0).to_numpy().sum(axis=0)
+        if totals[0] > 0:
+            shares[:len(totals)] = np.minimum(totals / totals[0], 1.0)
+        return shares
+    
+    @staticmethod
+    def build(today=None, horizon=None):
+        """
+        Forecast nights today..today + horizon - 1 for every room type.
+        Returns {room_type: [{'date', 'rooms', 'on_books', 'baseline',
+        'forecast', 'occupancy', 'adr', 'revenue'}]}.
+        """
+        today = today or date.today()
+        horizon = horizon or config.FORECAST_HORIZON_DAYS
+        history_start = today - timedelta(days=config.FORECAST_HISTORY_DAYS)
+        catalog_rooms = room_catalog.snapshot().rooms
+        types = sorted({r.room_type for r in catalog_rooms})
+        if not types:
+            return {}
+        
+        with get_db_session() as session:
+            sold, revenue = OccupancyAnalytics._nightly_totals(session, history_start, today, types)
+        
+        # Seasonal baseline: recent deseasonalized level x weekday x month factors
+        history = np.arange(np.datetime64(history_start, 'D'), np.datetime64(today, 'D'))
+        future = np.arange(np.datetime64(today, 'D'), np.datetime64(today + timedelta(days=horizon), 'D'))
+        weekday, month = DemandForecast._weekday, DemandForecast._month
+        weekday_factors = DemandForecast._factors(sold, weekday(history), 7)
+        month_factors = DemandForecast._factors(sold, month(history), 12)
+        
+        recent = slice(-config.FORECAST_LEVEL_DAYS, None)
+        seasonal = weekday_factors[:, weekday(history[recent])] * month_factors[:, month(history[recent])]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            level = np.nan_to_num(sold[:, recent].sum(axis=1) / seasonal.sum(axis=1))
+        baseline = level[:, None] * weekday_factors[:, weekday(future)] * month_factors[:, month(future)]
+        
+        # Recent ADR per type, list price when nothing sold recently
+        list_price = {t: np.mean([r.base_price_per_night for r in catalog_rooms if r.room_type == t]) for t in types}
+        recent_sold = sold[:, recent].sum(axis=1)
+        recent_revenue = revenue[:, recent].sum(axis=1)
+        
+        # Pickup: what usually still books after each lead time is added to what is on the books
+        shares = DemandForecast._pickup_shares(history_start, today, horizon - 1)
+        inventory = RoomTypeInventory.get_availability(today, today + timedelta(days=horizon), types)
+        
+        forecast = {}
+        for i, room_type in enumerate(types):
+            nights = inventory.get(room_type, [])
+            if len(nights) != horizon:
+                continue
+            on_books = np.array([n['sold'] for n in nights], dtype=float)
+            capacity = np.array([max(n['rooms'] - n['blocked'], 0) for n in nights], dtype=float)
+            expected = np.clip(on_books + baseline[i] * (1 - shares), on_books, np.maximum(capacity, on_books))
+            adr = recent_revenue[i] / recent_sold[i] if recent_sold[i] else float(list_price[room_type])
+            forecast[room_type] = [{
+                'date': night['night'],
+                'rooms': night['rooms'],
+                'on_books': int(on_books[d]),
+                'baseline': round(float(baseline[i, d]), 2),
+                'forecast': round(float(expected[d]), 2),
+                'occupancy': round(float(expected[d]) / night['rooms'] * 100, 2) if night['rooms'] else 0.0,
+                'adr': round(float(adr), 2),
+                'revenue': round(float(expected[d] * adr), 2)
+            } for d, night in enumerate(nights)]
+        return forecast
+    
+    def get_forecast(self, room_types=None, days=None):
+        """
+        Forecast series for the next `days` nights (FORECAST_HORIZON_DAYS at
+        most) by room type, built once per day.
+        Returns {room_type: [night dicts]} (see build).
+        """
+        try:
+            with self._lock:
+                if self._day != date.today() or self._forecast is None:
+                    self._forecast = DemandForecast.build()
+                    self._day = date.today()
+                forecast = self._forecast
+            days = days or config.FORECAST_HORIZON_DAYS
+            return {room_type: nights[:days] for room_type, nights in forecast.items()
+                    if room_types is None or room_type in room_types}
+        except Exception as e:
+            print(f"Error building demand forecast: {e}")
+            return {}
+    
+    def invalidate(self):
+        """Rebuild on the next read."""
+        with self._lock:
+            self._forecast = None
+
+
+# Process-wide forecast shared by all Streamlit sessions
+demand_forecast = DemandForecast()
@@ -0,0 +1,115 @@
+"""
+Occupancy analytics.
+Daily occupancy, ADR and RevPAR for any date range in one call. Stays are
+fetched as narrow rows and spread over their nights with a vectorized
+difference-array sweep, so the cost is one query plus O(bookings + days).
+"""
+
+from database.db_manager import get_db_session
+from database.models import Room, Booking
+from backend.booking.availability_checker import AvailabilityChecker
+from sqlalchemy import func, select
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+
+class OccupancyAnalytics:
+    """Daily occupancy/ADR/RevPAR series."""
+    
+    @staticmethod
+    def _nightly_totals(session, first, stop, room_types=None):
+        """
+        Rooms sold and room revenue per night for nights [first, stop).
+        A stay's amount is spread evenly over its nights.
+        Returns two numpy arrays indexed by night offset or, with room_types,
+        by (position in room_types, night offset).
+        """
+        num_nights = (stop - first).days
+        groups = 1 if room_types is None else len(room_types)
+        query = select(Booking.check_in_date, Booking.check_out_date, Booking.total_amount, Room.room_type).join(
+            Room, Room.room_id == Booking.room_id
+        ).where(
+            Booking.booking_status.in_(AvailabilityChecker.SOLD_BOOKING_STATUSES),
+            Booking.check_in_date < datetime.combine(stop, datetime.min.time()),
+            Booking.check_out_date >= datetime.combine(first + timedelta(days=1), datetime.min.time())
+        )
+        if room_types is not None:
+            query = query.where(Room.room_type.in_(room_types))
+        rows = session.execute(query).all()
+        
+        sold = np.zeros((groups, num_nights), dtype=np.int64)
+        revenue = np.zeros((groups, num_nights))
+        if rows:
+            check_ins, check_outs, amounts, types = zip(*rows)
+            origin = np.datetime64(first, 'D')
+            # Calendar-day offsets from the first night (time of day dropped)
+            starts = (np.array(check_ins, dtype='datetime64[s]').astype('datetime64[D]') - origin).astype(np.int64)
+            ends = (np.array(check_outs, dtype='datetime64[s]').astype('datetime64[D]') - origin).astype(np.int64)
+            nightly_rate = np.asarray(amounts, dtype=float) / np.maximum(ends - starts, 1)
+            if room_types is None:
+                group = np.zeros(len(rows), dtype=np.int64)
+            else:
+                group = pd.Categorical(types, categories=list(room_types)).codes.astype(np.int64)
+            
+            # +1 on the first night in range, -1 after the last; cumsum gives per-night totals
+            lo = np.clip(starts, 0, num_nights)
+            hi = np.clip(ends, 0, num_nights)
+            stays = hi > lo
+            width = num_nights + 1
+            lo = group[stays] * width + lo[stays]
+            hi = group[stays] * width + hi[stays]
+            nightly_rate = nightly_rate[stays]
+            size = groups * width
+            sold = np.cumsum(
+                (np.bincount(lo, minlength=size) - np.bincount(hi, minlength=size)).reshape(groups, width), axis=1
+            )[:, :num_nights]
+            revenue = np.cumsum(
+                (np.bincount(lo, weights=nightly_rate, minlength=size)
+                 - np.bincount(hi, weights=nightly_rate, minlength=size)).reshape(groups, width), axis=1
+            )[:, :num_nights]
+        
+        if room_types is None:
+            return sold[0], revenue[0]
+        return sold, revenue
+    
+    @staticmethod
+    def get_daily_series(start_date, end_date):
+        """
+        Per-night figures for nights from start's date up to end's date.
+        Occupancy is sold over in-service rooms, ADR is revenue per sold
+        room and RevPAR is revenue per in-service room.
+        
+        Returns: dict with 'days' (list of {'date', 'rooms', 'sold',
+        'occupancy', 'revenue', 'adr', 'revpar'}) and 'summary' (the same
+        figures over the whole range, plus 'room_nights').
+        """
+        first, stop = AvailabilityChecker.report_nights(start_date, end_date)
+        num_nights = (stop - first).days
+        try:
+            with get_db_session() as session:
+                rooms = session.query(func.count(Room.room_id)).filter(
+                    Room.status != 'maintenance'
+                ).scalar() or 0
+                sold, revenue = OccupancyAnalytics._nightly_totals(session, first, stop)
+        except Exception as e:
+            print(f"Error building occupancy series: {e}")
+            sold, revenue, rooms = np.zeros(num_nights, dtype=np.int64), np.zeros(num_nights), 0
+        
+        def figures(sold_count, revenue_total, room_nights):
+            sold_count, revenue_total = int(sold_count), float(revenue_total)
+            return {
+                'sold': sold_count,
+                'occupancy': round(sold_count / room_nights * 100, 2) if room_nights else 0.0,
+                'revenue': round(revenue_total, 2),
+                'adr': round(revenue_total / sold_count, 2) if sold_count else 0.0,
+                'revpar': round(revenue_total / room_nights, 2) if room_nights else 0.0
+            }
+        
+        days = [
+            dict(date=first + timedelta(days=i), rooms=rooms, **figures(sold[i], revenue[i], rooms))
+            for i in range(num_nights)
+        ]
+        summary = dict(room_nights=rooms * num_nights,
+                       **figures(sold.sum(), revenue.sum(), rooms * num_nights))
+        return {'days': days, 'summary': summary}
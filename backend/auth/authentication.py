@@ -7,6 +7,7 @@ UPDATED: Added National ID/Passport handling
 import bcrypt
 from database.db_manager import get_db_session
 from database.models import User, AdminUser
+from backend.auth.rate_limiter import login_rate_limiter
 from utils.validators import validate_email, validate_password
 
 
@@ -65,41 +66,74 @@ class AuthenticationManager:
             return False, f"Registration failed: {str(e)}"
     
     @staticmethod
-    def login_user(email, password):
-        """Authenticate customer login."""
+    def _throttle_message(retry_after):
+        """Message shown when a login is rejected by the rate limiter."""
+        minutes = max(1, (retry_after + 59) // 60)
+        return f"Too many failed login attempts. Please try again in {minutes} minute(s)"
+    
+    @staticmethod
+    def login_user(email, password, ip_address=None):
+        """
+        Authenticate customer login.
+        Throttled per email and client IP before any password hashing.
+        """
+        account_key = login_rate_limiter.account_key('user', email)
+        ip_key = login_rate_limiter.ip_key(ip_address)
+        
+        allowed, retry_after, reservation = login_rate_limiter.acquire(account_key, ip_key)
+        if not allowed:
+            return False, None, AuthenticationManager._throttle_message(retry_after)
+        
         try:
             with get_db_session() as session:
                 user = session.query(User).filter_by(email=email).first()
                 
                 if not user:
+                    login_rate_limiter.record_failure(account_key, ip_key)
                     return False, None, "User not found"
                 
                 if user.account_status != 'active':
+                    login_rate_limiter.record_failure(account_key, ip_key)
                     return False, None, "Account is suspended"
                 
                 if AuthenticationManager.verify_password(password, user.password_hash):
+                    login_rate_limiter.record_success(account_key, ip_key, reservation)
                     return True, user.user_id, "Login successful"
                 else:
+                    login_rate_limiter.record_failure(account_key, ip_key)
                     return False, None, "Incorrect password"
         except Exception as e:
             return False, None, f"Login failed: {str(e)}"
     
     @staticmethod
-    def login_admin(username, password):
-        """Authenticate admin login."""
+    def login_admin(username, password, ip_address=None):
+        """
+        Authenticate admin login.
+        Throttled per username and client IP before any password hashing.
+        """
+        account_key = login_rate_limiter.account_key('admin', username)
+        ip_key = login_rate_limiter.ip_key(ip_address)
+        
+        allowed, retry_after, reservation = login_rate_limiter.acquire(account_key, ip_key)
+        if not allowed:
+            return False, None, None, AuthenticationManager._throttle_message(retry_after)
+        
         try:
             with get_db_session() as session:
                 admin = session.query(AdminUser).filter_by(username=username).first()
                 
                 if not admin:
+                    login_rate_limiter.record_failure(account_key, ip_key)
                     return False, None, None, "Admin not found"
                 
                 if AuthenticationManager.verify_password(password, admin.password_hash):
                     from datetime import datetime
                     admin.last_login = datetime.utcnow()
                     session.commit()
+                    login_rate_limiter.record_success(account_key, ip_key, reservation)
                     return True, admin.admin_id, admin.role, "Login successful"
                 else:
+                    login_rate_limiter.record_failure(account_key, ip_key)
                     return False, None, None, "Incorrect password"
         except Exception as e:
             return False, None, None, f"Login failed: {str(e)}"
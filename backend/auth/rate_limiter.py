@@ -0,0 +1,170 @@
+"""
+Login throttling.
+Sliding-window limiter for failed login attempts, keyed by account and client IP.
+Checked before any password hashing so rejected attempts cost no bcrypt work.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import config
+
+
+class LoginRateLimiter:
+    """Sliding-window counter of failed login attempts."""
+    
+    MAX_TRACKED_KEYS = 100000
+    
+    def __init__(self, window_seconds=None, max_per_account=None, max_per_ip=None,
+                 persist=None, clock=None):
+        self.window_seconds = window_seconds or config.LOGIN_ATTEMPT_WINDOW_SECONDS
+        self.max_per_account = max_per_account or config.LOGIN_MAX_ATTEMPTS_PER_ACCOUNT
+        self.max_per_ip = max_per_ip or config.LOGIN_MAX_ATTEMPTS_PER_IP
+        self.persist = config.LOGIN_THROTTLE_PERSIST if persist is None else persist
+        self.clock = clock or time.time
+        self._attempts = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def account_key(scope, identifier):
+        """Build throttle key for an account (scope is 'user' or 'admin')."""
+        return f"{scope}:{(identifier or '').strip().lower()}"
+    
+    @staticmethod
+    def ip_key(ip_address):
+        """Build throttle key for a client IP (None if IP unknown)."""
+        return f"ip:{ip_address}" if ip_address else None
+    
+    def _window(self, key, now, loaded=None):
+        """
+        Return the attempt deque for key with expired entries evicted (lock held).
+        A new window starts from loaded[key], the persisted attempts read
+        before the lock was taken.
+        """
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            attempts = deque((loaded or {}).get(key, ()))
+            self._attempts[key] = attempts
+        
+        cutoff = now - self.window_seconds
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        return attempts
+    
+    def _load_missing(self, keys, now):
+        """Persisted attempts for keys not yet in memory, read without holding the lock."""
+        if not self.persist:
+            return {}
+        return {key: self._load_persisted(key, now) for key in keys if key not in self._attempts}
+    
+    def acquire(self, account_key, ip_key=None):
+        """
+        Reserve a login attempt if both windows are below their limits.
+        The reservation counts as a failure until record_success() is called,
+        so concurrent attackers cannot overshoot the limit while hashing.
+        Returns: (allowed, retry_after_seconds, reservation); pass the
+        reservation to record_success() to release this attempt's IP slot.
+        """
+        now = self.clock()
+        retry_after = 0
+        keys = [(k, limit) for k, limit in ((account_key, self.max_per_account),
+                                            (ip_key, self.max_per_ip)) if k]
+        loaded = self._load_missing([key for key, _ in keys], now)
+        
+        with self._lock:
+            windows = [(self._window(key, now, loaded), limit) for key, limit in keys]
+            for attempts, limit in windows:
+                if len(attempts) >= limit:
+                    # Attempt that must expire before the window drops below the limit
+                    oldest = attempts[len(attempts) - limit]
+                    retry_after = max(retry_after, oldest + self.window_seconds - now)
+            
+            if retry_after <= 0:
+                for attempts, _ in windows:
+                    attempts.append(now)
+            
+            if len(self._attempts) > self.MAX_TRACKED_KEYS:
+                self._prune_locked(now)
+        
+        return retry_after <= 0, int(retry_after + 0.999), now
+    
+    def record_failure(self, account_key, ip_key=None):
+        """Confirm a reserved attempt as failed (persisted when enabled)."""
+        if self.persist:
+            self._save_persisted([k for k in (account_key, ip_key) if k], self.clock())
+    
+    def record_success(self, account_key, ip_key=None, reservation=None):
+        """
+        Clear the account window and release the IP slot reserved by this
+        attempt (the reservation returned by acquire) after a successful login.
+        """
+        with self._lock:
+            self._attempts.pop(account_key, None)
+            attempts = self._attempts.get(ip_key)
+            if attempts and reservation in attempts:
+                attempts.remove(reservation)
+        
+        if self.persist:
+            self._delete_persisted(account_key)
+    
+    def prune(self):
+        """Drop empty windows so memory stays bounded by active attackers."""
+        with self._lock:
+            self._prune_locked(self.clock())
+    
+    def _prune_locked(self, now):
+        """Drop empty windows (lock held)."""
+        cutoff = now - self.window_seconds
+        for key in list(self._attempts):
+            attempts = self._attempts[key]
+            if not attempts or attempts[-1] <= cutoff:
+                del self._attempts[key]
+    
+    def _load_persisted(self, key, now):
+        """Load recent attempts for key from the database."""
+        from database.db_manager import get_db_session
+        from database.models import LoginAttempt
+        
+        try:
+            cutoff = datetime.utcfromtimestamp(now - self.window_seconds)
+            with get_db_session() as session:
+                rows = session.query(LoginAttempt.attempted_at).filter(
+                    LoginAttempt.throttle_key == key,
+                    LoginAttempt.attempted_at > cutoff
+                ).order_by(LoginAttempt.attempted_at).all()
+                epoch = datetime(1970, 1, 1)
+                return [(row.attempted_at - epoch).total_seconds() for row in rows]
+        except Exception as e:
+            print(f"Error loading login attempts: {e}")
+            return []
+    
+    def _save_persisted(self, keys, now):
+        """Persist failed attempts and purge rows older than the window."""
+        from database.db_manager import get_db_session
+        from database.models import LoginAttempt
+        
+        try:
+            attempted_at = datetime.utcfromtimestamp(now)
+            with get_db_session() as session:
+                session.add_all([LoginAttempt(throttle_key=k, attempted_at=attempted_at) for k in keys])
+                session.query(LoginAttempt).filter(
+                    LoginAttempt.attempted_at <= attempted_at - timedelta(seconds=self.window_seconds)
+                ).delete(synchronize_session=False)
+        except Exception as e:
+            print(f"Error saving login attempt: {e}")
+    
+    def _delete_persisted(self, key):
+        """Remove persisted attempts for key."""
+        from database.db_manager import get_db_session
+        from database.models import LoginAttempt
+        
+        try:
+            with get_db_session() as session:
+                session.query(LoginAttempt).filter_by(throttle_key=key).delete(synchronize_session=False)
+        except Exception as e:
+            print(f"Error clearing login attempts: {e}")
+
+
+# Process-wide limiter shared by all Streamlit sessions
+login_rate_limiter = LoginRateLimiter()
@@ -2,13 +2,72 @@
 Advanced room filtering system
 """
 from database.db_manager import get_db_session
-from database.models import Room, Booking
-from datetime import datetime
+from backend.booking.availability_checker import AvailabilityChecker
+from backend.booking.pricing_calculator import PricingCalculator
+from backend.booking.search_cache import search_cache
+from backend.room.room_catalog import room_catalog
+from datetime import datetime, timedelta
+import copy
+import heapq
+import config
 
 
 class AdvancedFilter:
     """Handle advanced room filtering"""
     
+    @staticmethod
+    def _filter_masks(index, min_price, max_price, room_types, amenities, floor_numbers, view_types, min_capacity):
+        """Bitset per active attribute/price filter on the catalog's room index."""
+        masks = index.criterion_masks(
+            status='available',
+            room_types=room_types,
+            view_types=view_types,
+            floor_numbers=floor_numbers,
+            amenities=amenities,
+            min_capacity=min_capacity
+        )
+        if min_price is not None or max_price is not None:
+            masks['price'] = index.price_bits(min_price, max_price)
+        return masks
+    
+    @staticmethod
+    def _available_bits(index, check_in, check_out):
+        """Bitset of rooms free of bookings and blocks for the dates (one query)."""
+        with get_db_session() as session:
+            unavailable = AvailabilityChecker.get_unavailable_room_ids(session, check_in, check_out)
+        return index.all_bits & ~index.bits_for(unavailable)
+    
+    @staticmethod
+    def _matching_rooms(check_in, check_out, min_price, max_price, room_types, amenities,
+                        floor_numbers, view_types, min_capacity, sort_by):
+        """Catalog rooms matching every filter, ordered by the index's sort order."""
+        index = room_catalog.snapshot().index
+        mask = index.all_bits
+        for criterion in AdvancedFilter._filter_masks(index, min_price, max_price, room_types, amenities,
+                                                      floor_numbers, view_types, min_capacity).values():
+            mask &= criterion
+        
+        if check_in and check_out and mask:
+            mask &= AdvancedFilter._available_bits(index, check_in, check_out)
+        
+        return index.ordered(mask, sort_by)
+    
+    @staticmethod
+    def _room_dict(room):
+        """New dict for a catalog room (callers add pricing fields)."""
+        return {
+            'room_id': room.room_id,
+            'room_number': room.room_number,
+            'room_type': room.room_type,
+            'base_price': room.base_price_per_night,
+            'capacity': room.capacity,
+            'floor_number': room.floor_number,
+            'view_type': room.view_type,
+            'description': room.description,
+            'amenities': list(room.amenities),
+            'status': room.status
+        }
+    
     @staticmethod
     def filter_rooms(
         check_in=None,
@@ -28,117 +87,250 @@ class AdvancedFilter:
         Returns list of rooms matching all filters.
         """
         try:
-            with get_db_session() as session:
-                # Base query - available rooms
-                query = session.query(Room).filter(Room.status == 'available')
-                
-                # Price filters - FIXED: use base_price_per_night
-                if min_price is not None:
-                    query = query.filter(Room.base_price_per_night >= min_price)
-                if max_price is not None:
-                    query = query.filter(Room.base_price_per_night <= max_price)
-                
-                # Room type filter
-                if room_types and len(room_types) > 0:
-                    query = query.filter(Room.room_type.in_(room_types))
-                
-                # View type filter
-                if view_types and len(view_types) > 0:
-                    query = query.filter(Room.view_type.in_(view_types))
-                
-                # Floor filter
-                if floor_numbers and len(floor_numbers) > 0:
-                    query = query.filter(Room.floor_number.in_(floor_numbers))
-                
-                # Capacity filter
-                if min_capacity:
-                    query = query.filter(Room.capacity >= min_capacity)
-                
-                rooms = query.all()
-                
-                # Convert to dict
-                results = []
-                for room in rooms:
-                    # Check availability for dates if provided
-                    if check_in and check_out:
-                        # Check for conflicts
-                        conflicts = session.query(Booking).filter(
-                            Booking.room_id == room.room_id,
-                            Booking.booking_status.in_(['confirmed', 'pending']),
-                            Booking.check_out_date > check_in,
-                            Booking.check_in_date < check_out
-                        ).count()
-                        
-                        if conflicts > 0:
-                            continue  # Skip unavailable rooms
-                    
-                    # Amenity filtering (JSON column - no need for json.loads)
-                    if amenities and len(amenities) > 0:
-                        room_amenities = room.amenities if room.amenities else []
-                        # Check if room has ALL selected amenities
-                        if not all(amenity in room_amenities for amenity in amenities):
-                            continue
-                    
-                    # FIXED: use base_price_per_night
-                    results.append({
-                        'room_id': room.room_id,
-                        'room_number': room.room_number,
-                        'room_type': room.room_type,
-                        'base_price': room.base_price_per_night,
-                        'capacity': room.capacity,
-                        'floor_number': room.floor_number,
-                        'view_type': room.view_type,
-                        'description': room.description,
-                        'amenities': room.amenities if room.amenities else [],
-                        'status': room.status
-                    })
-                
-                # Sort results
-                if sort_by == 'price_low':
-                    results.sort(key=lambda x: x['base_price'])
-                elif sort_by == 'price_high':
-                    results.sort(key=lambda x: x['base_price'], reverse=True)
-                elif sort_by == 'capacity':
-                    results.sort(key=lambda x: x['capacity'], reverse=True)
-                elif sort_by == 'room_number':
-                    results.sort(key=lambda x: x['room_number'])
-                
-                return results
+            rooms = AdvancedFilter._matching_rooms(check_in, check_out, min_price, max_price, room_types,
+                                                   amenities, floor_numbers, view_types, min_capacity, sort_by)
+            return [AdvancedFilter._room_dict(room) for room in rooms]
                 
         except Exception as e:
             print(f"Filter error: {e}")
             return []
     
     @staticmethod
-    def get_filter_options():
-        """Get all available filter options from database"""
+    def search_page(
+        check_in,
+        check_out,
+        num_guests,
+        min_price=None,
+        max_price=None,
+        room_types=None,
+        amenities=None,
+        floor_numbers=None,
+        view_types=None,
+        sort_by='price_low',
+        page=1,
+        page_size=None
+    ):
+        """
+        One page of available rooms for a stay.
+        The ordered list of matching room ids is cached per query; only rooms
+        on the requested page are materialized and priced.
+        
+        Returns dict with 'rooms' (with 'total_price' and 'nights'), 'total',
+        'page' (clamped to the valid range), 'pages' and 'page_size'.
+        """
+        page_size = page_size or config.SEARCH_PAGE_SIZE
+        key = search_cache.make_key(check_in, check_out, num_guests, min_price, max_price, room_types,
+                                    amenities, floor_numbers, view_types, sort_by)
+        
+        def search():
+            return tuple(room.room_id for room in AdvancedFilter._matching_rooms(
+                check_in, check_out, min_price, max_price, room_types,
+                amenities, floor_numbers, view_types, num_guests, sort_by
+            ))
+        
+        try:
+            room_ids = search_cache.get_or_search(key, search)
+        except Exception as e:
+            print(f"Search error: {e}")
+            room_ids = ()
+        
+        total = len(room_ids)
+        pages = max(1, -(-total // page_size))
+        page = min(max(1, page), pages)
+        offset = (page - 1) * page_size
+        
+        by_id = room_catalog.snapshot().by_id
+        nights = (check_out.date() - check_in.date()).days
+        rooms = []
+        for room_id in room_ids[offset:offset + page_size]:
+            room = by_id.get(room_id)
+            if room is None:
+                continue
+            result = AdvancedFilter._room_dict(room)
+            result['total_price'] = PricingCalculator.calculate_total_price(
+                room.base_price_per_night,
+                check_in,
+                check_out,
+                num_guests,
+                room.capacity
+            )
+            result['nights'] = nights
+            rooms.append(result)
+        
+        return {
+            'rooms': rooms,
+            'total': total,
+            'page': page,
+            'pages': pages,
+            'page_size': page_size
+        }
+    
+    @staticmethod
+    def get_facets(
+        check_in,
+        check_out,
+        num_guests,
+        min_price=None,
+        max_price=None,
+        room_types=None,
+        amenities=None,
+        floor_numbers=None,
+        view_types=None
+    ):
+        """
+        Matching room counts per filter value for the current search.
+        Each facet applies every filter except its own, so other values of a
+        chosen facet keep their counts; amenity counts apply all filters.
+        
+        Returns dict with 'total', 'room_types', 'view_types', 'floors' and
+        'amenities' ({value: count}) and 'price_buckets' (list of dicts with
+        'min', 'max' and 'count').
+        """
+        key = search_cache.make_key(check_in, check_out, num_guests, min_price, max_price, room_types,
+                                    amenities, floor_numbers, view_types, sort_by=None, kind='facets')
+        
+        def compute():
+            index = room_catalog.snapshot().index
+            masks = AdvancedFilter._filter_masks(index, min_price, max_price, room_types, amenities,
+                                                 floor_numbers, view_types, num_guests)
+            if check_in and check_out:
+                masks['dates'] = AdvancedFilter._available_bits(index, check_in, check_out)
+            
+            def combined(excluded=None):
+                mask = index.all_bits
+                for name, criterion in masks.items():
+                    if name != excluded:
+                        mask &= criterion
+                return mask
+            
+            def counts(bits_by_value, base):
+                return {value: (base & bits).bit_count()
+                        for value, bits in bits_by_value.items() if value is not None}
+            
+            everything = combined()
+            price_base = combined('price')
+            return {
+                'total': everything.bit_count(),
+                'room_types': counts(index.type_bits, combined('room_types')),
+                'view_types': counts(index.view_bits, combined('view_types')),
+                'floors': counts(index.floor_bits, combined('floor_numbers')),
+                'amenities': {amenity: (everything & index.amenity_bits[code]).bit_count()
+                              for amenity, code in index.amenity_codes.items()},
+                'price_buckets': [{'min': low, 'max': high, 'count': (price_base & bits).bit_count()}
+                                  for low, high, bits in index.price_bucket_bits(config.SEARCH_PRICE_BUCKET_SIZE)]
+            }
+        
         try:
+            # Cached value is shared between callers; hand out a copy
+            return copy.deepcopy(search_cache.get_or_search(key, compute))
+        except Exception as e:
+            print(f"Error getting facets: {e}")
+            return {}
+    
+    @staticmethod
+    def find_flexible_stays(window_start, window_end, nights, num_guests, room_types=None, top_k=10):
+        """
+        Cheapest stays of `nights` nights that fit between the window_start and
+        window_end dates (check-out no later than window_end), across all rooms
+        and start dates.
+        
+        Each room's occupancy is a row of day cells (check-out hour to
+        check-out hour) filled from one query; a sliding window over its prefix
+        sums finds free start dates. Prices depend only on the room, the
+        weekend nights in the window and the start month, so each distinct
+        combination is priced once.
+        
+        Returns list of up to top_k room dicts with 'check_in', 'check_out',
+        'nights' and 'total_price', cheapest first.
+        """
+        try:
+            if isinstance(window_start, datetime):
+                window_start = window_start.date()
+            if isinstance(window_end, datetime):
+                window_end = window_end.date()
+            num_days = (window_end - window_start).days
+            num_starts = num_days - nights + 1
+            if nights < 1 or num_starts < 1:
+                return []
+            
+            index = room_catalog.snapshot().index
+            rooms = index.rooms_for(index.match(status='available', room_types=room_types, min_capacity=num_guests))
+            if not rooms:
+                return []
+            
+            # Cell k spans check-out hour on day k to check-out hour on day k + 1,
+            # so a stay's cells cover it from check-in to check-out
+            day = timedelta(days=1)
+            cells_start = datetime.combine(window_start, datetime.min.time()).replace(hour=config.CHECK_OUT_HOUR)
             with get_db_session() as session:
-                rooms = session.query(Room).all()
-                
-                room_types = list(set([r.room_type for r in rooms]))
-                view_types = list(set([r.view_type for r in rooms if r.view_type]))
-                floors = sorted(list(set([r.floor_number for r in rooms if r.floor_number])))
-                
-                # Get price range - FIXED: use base_price_per_night
-                prices = [r.base_price_per_night for r in rooms]
-                min_price = min(prices) if prices else 0
-                max_price = max(prices) if prices else 1000
-                
-                # Get all amenities (JSON column - direct access)
-                all_amenities = set()
+                intervals = AvailabilityChecker.get_busy_intervals(
+                    session, cells_start, cells_start + num_days * day, [r.room_id for r in rooms]
+                )
+            
+            busy = {}
+            for room_id, start, end in intervals:
+                cells = busy.setdefault(room_id, bytearray(num_days))
+                first = max(0, (start - cells_start) // day)
+                last = min(num_days, -((cells_start - end) // day))
+                cells[first:last] = b'\x01' * (last - first)
+            
+            # Weekend nights per start date (sliding window over night flags)
+            weekend = [0]
+            for k in range(num_days):
+                weekend.append(weekend[-1] + ((window_start + k * day).weekday() in (4, 5)))
+            
+            check_ins = [datetime.combine(window_start + k * day, datetime.min.time()).replace(hour=config.CHECK_IN_HOUR)
+                         for k in range(num_starts)]
+            stay = nights * day - timedelta(hours=config.CHECK_IN_HOUR - config.CHECK_OUT_HOUR)
+            prices = {}
+            
+            def options():
                 for room in rooms:
-                    if room.amenities:
-                        all_amenities.update(room.amenities)
-                
-                return {
-                    'room_types': room_types,
-                    'view_types': view_types,
-                    'floors': floors,
-                    'min_price': min_price,
-                    'max_price': max_price,
-                    'amenities': sorted(list(all_amenities))
-                }
+                    cells = busy.get(room.room_id)
+                    if cells is not None:
+                        occupied = [0]
+                        for flag in cells:
+                            occupied.append(occupied[-1] + flag)
+                    for k in range(num_starts):
+                        if cells is not None and occupied[k + nights] != occupied[k]:
+                            continue
+                        check_in = check_ins[k]
+                        key = (room.base_price_per_night, room.capacity, weekend[k + nights] - weekend[k],
+                               check_in.month in config.PEAK_SEASON_MONTHS)
+                        price = prices.get(key)
+                        if price is None:
+                            price = prices[key] = PricingCalculator.calculate_total_price(
+                                room.base_price_per_night,
+                                check_in,
+                                check_in + stay,
+                                num_guests,
+                                room.capacity
+                            )
+                        yield price, k, room.room_number, room
+            
+            results = []
+            for price, k, _, room in heapq.nsmallest(top_k, options(), key=lambda o: o[:3]):
+                result = AdvancedFilter._room_dict(room)
+                result['check_in'] = check_ins[k]
+                result['check_out'] = check_ins[k] + stay
+                result['nights'] = nights
+                result['total_price'] = price
+                results.append(result)
+            return results
+        
+        except Exception as e:
+            print(f"Flexible search error: {e}")
+            return []
+    
+    @staticmethod
+    def get_filter_options():
+        """Get all available filter options (precomputed per catalog version)"""
+        try:
+            options = room_catalog.snapshot().filter_options
+            return {
+                key: list(value) if isinstance(value, tuple) else value
+                for key, value in options.items()
+            }
         except Exception as e:
             print(f"Error getting filter options: {e}")
             return {}
@@ -3,7 +3,7 @@ Room Availability Calendar Manager
 Provides calendar-based availability data
 """
 from database.db_manager import get_db_session
-from database.models import Room, Booking
+from database.models import Room, Booking, RoomBlock
 from datetime import datetime, timedelta
 from collections import defaultdict
 
@@ -46,22 +46,44 @@ class AvailabilityCalendar:
                 else:
                     end_date = datetime(year, month + 1, 1)
                 
-                bookings = session.query(Booking).filter(
+                bookings_by_room = defaultdict(list)
+                for booking in session.query(Booking).filter(
                     Booking.booking_status.in_(['confirmed', 'pending']),
                     Booking.check_out_date > start_date,
                     Booking.check_in_date < end_date
-                ).all()
+                ).all():
+                    bookings_by_room[booking.room_id].append(booking)
+                
+                # Out-of-order blocks for this month
+                blocks_by_room = defaultdict(list)
+                for block in session.query(RoomBlock).filter(
+                    RoomBlock.end_date > start_date,
+                    RoomBlock.start_date < end_date
+                ).all():
+                    blocks_by_room[block.room_id].append(block)
                 
                 # Build availability map
                 room_availability = []
                 
                 for room in rooms:
-                    # Get bookings for this room
-                    room_bookings = [b for b in bookings if b.room_id == room.room_id]
+                    # Get bookings and blocks for this room
+                    room_bookings = bookings_by_room.get(room.room_id, [])
+                    room_blocks = blocks_by_room.get(room.room_id, [])
                     
                     # Check each date
                     daily_status = {}
                     for date in dates:
+                        # Check if blocked on this night (blocks end at check-out time)
+                        block = next((b for b in room_blocks
+                                      if b.start_date.date() <= date.date() < b.end_date.date()), None)
+                        if block:
+                            daily_status[date.strftime('%Y-%m-%d')] = {
+                                'status': 'blocked',
+                                'available': False,
+                                'reason': block.reason
+                            }
+                            continue
+                        
                         # Check if booked on this date
                         is_booked = False
                         booking_status = None
@@ -105,7 +127,8 @@ class AvailabilityCalendar:
     def get_room_availability_range(room_id, start_date, end_date):
         """
         Check if a specific room is available for a date range.
-        Returns (available: bool, conflicting_bookings: list)
+        Returns (available: bool, conflicts: list). Room blocks are listed
+        with status 'blocked' and their reason.
         """
         try:
             with get_db_session() as session:
@@ -115,14 +138,26 @@ class AvailabilityCalendar:
                     Booking.check_out_date > start_date,
                     Booking.check_in_date < end_date
                 ).all()
+                blocks = session.query(RoomBlock).filter(
+                    RoomBlock.room_id == room_id,
+                    RoomBlock.end_date > start_date,
+                    RoomBlock.start_date < end_date
+                ).all()
                 
-                if conflicts:
+                if conflicts or blocks:
                     conflict_list = [{
                         'booking_reference': b.booking_reference,
                         'check_in': b.check_in_date,
                         'check_out': b.check_out_date,
                         'status': b.booking_status
                     } for b in conflicts]
+                    conflict_list.extend({
+                        'booking_reference': None,
+                        'check_in': b.start_date,
+                        'check_out': b.end_date,
+                        'status': 'blocked',
+                        'reason': b.reason
+                    } for b in blocks)
                     return False, conflict_list
                 
                 return True, []
@@ -139,24 +174,35 @@ class AvailabilityCalendar:
         """
         try:
             available_dates = []
+            end_date = start_date + timedelta(days=num_days)
             
             with get_db_session() as session:
-                for i in range(num_days):
-                    check_date = start_date + timedelta(days=i)
-                    next_date = check_date + timedelta(days=1)
-                    
-                    # Check if available on this date
-                    conflicts = session.query(Booking).filter(
-                        Booking.room_id == room_id,
-                        Booking.booking_status.in_(['confirmed', 'pending']),
-                        Booking.check_out_date > check_date,
-                        Booking.check_in_date < next_date
-                    ).count()
-                    
-                    if conflicts == 0:
-                        available_dates.append(check_date.strftime('%Y-%m-%d'))
+                # Fetch every booking and block in the window once
+                busy = session.query(Booking.check_in_date, Booking.check_out_date).filter(
+                    Booking.room_id == room_id,
+                    Booking.booking_status.in_(['confirmed', 'pending']),
+                    Booking.check_out_date > start_date,
+                    Booking.check_in_date < end_date
+                ).all()
+                # Blocks cover whole nights: from their first date up to their last
+                busy += [
+                    (datetime.combine(start.date(), datetime.min.time()), datetime.combine(end.date(), datetime.min.time()))
+                    for start, end in session.query(RoomBlock.start_date, RoomBlock.end_date).filter(
+                        RoomBlock.room_id == room_id,
+                        RoomBlock.end_date > start_date,
+                        RoomBlock.start_date < end_date
+                    ).all()
+                ]
+            
+            for i in range(num_days):
+                check_date = start_date + timedelta(days=i)
+                next_date = check_date + timedelta(days=1)
                 
-                return available_dates
+                # Check if available on this date
+                if not any(start < next_date and end > check_date for start, end in busy):
+                    available_dates.append(check_date.strftime('%Y-%m-%d'))
+            
+            return available_dates
                 
         except Exception as e:
             print(f"Error getting available dates: {e}")
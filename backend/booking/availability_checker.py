@@ -1,17 +1,71 @@
 """
 Room availability checking logic.
 Checks if rooms are available for given date ranges.
+Confirmed/pending bookings and room blocks both make a room unavailable;
+every check goes through get_unavailable_room_ids so they agree.
 """
 
 from datetime import datetime, timedelta
 from database.db_manager import get_db_session
-from database.models import Room, Booking
-from sqlalchemy import and_, or_
+from database.models import Room, Booking, RoomBlock
+from sqlalchemy import func, select, union
 
 
 class AvailabilityChecker:
     """Checks room availability."""
     
+    ACTIVE_BOOKING_STATUSES = ('confirmed', 'pending')
+    # Stays that count as sold room-nights in occupancy and revenue figures
+    SOLD_BOOKING_STATUSES = ('confirmed', 'completed')
+    
+    @staticmethod
+    def get_unavailable_room_ids(session, check_in, check_out, room_ids=None):
+        """
+        Get ids of rooms with a confirmed/pending booking or a block overlapping
+        [check_in, check_out), optionally limited to room_ids. One UNION query.
+        """
+        booked = select(Booking.room_id).where(
+            Booking.booking_status.in_(AvailabilityChecker.ACTIVE_BOOKING_STATUSES),
+            Booking.check_in_date < check_out,
+            Booking.check_out_date > check_in
+        )
+        blocked = select(RoomBlock.room_id).where(
+            RoomBlock.start_date < check_out,
+            RoomBlock.end_date > check_in
+        )
+        if room_ids is not None:
+            room_ids = list(room_ids)
+            if not room_ids:
+                return set()
+            booked = booked.where(Booking.room_id.in_(room_ids))
+            blocked = blocked.where(RoomBlock.room_id.in_(room_ids))
+        
+        return {row[0] for row in session.execute(union(booked, blocked))}
+    
+    @staticmethod
+    def get_busy_intervals(session, start, end, room_ids=None):
+        """
+        Get (room_id, start, end) for every confirmed/pending booking and block
+        overlapping [start, end), optionally limited to room_ids. One UNION query.
+        """
+        booked = select(Booking.room_id, Booking.check_in_date, Booking.check_out_date).where(
+            Booking.booking_status.in_(AvailabilityChecker.ACTIVE_BOOKING_STATUSES),
+            Booking.check_in_date < end,
+            Booking.check_out_date > start
+        )
+        blocked = select(RoomBlock.room_id, RoomBlock.start_date, RoomBlock.end_date).where(
+            RoomBlock.start_date < end,
+            RoomBlock.end_date > start
+        )
+        if room_ids is not None:
+            room_ids = list(room_ids)
+            if not room_ids:
+                return []
+            booked = booked.where(Booking.room_id.in_(room_ids))
+            blocked = blocked.where(RoomBlock.room_id.in_(room_ids))
+        
+        return [tuple(row) for row in session.execute(union(booked, blocked))]
+    
     @staticmethod
     def is_room_available(room_id, check_in, check_out):
         """Check if specific room is available."""
@@ -21,19 +75,7 @@ class AvailabilityChecker:
                 if not room or room.status != 'available':
                     return False
                 
-                conflicts = session.query(Booking).filter(
-                    and_(
-                        Booking.room_id == room_id,
-                        Booking.booking_status.in_(['confirmed', 'pending']),
-                        or_(
-                            and_(Booking.check_in_date <= check_in, Booking.check_out_date > check_in),
-                            and_(Booking.check_in_date < check_out, Booking.check_out_date >= check_out),
-                            and_(Booking.check_in_date >= check_in, Booking.check_out_date <= check_out)
-                        )
-                    )
-                ).first()
-                
-                return conflicts is None
+                return not AvailabilityChecker.get_unavailable_room_ids(session, check_in, check_out, [room_id])
         except:
             return False
     
@@ -53,24 +95,12 @@ class AvailabilityChecker:
                     query = query.filter(Room.capacity >= capacity)
                 
                 all_rooms = query.all()
+                unavailable = AvailabilityChecker.get_unavailable_room_ids(session, check_in, check_out)
                 
                 # ✅ FIX: Extract data and check availability WITHIN session
                 available = []
                 for room in all_rooms:
-                    # Check conflicts
-                    conflicts = session.query(Booking).filter(
-                        and_(
-                            Booking.room_id == room.room_id,
-                            Booking.booking_status.in_(['confirmed', 'pending']),
-                            or_(
-                                and_(Booking.check_in_date <= check_in, Booking.check_out_date > check_in),
-                                and_(Booking.check_in_date < check_out, Booking.check_out_date >= check_out),
-                                and_(Booking.check_in_date >= check_in, Booking.check_out_date <= check_out)
-                            )
-                        )
-                    ).first()
-                    
-                    if not conflicts:
+                    if room.room_id not in unavailable:
                         # ✅ FIX: Return dictionary with room data, not object
                         available.append({
                             'room_id': room.room_id,
@@ -90,37 +120,45 @@ class AvailabilityChecker:
             print(f"Error in get_available_rooms: {e}")
             return []
     
+    @staticmethod
+    def report_nights(start_date, end_date):
+        """
+        First night and the day after the last night of a report range:
+        nights run from start's date up to end's date (at least one).
+        """
+        first = start_date.date() if isinstance(start_date, datetime) else start_date
+        stop = end_date.date() if isinstance(end_date, datetime) else end_date
+        return first, max(stop, first + timedelta(days=1))
+    
     @staticmethod
     def get_occupancy_rate(start_date, end_date):
-        """Calculate occupancy rate percentage."""
+        """
+        Occupancy percentage: sold room-nights over in-service room-nights.
+        A room-night is a calendar night, so a 14:00 to 11:00 stay counts one
+        per night; the overlap is summed by the database in one query.
+        """
         try:
+            first, stop = AvailabilityChecker.report_nights(start_date, end_date)
             with get_db_session() as session:
-                total_rooms = session.query(Room).filter_by(status='available').count()
-                if total_rooms == 0:
+                total_rooms = session.query(func.count(Room.room_id)).filter(
+                    Room.status != 'maintenance'
+                ).scalar()
+                if not total_rooms:
                     return 0.0
+                total_room_nights = total_rooms * (stop - first).days
                 
-                num_days = (end_date - start_date).days
-                if num_days == 0:
-                    num_days = 1
-                total_room_nights = total_rooms * num_days
-                
-                bookings = session.query(Booking).filter(
-                    and_(
-                        Booking.booking_status.in_(['confirmed', 'checked_in']),
-                        Booking.check_in_date < end_date,
-                        Booking.check_out_date > start_date
-                    )
-                ).all()
-                
-                booked_nights = 0
-                for booking in bookings:
-                    overlap_start = max(booking.check_in_date, start_date)
-                    overlap_end = min(booking.check_out_date, end_date)
-                    nights = (overlap_end - overlap_start).days
-                    if nights > 0:
-                        booked_nights += nights
+                # Calendar nights of each stay clipped to the range
+                stay_start = func.max(func.date(Booking.check_in_date), first.isoformat())
+                stay_end = func.min(func.date(Booking.check_out_date), stop.isoformat())
+                booked_nights = session.query(
+                    func.coalesce(func.sum(func.julianday(stay_end) - func.julianday(stay_start)), 0)
+                ).filter(
+                    Booking.booking_status.in_(AvailabilityChecker.SOLD_BOOKING_STATUSES),
+                    Booking.check_in_date < datetime.combine(stop, datetime.min.time()),
+                    Booking.check_out_date >= datetime.combine(first + timedelta(days=1), datetime.min.time())
+                ).scalar()
                 
-                occupancy = (booked_nights / total_room_nights) * 100 if total_room_nights > 0 else 0
+                occupancy = (booked_nights / total_room_nights) * 100
                 return round(occupancy, 2)
         except Exception as e:
             print(f"Error calculating occupancy: {e}")
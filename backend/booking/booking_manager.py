@@ -6,6 +6,10 @@ Sends email notifications for bookings and cancellations.
 
 from database.db_manager import get_db_session, DatabaseManager
 from database.models import Booking, Room, User, PromoCode
+from backend.user.user_manager import UserManager
+from backend.room.housekeeping_queue import housekeeping_queue
+from backend.booking.search_cache import search_cache
+from backend.room.room_type_inventory import RoomTypeInventory
 from datetime import datetime
 import random
 import string
@@ -78,9 +82,14 @@ class BookingManager:
                 session.add(booking)
                 session.flush()
                 booking_id = booking.booking_id
-                session.commit()
                 
-                DatabaseManager.log_action(user_id, 'booking_create', f'Booking {booking_ref} created')
+                # Stats summary and audit entry commit in the same transaction as the booking
+                UserManager.apply_booking_status_change(session, booking, None)
+                RoomTypeInventory.apply_booking_change(session, booking, None, room.room_type)
+                DatabaseManager.log_action(user_id, 'booking_create', f'Booking {booking_ref} created', session=session)
+                session.commit()
+                housekeeping_queue.mark_arrival_changed(room_id)
+                search_cache.invalidate_range(check_in, check_out)
                 
                 # ✅ SEND CONFIRMATION EMAIL
                 try:
@@ -227,10 +236,14 @@ class BookingManager:
                 booking_ref = booking.booking_reference
                 
                 # Update booking status
+                old_status = booking.booking_status
                 booking.booking_status = 'cancelled'
+                UserManager.apply_booking_status_change(session, booking, old_status)
+                RoomTypeInventory.apply_booking_change(session, booking, old_status)
+                DatabaseManager.log_action(booking.user_id, 'booking_cancel', f'Booking {booking_ref} cancelled', session=session)
                 session.commit()
-                
-                DatabaseManager.log_action(booking.user_id, 'booking_cancel', f'Booking {booking_ref} cancelled')
+                housekeeping_queue.mark_arrival_changed(booking.room_id)
+                search_cache.invalidate_range(booking.check_in_date, booking.check_out_date)
                 
                 # ✅ SEND CANCELLATION EMAIL
                 if user:
@@ -5,6 +5,10 @@ Handles guest arrival, departure, and room status updates.
 
 from database.db_manager import get_db_session
 from database.models import Booking, Room, User
+from backend.user.user_manager import UserManager
+from backend.room.room_catalog import room_catalog
+from backend.room.inventory_manager import InventoryManager
+from backend.room.room_type_inventory import RoomTypeInventory
 from datetime import datetime, date, timedelta
 
 
@@ -169,9 +173,10 @@ class CheckInManager:
                 # Update room status to occupied
                 room = session.query(Room).filter_by(room_id=booking.room_id).first()
                 if room:
-                    room.status = 'occupied'
+                    InventoryManager.set_room_status(session, room, 'occupied')
                 
                 session.commit()
+                room_catalog.invalidate()
                 
                 return True, f"Guest checked in successfully at {booking.actual_check_in.strftime('%H:%M')}"
         
@@ -207,14 +212,18 @@ class CheckInManager:
                 # Update booking
                 booking.actual_check_out = datetime.now()
                 booking.checked_out_by = admin_id
+                old_status = booking.booking_status
                 booking.booking_status = 'completed'
+                UserManager.apply_booking_status_change(session, booking, old_status)
+                RoomTypeInventory.apply_booking_change(session, booking, old_status)
                 
                 # Update room status to cleaning (will be set to available by housekeeping)
                 room = session.query(Room).filter_by(room_id=booking.room_id).first()
                 if room:
-                    room.status = 'cleaning'
+                    InventoryManager.set_room_status(session, room, 'cleaning')
                 
                 session.commit()
+                room_catalog.invalidate()
                 
                 return True, f"Guest checked out successfully at {booking.actual_check_out.strftime('%H:%M')}"
         
@@ -0,0 +1,161 @@
+"""
+Group room allocation.
+Finds free rooms for a multi-room party in one call instead of adding rooms
+to the cart one by one. Each party (guests sharing a room) needs its own
+room with enough capacity.
+"""
+
+from database.db_manager import get_db_session
+from backend.booking.availability_checker import AvailabilityChecker
+from backend.booking.pricing_calculator import PricingCalculator
+from backend.room.room_catalog import room_catalog
+import heapq
+import config
+
+
+class GroupAllocator:
+    """Allocates rooms to multi-room parties."""
+    
+    OBJECTIVES = ('cheapest', 'same_floor', 'nearest')
+    
+    @staticmethod
+    def _assign(party_sizes, rooms):
+        """
+        Cheapest assignment of distinct rooms to parties, or None if infeasible.
+        rooms is a list of (price, room_number, room). Rooms that fit a party
+        also fit every smaller one, so giving the largest party first the
+        cheapest room that fits is optimal (a swap argument). Runs in
+        O((parties + rooms) log rooms).
+        """
+        by_capacity = sorted(rooms, key=lambda r: -r[2].capacity)
+        fitting = []  # heap of rooms fitting the current party, cheapest first
+        next_room = 0
+        assignment = []
+        for size in sorted(party_sizes, reverse=True):
+            while next_room < len(by_capacity) and by_capacity[next_room][2].capacity >= size:
+                heapq.heappush(fitting, by_capacity[next_room][:2] + (next_room,))
+                next_room += 1
+            if not fitting:
+                return None
+            price, _, pos = heapq.heappop(fitting)
+            assignment.append((size, price, by_capacity[pos][2]))
+        return assignment
+    
+    @staticmethod
+    def allocate(check_in, check_out, party_sizes, objective='cheapest', room_types=None):
+        """
+        Find free rooms for every party for the stay.
+        
+        objective:
+        - 'cheapest': lowest total price over all free rooms
+        - 'same_floor': cheapest allocation using a single floor
+        - 'nearest': smallest floor span, then cheapest
+        
+        Floor objectives run the assignment per floor (or per floor window,
+        with two pointers), so the cost is O(floors x (parties + rooms) log rooms).
+        
+        Returns: (success, allocation, message) where allocation is a dict with
+        'rooms' (room dicts with 'party_size' and 'total_price'), 'total_price'
+        and 'floors'.
+        """
+        party_sizes = [int(size) for size in party_sizes]
+        if not party_sizes:
+            return False, None, "No parties given"
+        if len(party_sizes) > config.GROUP_BOOKING_MAX_ROOMS:
+            return False, None, f"Groups are limited to {config.GROUP_BOOKING_MAX_ROOMS} rooms"
+        if min(party_sizes) < 1:
+            return False, None, "Every room needs at least one guest"
+        if objective not in GroupAllocator.OBJECTIVES:
+            return False, None, f"Unknown objective: {objective}"
+        
+        try:
+            index = room_catalog.snapshot().index
+            candidates = index.rooms_for(index.match(status='available', room_types=room_types,
+                                                     min_capacity=min(party_sizes)))
+            with get_db_session() as session:
+                unavailable = AvailabilityChecker.get_unavailable_room_ids(
+                    session, check_in, check_out, [r.room_id for r in candidates]
+                )
+            
+            # Price every free room once per (rate, capacity); parties fit, so no extra-guest charge
+            prices = {}
+            rooms = []
+            for room in candidates:
+                if room.room_id in unavailable:
+                    continue
+                key = (room.base_price_per_night, room.capacity)
+                if key not in prices:
+                    prices[key] = PricingCalculator.calculate_total_price(
+                        room.base_price_per_night, check_in, check_out, room.capacity, room.capacity
+                    )
+                rooms.append((prices[key], room.room_number, room))
+            
+            if len(rooms) < len(party_sizes):
+                return False, None, f"Only {len(rooms)} suitable room(s) free for these dates"
+            
+            if objective == 'cheapest':
+                best = GroupAllocator._assign(party_sizes, rooms)
+            else:
+                by_floor = {}
+                for option in rooms:
+                    by_floor.setdefault(option[2].floor_number or 0, []).append(option)
+                floors = sorted(by_floor)
+                best = None
+                best_rank = None
+                
+                if objective == 'same_floor':
+                    for floor in floors:
+                        assignment = GroupAllocator._assign(party_sizes, by_floor[floor])
+                        if assignment is not None:
+                            rank = sum(a[1] for a in assignment)
+                            if best_rank is None or rank < best_rank:
+                                best, best_rank = assignment, rank
+                else:
+                    # Two pointers over floor windows: widening a window never
+                    # makes it infeasible, so each left edge needs one right edge
+                    right = 0
+                    for left in range(len(floors)):
+                        right = max(right, left)
+                        window = [o for f in floors[left:right + 1] for o in by_floor[f]]
+                        assignment = GroupAllocator._assign(party_sizes, window)
+                        while assignment is None and right + 1 < len(floors):
+                            right += 1
+                            window.extend(by_floor[floors[right]])
+                            assignment = GroupAllocator._assign(party_sizes, window)
+                        if assignment is None:
+                            break
+                        rank = (floors[right] - floors[left], sum(a[1] for a in assignment))
+                        if best_rank is None or rank < best_rank:
+                            best, best_rank = assignment, rank
+            
+            if best is None:
+                if objective == 'same_floor':
+                    return False, None, "No single floor has enough suitable free rooms"
+                return False, None, "Not enough rooms with the required capacity are free"
+            
+            allocated = []
+            for size, price, room in sorted(best, key=lambda a: a[2].room_number):
+                allocated.append({
+                    'room_id': room.room_id,
+                    'room_number': room.room_number,
+                    'room_type': room.room_type,
+                    'base_price': room.base_price_per_night,
+                    'capacity': room.capacity,
+                    'floor_number': room.floor_number,
+                    'view_type': room.view_type,
+                    'description': room.description,
+                    'party_size': size,
+                    'total_price': price
+                })
+            
+            total = round(sum(r['total_price'] for r in allocated), 2)
+            floors_used = sorted({r['floor_number'] for r in allocated if r['floor_number'] is not None})
+            return True, {
+                'rooms': allocated,
+                'total_price': total,
+                'floors': floors_used
+            }, f"{len(allocated)} room(s) found for {sum(party_sizes)} guest(s)"
+        
+        except Exception as e:
+            print(f"Error allocating group: {e}")
+            return False, None, str(e)
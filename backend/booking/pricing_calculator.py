@@ -10,10 +10,18 @@ import config
 class PricingCalculator:
     """Calculates booking prices."""
     
+    @staticmethod
+    def count_nights(check_in, check_out):
+        """Calendar nights charged for a stay."""
+        # Check-out (11:00) is earlier in the day than check-in (14:00)
+        if isinstance(check_in, datetime) and isinstance(check_out, datetime):
+            return (check_out.date() - check_in.date()).days
+        return (check_out - check_in).days
+    
     @staticmethod
     def calculate_total_price(base_price, check_in, check_out, num_guests, room_capacity, promo_code=None):
         """Calculate total booking price with all factors."""
-        num_nights = (check_out - check_in).days
+        num_nights = PricingCalculator.count_nights(check_in, check_out)
         if num_nights <= 0:
             return 0.0
         
@@ -81,7 +89,7 @@ class PricingCalculator:
     @staticmethod
     def get_price_breakdown(base_price, check_in, check_out, num_guests, room_capacity):
         """Get itemized price breakdown."""
-        num_nights = (check_out - check_in).days
+        num_nights = PricingCalculator.count_nights(check_in, check_out)
         
         breakdown = {
             'base_price': base_price,
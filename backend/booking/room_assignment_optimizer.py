@@ -0,0 +1,423 @@
+"""
+Room assignment optimizer.
+Bookings are pinned to a room when they are made, which leaves short gaps
+between stays that no one can book. The optimizer repacks future bookings
+among rooms of the same type so stays sit back to back and free nights
+form long runs. Checked-in guests, locked bookings and room blocks stay put;
+rooms in maintenance are left out, so their stays stay put and nothing moves in.
+A plan is a dry run; apply_plan() moves its bookings in one transaction.
+"""
+
+from database.db_manager import get_db_session, DatabaseManager
+from database.models import Room, Booking, RoomBlock, RoomAssignmentLock
+from backend.booking.availability_checker import AvailabilityChecker
+from backend.booking.search_cache import search_cache
+from backend.room.housekeeping_queue import housekeeping_queue
+from sqlalchemy import or_
+from sqlalchemy.orm import aliased
+from datetime import datetime, date, timedelta
+from bisect import bisect_left
+import config
+
+
+class RoomAssignmentOptimizer:
+    """Plans and applies room reassignments that close gaps between stays."""
+    
+    @staticmethod
+    def lock_assignment(booking_id, admin_id=None, reason=""):
+        """Keep a booking in its room (e.g. the guest asked for it). Returns: (success, message)"""
+        try:
+            with get_db_session() as session:
+                booking = session.query(Booking).filter_by(booking_id=booking_id).first()
+                if not booking:
+                    return False, "Booking not found"
+                if session.query(RoomAssignmentLock).filter_by(booking_id=booking_id).first():
+                    return False, f"Booking {booking.booking_reference} is already locked"
+                
+                session.add(RoomAssignmentLock(booking_id=booking_id, locked_by=admin_id, reason=reason))
+                session.commit()
+                return True, f"Booking {booking.booking_reference} locked to its room"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def unlock_assignment(booking_id):
+        """Let the optimizer move a booking again. Returns: (success, message)"""
+        try:
+            with get_db_session() as session:
+                deleted = session.query(RoomAssignmentLock).filter_by(booking_id=booking_id).delete()
+                if not deleted:
+                    return False, "Booking is not locked"
+                return True, "Booking unlocked"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def get_locks():
+        """Get locked bookings that have not checked out yet. Returns list of dicts."""
+        try:
+            with get_db_session() as session:
+                rows = session.query(RoomAssignmentLock, Booking, Room.room_number).join(
+                    Booking, Booking.booking_id == RoomAssignmentLock.booking_id
+                ).join(Room, Room.room_id == Booking.room_id).filter(
+                    Booking.check_out_date > datetime.now()
+                ).order_by(Booking.check_in_date).all()
+                
+                return [{
+                    'booking_id': booking.booking_id,
+                    'booking_reference': booking.booking_reference,
+                    'room_number': room_number,
+                    'check_in': booking.check_in_date,
+                    'check_out': booking.check_out_date,
+                    'reason': lock.reason,
+                    'locked_by': lock.locked_by
+                } for lock, booking, room_number in rows]
+        except Exception as e:
+            print(f"Error getting assignment locks: {e}")
+            return []
+    
+    @staticmethod
+    def _fragmentation(intervals_by_room, window_start, nights):
+        """
+        Free-night statistics for rooms over nights [window_start, +nights).
+        intervals_by_room maps room_id -> [(start, end)]. A free run between
+        two stays of ROOM_OPTIMIZER_ORPHAN_GAP_NIGHTS or fewer is an orphan
+        gap; runs touching either end of the window are open, not orphans.
+        """
+        first_night = window_start.date()
+        stats = {'free_nights': 0, 'free_runs': 0, 'orphan_gaps': 0, 'orphan_nights': 0, 'longest_free_run': 0}
+        for intervals in intervals_by_room.values():
+            occupied = bytearray(nights)
+            for start, end in intervals:
+                first = max((start.date() - first_night).days, 0)
+                last = min((end.date() - first_night).days, nights)
+                occupied[first:last] = b'\x01' * max(last - first, 0)
+            
+            night = 0
+            while night < nights:
+                if occupied[night]:
+                    night += 1
+                    continue
+                run_start = night
+                while night < nights and not occupied[night]:
+                    night += 1
+                length = night - run_start
+                stats['free_nights'] += length
+                stats['free_runs'] += 1
+                stats['longest_free_run'] = max(stats['longest_free_run'], length)
+                if run_start > 0 and night < nights and length <= config.ROOM_OPTIMIZER_ORPHAN_GAP_NIGHTS:
+                    stats['orphan_gaps'] += 1
+                    stats['orphan_nights'] += length
+        return stats
+    
+    @staticmethod
+    def _score(stats):
+        """Lower is better: fewest orphan nights, then fewest free runs, then the longest run."""
+        return (stats['orphan_nights'], stats['free_runs'], -stats['longest_free_run'])
+    
+    @staticmethod
+    def _pack(bookings, rooms, fixed):
+        """
+        Best-fit interval packing. bookings are dicts with booking_id, room_id,
+        check_in, check_out and num_guests; rooms is [(room_id, room_number,
+        capacity)]; fixed maps room_id -> [(start, end)] that cannot move.
+        Bookings are taken in check-in order and each goes to the free room
+        whose previous stay ends closest before it, avoiding new orphan gaps
+        and preferring its current room. O(B log B + B x R log F).
+        Returns {booking_id: room_id}, or None if some booking fits nowhere.
+        """
+        gap_limit = config.ROOM_OPTIMIZER_ORPHAN_GAP_NIGHTS
+        fixed = {room_id: sorted(fixed.get(room_id, ())) for room_id, _, _ in rooms}
+        fixed_starts = {room_id: [start for start, _ in intervals] for room_id, intervals in fixed.items()}
+        frontier = {}  # room_id -> end of the last booking packed into it
+        assignment = {}
+        
+        for booking in sorted(bookings, key=lambda b: (b['check_in'], b['check_out'], b['booking_id'])):
+            check_in, check_out = booking['check_in'], booking['check_out']
+            best_key = None
+            best_room = None
+            for room_id, room_number, capacity in rooms:
+                if capacity < booking['num_guests']:
+                    continue
+                previous = frontier.get(room_id)
+                if previous is not None and previous > check_in:
+                    continue
+                
+                intervals = fixed[room_id]
+                i = bisect_left(fixed_starts[room_id], check_out)
+                if i and intervals[i - 1][1] > check_in:
+                    continue
+                if i and (previous is None or intervals[i - 1][1] > previous):
+                    previous = intervals[i - 1][1]
+                
+                gap_before = (check_in.date() - previous.date()).days if previous is not None else None
+                gap_after = (intervals[i][0].date() - check_out.date()).days if i < len(intervals) else None
+                orphans = sum(1 for gap in (gap_before, gap_after) if gap is not None and 0 < gap <= gap_limit)
+                key = (orphans, float('inf') if gap_before is None else gap_before,
+                       room_id != booking['room_id'], room_number)
+                if best_key is None or key < best_key:
+                    best_key, best_room = key, room_id
+            
+            if best_room is None:
+                return None
+            assignment[booking['booking_id']] = best_room
+            frontier[best_room] = check_out
+        
+        return RoomAssignmentOptimizer._relabel(assignment, bookings, rooms, fixed)
+    
+    @staticmethod
+    def _relabel(assignment, bookings, rooms, fixed):
+        """
+        Fewer moves for the same packing: the bookings packed into one room
+        form a chain, and rooms with the same fixed stays are interchangeable,
+        so a chain can go to any such room with enough capacity. Chains are
+        matched to the rooms most of their bookings already use, largest
+        overlaps first; gaps are unchanged.
+        """
+        chains = {}
+        for booking in bookings:
+            chains.setdefault(assignment[booking['booking_id']], []).append(booking)
+        capacities = {room_id: capacity for room_id, _, capacity in rooms}
+        needs = {room_id: max(b['num_guests'] for b in chain) for room_id, chain in chains.items()}
+        
+        def swappable(packed_room, room_id):
+            return fixed[room_id] == fixed[packed_room] and capacities[room_id] >= needs[packed_room]
+        
+        overlap = {}
+        for booking in bookings:
+            pair = (assignment[booking['booking_id']], booking['room_id'])
+            overlap[pair] = overlap.get(pair, 0) + 1
+        
+        target = {}  # packed room -> room its chain goes to
+        taken = set()
+        for (packed_room, room_id), _ in sorted(overlap.items(), key=lambda item: -item[1]):
+            if packed_room in target or room_id in taken or room_id not in capacities:
+                continue
+            if swappable(packed_room, room_id):
+                target[packed_room] = room_id
+                taken.add(room_id)
+        
+        for packed_room in chains:
+            if packed_room in target:
+                continue
+            room_id = next((r for r, _, _ in rooms if r not in taken and swappable(packed_room, r)), None)
+            if room_id is None:
+                return assignment  # keep the packing as built
+            target[packed_room] = room_id
+            taken.add(room_id)
+        
+        return {booking_id: target[room_id] for booking_id, room_id in assignment.items()}
+    
+    @staticmethod
+    def plan(start=None, horizon_days=None, room_types=None):
+        """
+        Dry run: work out which bookings to move, without changing anything.
+        
+        Bookings arriving on or after start (default tomorrow) and before the
+        end of the horizon may move, unless checked in or locked. A room type
+        gets moves only if the result has fewer orphan nights or free runs.
+        
+        Returns dict with 'moves' (list of dicts, the diff to apply), 'room_types'
+        (per type: before/after stats, bookings considered, moves, note) and
+        'window_start'/'window_end'.
+        """
+        horizon_days = horizon_days or config.ROOM_OPTIMIZER_HORIZON_DAYS
+        start = start or date.today() + timedelta(days=1)
+        window_start = datetime.combine(start, datetime.min.time())
+        window_end = window_start + timedelta(days=horizon_days)
+        # Movable stays end within MAX_BOOKING_DAYS of the window; later stays cannot collide
+        lookahead_end = window_end + timedelta(days=config.MAX_BOOKING_DAYS)
+        result = {'moves': [], 'room_types': [], 'window_start': window_start, 'window_end': window_end}
+        
+        try:
+            with get_db_session() as session:
+                # Rooms in maintenance cannot be sold: never a target, and their stays stay put
+                query = session.query(Room.room_id, Room.room_number, Room.room_type, Room.capacity).filter(
+                    Room.status != 'maintenance'
+                )
+                if room_types:
+                    query = query.filter(Room.room_type.in_(room_types))
+                rooms = query.order_by(Room.room_type, Room.room_number).all()
+                room_ids = [r.room_id for r in rooms]
+                if not room_ids:
+                    return result
+                
+                bookings = session.query(
+                    Booking.booking_id, Booking.booking_reference, Booking.room_id, Booking.check_in_date,
+                    Booking.check_out_date, Booking.num_guests, Booking.actual_check_in
+                ).filter(
+                    Booking.room_id.in_(room_ids),
+                    Booking.booking_status.in_(AvailabilityChecker.ACTIVE_BOOKING_STATUSES),
+                    Booking.check_in_date < lookahead_end,
+                    Booking.check_out_date > window_start
+                ).all()
+                blocks = session.query(RoomBlock.room_id, RoomBlock.start_date, RoomBlock.end_date).filter(
+                    RoomBlock.room_id.in_(room_ids),
+                    RoomBlock.start_date < lookahead_end,
+                    RoomBlock.end_date > window_start
+                ).all()
+                locked = {row[0] for row in session.query(RoomAssignmentLock.booking_id).join(
+                    Booking, Booking.booking_id == RoomAssignmentLock.booking_id
+                ).filter(Booking.room_id.in_(room_ids)).all()}
+            
+            room_by_id = {r.room_id: r for r in rooms}
+            by_type = {}
+            for room in rooms:
+                by_type.setdefault(room.room_type, {'rooms': [], 'movable': [], 'fixed': {}})['rooms'].append(
+                    (room.room_id, room.room_number, room.capacity)
+                )
+            for block in blocks:
+                group = by_type[room_by_id[block.room_id].room_type]
+                group['fixed'].setdefault(block.room_id, []).append((block.start_date, block.end_date))
+            for b in bookings:
+                group = by_type[room_by_id[b.room_id].room_type]
+                if (b.actual_check_in is None and b.booking_id not in locked
+                        and window_start <= b.check_in_date < window_end):
+                    group['movable'].append({
+                        'booking_id': b.booking_id,
+                        'booking_reference': b.booking_reference,
+                        'room_id': b.room_id,
+                        'check_in': b.check_in_date,
+                        'check_out': b.check_out_date,
+                        'num_guests': b.num_guests
+                    })
+                else:
+                    group['fixed'].setdefault(b.room_id, []).append((b.check_in_date, b.check_out_date))
+            
+            for room_type, group in by_type.items():
+                current = {room_id: list(group['fixed'].get(room_id, [])) for room_id, _, _ in group['rooms']}
+                for booking in group['movable']:
+                    current[booking['room_id']].append((booking['check_in'], booking['check_out']))
+                before = RoomAssignmentOptimizer._fragmentation(current, window_start, horizon_days)
+                summary = {'room_type': room_type, 'rooms': len(group['rooms']), 'bookings': len(group['movable']),
+                           'before': before, 'after': before, 'moves': 0, 'note': ''}
+                result['room_types'].append(summary)
+                
+                if not group['movable']:
+                    summary['note'] = "No movable bookings"
+                    continue
+                assignment = RoomAssignmentOptimizer._pack(group['movable'], group['rooms'], group['fixed'])
+                if assignment is None:
+                    summary['note'] = "Locked or checked-in stays leave no complete repacking"
+                    continue
+                
+                packed = {room_id: list(group['fixed'].get(room_id, [])) for room_id, _, _ in group['rooms']}
+                for booking in group['movable']:
+                    packed[assignment[booking['booking_id']]].append((booking['check_in'], booking['check_out']))
+                after = RoomAssignmentOptimizer._fragmentation(packed, window_start, horizon_days)
+                if RoomAssignmentOptimizer._score(after) >= RoomAssignmentOptimizer._score(before):
+                    summary['note'] = "Already as compact as the optimizer can make it"
+                    continue
+                
+                summary['after'] = after
+                for booking in group['movable']:
+                    to_room = assignment[booking['booking_id']]
+                    if to_room != booking['room_id']:
+                        summary['moves'] += 1
+                        result['moves'].append({
+                            'booking_id': booking['booking_id'],
+                            'booking_reference': booking['booking_reference'],
+                            'room_type': room_type,
+                            'check_in': booking['check_in'],
+                            'check_out': booking['check_out'],
+                            'from_room_id': booking['room_id'],
+                            'from_room_number': room_by_id[booking['room_id']].room_number,
+                            'to_room_id': to_room,
+                            'to_room_number': room_by_id[to_room].room_number
+                        })
+            
+            result['moves'].sort(key=lambda m: (m['check_in'], m['booking_reference']))
+            return result
+        
+        except Exception as e:
+            print(f"Error planning room assignments: {e}")
+            result['error'] = str(e)
+            return result
+    
+    @staticmethod
+    def apply_plan(moves, admin_id=None):
+        """
+        Apply a plan's moves in one transaction. Every booking must still be
+        in its from_room, active, not checked in and not locked, its to_room
+        must not be in maintenance, and no moved
+        booking may end up overlapping another stay or a block; otherwise
+        nothing changes.
+        Returns: (success, bookings_moved, message)
+        """
+        if not moves:
+            return True, 0, "Nothing to apply"
+        
+        try:
+            with get_db_session() as session:
+                moves_by_id = {m['booking_id']: m for m in moves}
+                bookings = session.query(Booking).filter(Booking.booking_id.in_(list(moves_by_id))).all()
+                locked = {row[0] for row in session.query(RoomAssignmentLock.booking_id).filter(
+                    RoomAssignmentLock.booking_id.in_(list(moves_by_id))
+                ).all()}
+                room_ids = {m['from_room_id'] for m in moves} | {m['to_room_id'] for m in moves}
+                rooms = {r.room_id: r for r in session.query(Room).filter(Room.room_id.in_(list(room_ids))).all()}
+                
+                if len(bookings) != len(moves_by_id):
+                    return False, 0, "Some bookings no longer exist; run the optimizer again"
+                for booking in bookings:
+                    move = moves_by_id[booking.booking_id]
+                    target = rooms.get(move['to_room_id'])
+                    if (booking.room_id != move['from_room_id']
+                            or booking.booking_status not in AvailabilityChecker.ACTIVE_BOOKING_STATUSES
+                            or booking.actual_check_in is not None or booking.booking_id in locked):
+                        return False, 0, f"Booking {booking.booking_reference} changed since the plan was made; run the optimizer again"
+                    if (target is None or target.status == 'maintenance'
+                            or target.room_type != rooms[booking.room_id].room_type
+                            or target.capacity < booking.num_guests):
+                        return False, 0, f"Room for booking {booking.booking_reference} is no longer suitable"
+                
+                now = datetime.utcnow()
+                session.bulk_update_mappings(Booking, [
+                    {'booking_id': booking_id, 'room_id': move['to_room_id'], 'updated_at': now}
+                    for booking_id, move in moves_by_id.items()
+                ])
+                session.flush()
+                
+                # Overlaps are checked after the update so swaps within the plan are allowed
+                moved_ids = list(moves_by_id)
+                active = AvailabilityChecker.ACTIVE_BOOKING_STATUSES
+                first, second = aliased(Booking), aliased(Booking)
+                clash = session.query(first.booking_reference, second.booking_reference).filter(
+                    first.room_id.in_(list(room_ids)),
+                    second.room_id == first.room_id,
+                    first.booking_id < second.booking_id,
+                    or_(first.booking_id.in_(moved_ids), second.booking_id.in_(moved_ids)),
+                    first.booking_status.in_(active),
+                    second.booking_status.in_(active),
+                    first.check_in_date < second.check_out_date,
+                    second.check_in_date < first.check_out_date
+                ).first()
+                if clash is None:
+                    clash = session.query(Booking.booking_reference, RoomBlock.reason).join(
+                        RoomBlock, RoomBlock.room_id == Booking.room_id
+                    ).filter(
+                        Booking.booking_id.in_(moved_ids),
+                        RoomBlock.start_date < Booking.check_out_date,
+                        RoomBlock.end_date > Booking.check_in_date
+                    ).first()
+                if clash is not None:
+                    session.rollback()
+                    return False, 0, f"Booking {clash[0]} would overlap another stay or block; run the optimizer again"
+                
+                for booking in bookings:
+                    move = moves_by_id[booking.booking_id]
+                    DatabaseManager.log_action(
+                        admin_id, 'booking_room_reassign',
+                        f"Booking {booking.booking_reference} moved from room {rooms[move['from_room_id']].room_number} "
+                        f"to room {rooms[move['to_room_id']].room_number}",
+                        session=session
+                    )
+                session.commit()
+            
+            search_cache.invalidate_range(min(m['check_in'] for m in moves), max(m['check_out'] for m in moves))
+            for room_id in room_ids:
+                housekeeping_queue.mark_arrival_changed(room_id)
+            return True, len(moves), f"{len(moves)} booking(s) reassigned"
+        
+        except Exception as e:
+            return False, 0, str(e)
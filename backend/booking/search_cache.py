@@ -0,0 +1,106 @@
+"""
+Search result cache.
+Bounded LRU of search results (ordered matching room ids, facet counts)
+keyed by the normalized query.
+Booking and block writes drop only entries whose dates overlap the change;
+room writes bump the catalog version, which retires every entry.
+"""
+
+from backend.room.room_catalog import room_catalog
+from collections import OrderedDict
+import threading
+import time
+import config
+
+
+class SearchCache:
+    """LRU/TTL cache of search results with hit-rate and latency counters."""
+    
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = config.SEARCH_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl = config.SEARCH_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (results, catalog_version, stored_at)
+        self._generation = 0  # bumped by every invalidation
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0, 'evicted': 0,
+                      'hit_seconds': 0.0, 'miss_seconds': 0.0}
+    
+    @staticmethod
+    def make_key(check_in, check_out, num_guests, min_price=None, max_price=None, room_types=None,
+                 amenities=None, floor_numbers=None, view_types=None, sort_by='price_low', kind='rooms'):
+        """Normalize search parameters; list filters are order-insensitive. kind names the result type."""
+        def norm(values):
+            return tuple(sorted(set(values))) if values else ()
+        
+        return (check_in, check_out, num_guests, min_price, max_price, norm(room_types),
+                norm(amenities), norm(floor_numbers), norm(view_types), sort_by, kind)
+    
+    def get_or_search(self, key, search):
+        """
+        Return cached results for key, or call search() and cache what it returns.
+        Results are shared between callers and must not be modified.
+        """
+        start = time.perf_counter()
+        version = room_catalog.version
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == version and not self._expired(entry):
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                results = entry[0]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                results = None
+                generation = self._generation
+        
+        if results is None:
+            results = search()
+            with self._lock:
+                # An invalidation during the search may have made results stale
+                if generation == self._generation and self.max_entries > 0:
+                    self._entries[key] = (results, version, time.monotonic())
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.stats['evicted'] += 1
+                self.stats['misses'] += 1
+                self.stats['miss_seconds'] += time.perf_counter() - start
+        else:
+            with self._lock:
+                self.stats['hit_seconds'] += time.perf_counter() - start
+        
+        return results
+    
+    def _expired(self, entry):
+        return self.ttl > 0 and time.monotonic() - entry[2] > self.ttl
+    
+    def invalidate_range(self, start, end):
+        """Drop entries whose stay overlaps [start, end) after a booking or block change."""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key in self._entries if key[0] < end and key[1] > start]
+            for key in stale:
+                del self._entries[key]
+            self.stats['invalidated'] += len(stale)
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._generation += 1
+            self.stats['invalidated'] += len(self._entries)
+            self._entries.clear()
+    
+    def get_stats(self):
+        """Counters plus hit rate and average hit/miss latency in milliseconds."""
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups * 100, 2) if lookups else 0.0
+        stats['avg_hit_ms'] = round(stats['hit_seconds'] / stats['hits'] * 1000, 3) if stats['hits'] else 0.0
+        stats['avg_miss_ms'] = round(stats['miss_seconds'] / stats['misses'] * 1000, 3) if stats['misses'] else 0.0
+        return stats
+
+
+# Process-wide cache shared by all Streamlit sessions
+search_cache = SearchCache()
@@ -6,6 +6,8 @@ Sends payment receipt emails.
 
 from database.db_manager import get_db_session
 from database.models import Payment, Booking, User
+from backend.user.user_manager import UserManager
+from backend.room.room_type_inventory import RoomTypeInventory
 from utils.helpers import generate_transaction_id
 from datetime import datetime
 
@@ -42,7 +44,10 @@ class PaymentProcessor:
                     # Update booking status
                     booking = session.query(Booking).filter_by(booking_id=booking_id).first()
                     if booking:
+                        old_status = booking.booking_status
                         booking.booking_status = 'confirmed'
+                        UserManager.apply_booking_status_change(session, booking, old_status)
+                        RoomTypeInventory.apply_booking_change(session, booking, old_status)
                         
                         # Get user for email
                         user = session.query(User).filter_by(user_id=booking.user_id).first()
@@ -0,0 +1,223 @@
+"""
+Housekeeping turnover queue.
+Rooms in 'cleaning' wait in a heap ordered by their next arrival, so staff
+always turn the room needed soonest. The queue follows the room status
+change feed instead of rescanning rooms, and looks up next arrivals only
+for queued rooms.
+"""
+
+from database.db_manager import get_db_session
+from database.models import Room, Booking
+from backend.room.inventory_manager import InventoryManager
+from sqlalchemy import func
+from datetime import datetime, date
+import heapq
+import threading
+import time
+import config
+
+
+class HousekeepingQueue:
+    """Priority queue of rooms awaiting cleaning, with staff claims."""
+    
+    NO_ARRIVAL = datetime.max
+    
+    def __init__(self, arrival_refresh=None):
+        self.arrival_refresh = (config.HOUSEKEEPING_ARRIVAL_REFRESH_SECONDS
+                                if arrival_refresh is None else arrival_refresh)
+        self._lock = threading.RLock()
+        self._entries = {}  # room_id -> entry dict
+        self._heap = []  # (next_arrival, room_number, version, room_id); unclaimed rooms only
+        self._last_seq = None  # None until first load
+        self._stale = set()  # room_ids whose next arrival must be re-read
+        self._refreshed_at = 0.0
+    
+    def sync(self):
+        """Apply status changes since the last sync (full load on first use)."""
+        with self._lock:
+            if self._last_seq is None:
+                self._load()
+            else:
+                while True:
+                    feed = InventoryManager.get_status_changes(self._last_seq)
+                    if feed['reset']:
+                        self._load()
+                        break
+                    for change in feed['changes']:
+                        self._apply_change(change)
+                    self._last_seq = feed['last_seq']
+                    if len(feed['changes']) < config.ROOM_STATUS_FEED_LIMIT:
+                        break
+            
+            if self.arrival_refresh and time.monotonic() - self._refreshed_at > self.arrival_refresh:
+                self._stale.update(self._entries)
+            if self._stale:
+                self._refresh_arrivals()
+    
+    def mark_arrival_changed(self, room_id):
+        """Note that a booking for room_id changed; its priority is re-read on next sync."""
+        with self._lock:
+            if room_id in self._entries:
+                self._stale.add(room_id)
+    
+    def _load(self):
+        """Load every room currently in cleaning (indexed on rooms.status)."""
+        # Read the feed position first; replaying changes after it is idempotent
+        last_seq = InventoryManager.get_latest_seq()
+        with get_db_session() as session:
+            rooms = session.query(Room.room_id, Room.room_number).filter(Room.status == 'cleaning').all()
+        
+        claims = {room_id: e for room_id, e in self._entries.items() if e['claimed_by'] is not None}
+        self._entries = {}
+        self._heap = []
+        for room in rooms:
+            self._add(room.room_id, room.room_number)
+            if room.room_id in claims:
+                self._entries[room.room_id]['claimed_by'] = claims[room.room_id]['claimed_by']
+                self._entries[room.room_id]['claimed_at'] = claims[room.room_id]['claimed_at']
+        self._last_seq = last_seq
+    
+    def _apply_change(self, change):
+        if change['new_status'] == 'cleaning':
+            if change['room_id'] not in self._entries:
+                self._add(change['room_id'], change['room_number'])
+        elif change['old_status'] == 'cleaning':
+            self._entries.pop(change['room_id'], None)
+            self._stale.discard(change['room_id'])
+    
+    def _add(self, room_id, room_number):
+        self._entries[room_id] = {
+            'room_id': room_id,
+            'room_number': room_number,
+            'next_arrival': None,
+            'queued_at': datetime.utcnow(),
+            'claimed_by': None,
+            'claimed_at': None,
+            'version': 0
+        }
+        self._stale.add(room_id)
+    
+    def _refresh_arrivals(self):
+        """Re-read next arrivals for stale rooms with one grouped query."""
+        room_ids = [room_id for room_id in self._stale if room_id in self._entries]
+        self._stale = set()
+        self._refreshed_at = time.monotonic()
+        if not room_ids:
+            return
+        
+        today = datetime.combine(date.today(), datetime.min.time())
+        with get_db_session() as session:
+            arrivals = dict(session.query(Booking.room_id, func.min(Booking.check_in_date)).filter(
+                Booking.room_id.in_(room_ids),
+                Booking.check_in_date >= today,
+                Booking.booking_status.in_(['confirmed', 'pending']),
+                Booking.actual_check_in.is_(None)
+            ).group_by(Booking.room_id).all())
+        
+        for room_id in room_ids:
+            entry = self._entries[room_id]
+            arrival = arrivals.get(room_id)
+            if entry['version'] == 0 or arrival != entry['next_arrival']:
+                entry['next_arrival'] = arrival
+                self._push(entry)
+    
+    def _push(self, entry):
+        """(Re)queue entry; older heap items for it become stale."""
+        entry['version'] += 1
+        if entry['claimed_by'] is None:
+            heapq.heappush(self._heap, self._heap_item(entry))
+        
+        # Drop stale items once they dominate the heap
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [self._heap_item(e) for e in self._entries.values()
+                          if e['claimed_by'] is None and e['version'] > 0]
+            heapq.heapify(self._heap)
+    
+    def _heap_item(self, entry):
+        return (entry['next_arrival'] or self.NO_ARRIVAL, entry['room_number'], entry['version'], entry['room_id'])
+    
+    def _is_current(self, item):
+        entry = self._entries.get(item[3])
+        return entry is not None and entry['version'] == item[2] and entry['claimed_by'] is None
+    
+    def get_queue(self):
+        """
+        Get rooms awaiting cleaning, most urgent first.
+        Returns dict with 'queue' (unclaimed, in priority order) and
+        'claimed' (rooms being cleaned), each a list of dicts.
+        """
+        with self._lock:
+            self.sync()
+            queue = [self._public(self._entries[item[3]])
+                     for item in sorted(self._heap) if self._is_current(item)]
+            claimed = sorted(
+                (self._public(e) for e in self._entries.values() if e['claimed_by'] is not None),
+                key=lambda e: (e['next_arrival'] or self.NO_ARRIVAL, e['room_number'])
+            )
+            return {'queue': queue, 'claimed': claimed}
+    
+    def claim_next(self, staff_id):
+        """
+        Claim the most urgent unclaimed room for staff_id.
+        Returns the room dict, or None if nothing is waiting.
+        """
+        with self._lock:
+            self.sync()
+            while self._heap:
+                item = heapq.heappop(self._heap)
+                if self._is_current(item):
+                    return self._claim(self._entries[item[3]], staff_id)
+            return None
+    
+    def claim(self, room_id, staff_id):
+        """Claim a specific room. Returns: (success, message)"""
+        with self._lock:
+            self.sync()
+            entry = self._entries.get(room_id)
+            if entry is None:
+                return False, "Room is not waiting for cleaning"
+            if entry['claimed_by'] is not None:
+                return False, "Room already claimed"
+            self._claim(entry, staff_id)
+            return True, f"Room {entry['room_number']} claimed"
+    
+    def _claim(self, entry, staff_id):
+        entry['claimed_by'] = staff_id
+        entry['claimed_at'] = datetime.utcnow()
+        entry['version'] += 1  # invalidates its heap item
+        return self._public(entry)
+    
+    def release(self, room_id):
+        """Put a claimed room back in the queue. Returns: (success, message)"""
+        with self._lock:
+            entry = self._entries.get(room_id)
+            if entry is None or entry['claimed_by'] is None:
+                return False, "Room is not claimed"
+            entry['claimed_by'] = None
+            entry['claimed_at'] = None
+            self._push(entry)
+            return True, f"Room {entry['room_number']} returned to queue"
+    
+    def complete(self, room_ids):
+        """
+        Mark rooms clean: flip them from cleaning to available in one
+        transaction and drop them from the queue.
+        Returns: (success, rooms_completed, message)
+        """
+        success, count, message = InventoryManager.bulk_update_status(
+            list(room_ids), 'available', expected_status='cleaning'
+        )
+        if success:
+            with self._lock:
+                for room_id in room_ids:
+                    self._entries.pop(room_id, None)
+                    self._stale.discard(room_id)
+        return success, count, message
+    
+    @staticmethod
+    def _public(entry):
+        return {key: value for key, value in entry.items() if key != 'version'}
+
+
+# Process-wide queue shared by all Streamlit sessions
+housekeeping_queue = HousekeepingQueue()
@@ -1,10 +1,18 @@
 """
 Room inventory tracking.
 Manages room status and availability.
+Status counts are kept in room_status_counts and every transition is
+appended to room_status_changes, so boards read counts in one query and
+poll only the changes after the last sequence number they saw.
 """
 
 from database.db_manager import get_db_session
-from database.models import Room
+from database.models import Room, RoomStatusCount, RoomStatusChange
+from backend.room.room_catalog import room_catalog
+from utils.constants import RoomStatus
+from sqlalchemy import func
+from datetime import datetime, timedelta
+import config
 
 
 class InventoryManager:
@@ -19,31 +27,211 @@ class InventoryManager:
                 if not room:
                     return False, "Room not found"
                 
-                room.status = new_status
+                InventoryManager.set_room_status(session, room, new_status)
                 session.commit()
+                room_catalog.invalidate()
                 return True, f"Room status updated to {new_status}"
         except Exception as e:
             return False, str(e)
     
     @staticmethod
-    def get_inventory_summary():
-        """Get summary of room inventory by status."""
+    def bulk_update_status(room_ids, new_status, expected_status=None):
+        """
+        Set many rooms to new_status in one transaction. With expected_status,
+        only rooms currently in that status change (others are left alone).
+        Returns: (success, rooms_changed, message)
+        """
+        if not room_ids:
+            return True, 0, "No rooms to update"
+        
         try:
             with get_db_session() as session:
-                rooms = session.query(Room).all()
+                query = session.query(Room.room_id, Room.room_number, Room.status).filter(
+                    Room.room_id.in_(room_ids),
+                    Room.status != new_status
+                )
+                if expected_status is not None:
+                    query = query.filter(Room.status == expected_status)
+                rooms = query.all()
+                if not rooms:
+                    return True, 0, "No rooms needed updating"
                 
-                summary = {
-                    'total': len(rooms),
-                    'available': sum(1 for r in rooms if r.status == 'available'),
-                    'occupied': sum(1 for r in rooms if r.status == 'occupied'),
-                    'maintenance': sum(1 for r in rooms if r.status == 'maintenance'),
-                    'cleaning': sum(1 for r in rooms if r.status == 'cleaning')
-                }
+                session.query(Room).filter(
+                    Room.room_id.in_([r.room_id for r in rooms])
+                ).update({Room.status: new_status}, synchronize_session=False)
                 
-                return summary
+                for room in rooms:
+                    InventoryManager.record_status_change(session, room.room_id, room.room_number,
+                                                          room.status, new_status)
+                session.commit()
+                room_catalog.invalidate()
+                return True, len(rooms), f"{len(rooms)} room(s) set to {new_status}"
+        except Exception as e:
+            return False, 0, str(e)
+    
+    @staticmethod
+    def set_room_status(session, room, new_status):
+        """Change room.status and record the transition in the caller's transaction."""
+        old_status = room.status
+        room.status = new_status
+        InventoryManager.record_status_change(session, room.room_id, room.room_number, old_status, new_status)
+    
+    @staticmethod
+    def record_status_change(session, room_id, room_number, old_status, new_status):
+        """
+        Move one room between status counts and append to the change feed.
+        old_status is None for a new room, new_status None for a deleted one.
+        The room change must be flushable; missing count rows are rebuilt.
+        """
+        if old_status == new_status:
+            return
+        
+        rebuild = False
+        for status, delta in ((old_status, -1), (new_status, 1)):
+            if status is None:
+                continue
+            updated = session.query(RoomStatusCount).filter_by(status=status).update({
+                RoomStatusCount.room_count: RoomStatusCount.room_count + delta,
+                RoomStatusCount.updated_at: datetime.utcnow()
+            }, synchronize_session=False)
+            rebuild = rebuild or not updated
+        
+        if rebuild:
+            session.flush()
+            InventoryManager._rebuild_counts(session)
+        
+        session.add(RoomStatusChange(
+            room_id=room_id,
+            room_number=room_number,
+            old_status=old_status,
+            new_status=new_status
+        ))
+    
+    @staticmethod
+    def _rebuild_counts(session):
+        """Replace all status counts with one GROUP BY over rooms."""
+        counts = dict(session.query(Room.status, func.count(Room.room_id)).group_by(Room.status).all())
+        session.query(RoomStatusCount).delete(synchronize_session=False)
+        for status in set(RoomStatus.get_all()) | set(counts):
+            session.add(RoomStatusCount(status=status, room_count=counts.get(status, 0)))
+        session.flush()
+        return counts
+    
+    @staticmethod
+    def rebuild_status_counts():
+        """
+        Rebuild status counts from the rooms table.
+        Returns: (success, message)
+        """
+        try:
+            with get_db_session() as session:
+                counts = InventoryManager._rebuild_counts(session)
+                return True, f"Status counts rebuilt for {sum(counts.values())} rooms"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def _read_summary(session):
+        """Status counts as the summary dict, rebuilding them if never built."""
+        counts = dict(session.query(RoomStatusCount.status, RoomStatusCount.room_count).all())
+        if not counts:
+            counts = InventoryManager._rebuild_counts(session)
+        
+        summary = {status: counts.get(status, 0) for status in RoomStatus.get_all()}
+        summary['total'] = sum(counts.values())
+        return summary
+    
+    @staticmethod
+    def _read_changes(session, since_seq, limit):
+        """Changes after since_seq as the feed dict (see get_status_changes)."""
+        rows = session.query(RoomStatusChange).filter(
+            RoomStatusChange.seq > since_seq
+        ).order_by(RoomStatusChange.seq).limit(limit).all()
+        
+        reset = False
+        if since_seq and rows and rows[0].seq > since_seq + 1:
+            # A gap right after since_seq means the caller's position was pruned
+            first_kept = session.query(func.min(RoomStatusChange.seq)).scalar()
+            reset = first_kept is not None and first_kept > since_seq + 1
+        
+        return {
+            'changes': [{
+                'seq': r.seq,
+                'room_id': r.room_id,
+                'room_number': r.room_number,
+                'old_status': r.old_status,
+                'new_status': r.new_status,
+                'changed_at': r.changed_at
+            } for r in rows],
+            'last_seq': rows[-1].seq if rows else since_seq,
+            'reset': reset
+        }
+    
+    @staticmethod
+    def get_inventory_summary():
+        """Get summary of room inventory by status (one read of the status counts)."""
+        try:
+            with get_db_session() as session:
+                return InventoryManager._read_summary(session)
         except:
             return {}
     
+    @staticmethod
+    def get_status_changes(since_seq=0, limit=None):
+        """
+        Get room status changes after since_seq, oldest first.
+        Returns dict with 'changes' (list of dicts), 'last_seq' (pass back on the
+        next poll) and 'reset' (True if changes were pruned past since_seq and
+        the caller should reload the full board).
+        """
+        try:
+            with get_db_session() as session:
+                return InventoryManager._read_changes(session, since_seq, limit or config.ROOM_STATUS_FEED_LIMIT)
+        except Exception as e:
+            print(f"Error getting status changes: {e}")
+            return {'changes': [], 'last_seq': since_seq, 'reset': False}
+    
+    @staticmethod
+    def get_latest_seq():
+        """Sequence number of the newest status change (0 if none)."""
+        try:
+            with get_db_session() as session:
+                return session.query(func.max(RoomStatusChange.seq)).scalar() or 0
+        except:
+            return 0
+    
+    @staticmethod
+    def get_status_board(since_seq=0, limit=None):
+        """
+        Get current status counts plus changes after since_seq in one transaction.
+        Returns dict with 'summary' and the get_status_changes() keys.
+        """
+        try:
+            with get_db_session() as session:
+                board = InventoryManager._read_changes(session, since_seq, limit or config.ROOM_STATUS_FEED_LIMIT)
+                board['summary'] = InventoryManager._read_summary(session)
+                return board
+        except Exception as e:
+            print(f"Error getting status board: {e}")
+            return {'changes': [], 'last_seq': since_seq, 'reset': False, 'summary': {}}
+    
+    @staticmethod
+    def prune_status_changes(retention_days=None):
+        """
+        Delete change feed entries older than the retention window.
+        Returns: (success, deleted_count)
+        """
+        days = retention_days if retention_days is not None else config.ROOM_STATUS_CHANGE_RETENTION_DAYS
+        try:
+            with get_db_session() as session:
+                deleted = session.query(RoomStatusChange).filter(
+                    RoomStatusChange.changed_at < datetime.utcnow() - timedelta(days=days)
+                ).delete(synchronize_session=False)
+                return True, deleted
+        except Exception as e:
+            print(f"Error pruning status changes: {e}")
+            return False, 0
+    
     @staticmethod
     def get_rooms_by_floor(floor_number):
         """Get all rooms on specific floor."""
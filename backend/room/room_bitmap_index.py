@@ -0,0 +1,155 @@
+"""
+Bitmap index over a room catalog snapshot.
+Rooms are numbered by their position in the snapshot; every amenity, type,
+view, floor, status and capacity value maps to an int bitset of positions,
+so a multi-criteria filter is a few bitwise ANDs/ORs. Result orderings are
+precomputed position lists, so sorted matches never re-sort room objects.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import compress
+
+_DIGIT_TO_FLAG = bytes.maketrans(b'01', b'\x00\x01')
+
+
+def _to_bitset(positions, size):
+    """Build an int bitset from positions in O(size) (bit i = position i)."""
+    buf = bytearray((size + 7) // 8)
+    for pos in positions:
+        buf[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def _group_bits(rooms, key):
+    """Map each value of key(room) to the bitset of rooms having it."""
+    groups = {}
+    for pos, room in enumerate(rooms):
+        groups.setdefault(key(room), []).append(pos)
+    return {value: _to_bitset(positions, len(rooms)) for value, positions in groups.items()}
+
+
+class RoomBitmapIndex:
+    """Immutable bitsets over a sequence of rooms (CatalogRoom or similar)."""
+    
+    def __init__(self, rooms):
+        self.rooms = tuple(rooms)
+        size = len(self.rooms)
+        self.all_bits = (1 << size) - 1
+        
+        # Dictionary-encode amenities: name -> code, code -> bitset
+        self.amenity_codes = {}
+        amenity_positions = []
+        for pos, room in enumerate(self.rooms):
+            for amenity in room.amenities or ():
+                code = self.amenity_codes.setdefault(amenity, len(amenity_positions))
+                if code == len(amenity_positions):
+                    amenity_positions.append([])
+                amenity_positions[code].append(pos)
+        self.amenity_bits = [_to_bitset(positions, size) for positions in amenity_positions]
+        
+        self.type_bits = _group_bits(self.rooms, lambda r: r.room_type)
+        self.view_bits = _group_bits(self.rooms, lambda r: r.view_type)
+        self.floor_bits = _group_bits(self.rooms, lambda r: r.floor_number)
+        self.status_bits = _group_bits(self.rooms, lambda r: r.status)
+        self.capacity_bits = _group_bits(self.rooms, lambda r: r.capacity)
+        self.positions = {room.room_id: pos for pos, room in enumerate(self.rooms)}
+        
+        # Sort orders as positions; sorts are stable, so ties keep snapshot order
+        positions = range(size)
+        by_price = sorted(positions, key=lambda p: self.rooms[p].base_price_per_night)
+        self.sorted_prices = [self.rooms[p].base_price_per_night for p in by_price]
+        self.orders = {
+            'price_low': tuple(by_price),
+            'price_high': tuple(sorted(positions, key=lambda p: self.rooms[p].base_price_per_night, reverse=True)),
+            'capacity': tuple(sorted(positions, key=lambda p: self.rooms[p].capacity, reverse=True)),
+            'room_number': tuple(positions)
+        }
+        self._price_buckets = {}  # width -> buckets, built on first use
+    
+    @staticmethod
+    def _any_of(bits_by_value, values):
+        """OR of the bitsets for values (unknown values match nothing)."""
+        mask = 0
+        for value in values:
+            mask |= bits_by_value.get(value, 0)
+        return mask
+    
+    def criterion_masks(self, status=None, room_types=None, view_types=None, floor_numbers=None,
+                        amenities=None, min_capacity=None):
+        """
+        Bitset per given criterion, keyed by argument name (unset criteria are
+        omitted). Facet counts combine all but one of them.
+        """
+        masks = {}
+        if status is not None:
+            masks['status'] = self.status_bits.get(status, 0)
+        if room_types:
+            masks['room_types'] = self._any_of(self.type_bits, room_types)
+        if view_types:
+            masks['view_types'] = self._any_of(self.view_bits, view_types)
+        if floor_numbers:
+            masks['floor_numbers'] = self._any_of(self.floor_bits, floor_numbers)
+        if min_capacity:
+            masks['min_capacity'] = self._any_of(
+                self.capacity_bits, [c for c in self.capacity_bits if c is not None and c >= min_capacity]
+            )
+        if amenities:
+            mask = self.all_bits
+            for amenity in amenities:
+                code = self.amenity_codes.get(amenity)
+                mask &= self.amenity_bits[code] if code is not None else 0
+            masks['amenities'] = mask
+        return masks
+    
+    def match(self, status=None, room_types=None, view_types=None, floor_numbers=None,
+              amenities=None, min_capacity=None):
+        """
+        Return the bitset of rooms matching every given criterion.
+        List criteria match any listed value; amenities must all be present.
+        """
+        mask = self.all_bits
+        for criterion in self.criterion_masks(status, room_types, view_types, floor_numbers,
+                                              amenities, min_capacity).values():
+            mask &= criterion
+        return mask
+    
+    def price_bucket_bits(self, width):
+        """List of (low, high, bitset) for non-empty price buckets [low, high) of the given width."""
+        buckets = self._price_buckets.get(width)
+        if buckets is None:
+            groups = _group_bits(self.rooms, lambda r: int(r.base_price_per_night // width))
+            buckets = [(b * width, (b + 1) * width, bits) for b, bits in sorted(groups.items())]
+            self._price_buckets[width] = buckets
+        return buckets
+    
+    def price_bits(self, min_price=None, max_price=None):
+        """Bitset of rooms priced within [min_price, max_price] (either bound optional)."""
+        if min_price is None and max_price is None:
+            return self.all_bits
+        
+        order = self.orders['price_low']
+        lo = bisect_left(self.sorted_prices, min_price) if min_price is not None else 0
+        hi = bisect_right(self.sorted_prices, max_price) if max_price is not None else len(order)
+        return _to_bitset(order[lo:hi], len(self.rooms))
+    
+    def bits_for(self, room_ids):
+        """Bitset of the given room ids (ids not in the index are ignored)."""
+        return _to_bitset([self.positions[i] for i in room_ids if i in self.positions], len(self.rooms))
+    
+    @staticmethod
+    def _selectors(mask):
+        # '0'/'1' digits, least significant bit first, as 0/1 selector bytes
+        return bin(mask)[:1:-1].encode('ascii').translate(_DIGIT_TO_FLAG)
+    
+    def rooms_for(self, mask):
+        """Rooms whose bits are set in mask, in snapshot order."""
+        return list(compress(self.rooms, self._selectors(mask)))
+    
+    def ordered(self, mask, sort_by='room_number'):
+        """Rooms whose bits are set in mask, in one of the precomputed orders."""
+        order = self.orders.get(sort_by)
+        if order is None or sort_by == 'room_number':
+            return self.rooms_for(mask)
+        
+        selectors = self._selectors(mask).ljust(len(self.rooms), b'\x00')
+        return [self.rooms[p] for p in order if selectors[p]]
@@ -0,0 +1,123 @@
+"""
+Room block management.
+Date-ranged out-of-order periods (maintenance, renovation). A block makes a
+room unavailable only between its dates, so planned work needs no status
+flipping; availability checks treat blocks like bookings. Block edges sit at
+check-out time, so a block covers whole nights: a guest may leave on its
+first day and arrive on its last.
+"""
+
+from database.db_manager import get_db_session
+from database.models import Room, Booking, RoomBlock
+from backend.booking.search_cache import search_cache
+from backend.room.room_type_inventory import RoomTypeInventory
+from datetime import datetime, time
+import config
+
+
+class RoomBlockManager:
+    """Manages room blocks."""
+    
+    @staticmethod
+    def at_check_out(value):
+        """Check-out time on value's date (value a date or datetime)."""
+        day = value.date() if isinstance(value, datetime) else value
+        return datetime.combine(day, time(config.CHECK_OUT_HOUR))
+    
+    @staticmethod
+    def create_block(room_id, start_date, end_date, reason="", admin_id=None):
+        """
+        Block a room for the nights from start_date up to (not including)
+        end_date. Both are dates (a datetime's time is ignored) and are stored
+        at check-out time. Fails if a confirmed/pending booking overlaps.
+        Returns: (success, block_id, message)
+        """
+        start_date = RoomBlockManager.at_check_out(start_date)
+        end_date = RoomBlockManager.at_check_out(end_date)
+        if end_date <= start_date:
+            return False, None, "Block end must be after its start"
+        
+        try:
+            with get_db_session() as session:
+                room = session.query(Room).filter_by(room_id=room_id).first()
+                if not room:
+                    return False, None, "Room not found"
+                
+                conflicts = session.query(Booking.booking_reference).filter(
+                    Booking.room_id == room_id,
+                    Booking.booking_status.in_(['confirmed', 'pending']),
+                    Booking.check_in_date < end_date,
+                    Booking.check_out_date > start_date
+                ).all()
+                if conflicts:
+                    refs = ", ".join(c.booking_reference for c in conflicts)
+                    return False, None, f"Room {room.room_number} has bookings in this range: {refs}"
+                
+                overlapping = session.query(RoomBlock.block_id).filter(
+                    RoomBlock.room_id == room_id,
+                    RoomBlock.start_date < end_date,
+                    RoomBlock.end_date > start_date
+                ).first()
+                if overlapping:
+                    return False, None, f"Room {room.room_number} is already blocked in this range"
+                
+                block = RoomBlock(
+                    room_id=room_id,
+                    start_date=start_date,
+                    end_date=end_date,
+                    reason=reason,
+                    created_by=admin_id
+                )
+                session.add(block)
+                RoomTypeInventory.apply_block_change(session, room.room_type, start_date, end_date, 1)
+                session.commit()
+                search_cache.invalidate_range(start_date, end_date)
+                return True, block.block_id, f"Room {room.room_number} blocked"
+        except Exception as e:
+            return False, None, str(e)
+    
+    @staticmethod
+    def delete_block(block_id):
+        """Remove a block. Returns: (success, message)"""
+        try:
+            with get_db_session() as session:
+                block = session.query(RoomBlock).filter_by(block_id=block_id).first()
+                if not block:
+                    return False, "Block not found"
+                start_date, end_date = block.start_date, block.end_date
+                room_type = session.query(Room.room_type).filter_by(room_id=block.room_id).scalar()
+                session.delete(block)
+                RoomTypeInventory.apply_block_change(session, room_type, start_date, end_date, -1)
+                session.commit()
+                search_cache.invalidate_range(start_date, end_date)
+                return True, "Block removed"
+        except Exception as e:
+            return False, str(e)
+    
+    @staticmethod
+    def get_blocks(room_id=None, include_past=False):
+        """
+        Get blocks ordered by start date, current and future only unless
+        include_past. Returns list of dicts.
+        """
+        try:
+            with get_db_session() as session:
+                query = session.query(RoomBlock, Room.room_number).join(Room, Room.room_id == RoomBlock.room_id)
+                if room_id is not None:
+                    query = query.filter(RoomBlock.room_id == room_id)
+                if not include_past:
+                    query = query.filter(RoomBlock.end_date > datetime.now())
+                
+                return [{
+                    'block_id': block.block_id,
+                    'room_id': block.room_id,
+                    'room_number': room_number,
+                    'start_date': block.start_date,
+                    'end_date': block.end_date,
+                    'reason': block.reason,
+                    'created_by': block.created_by,
+                    'created_at': block.created_at
+                } for block, room_number in query.order_by(RoomBlock.start_date, Room.room_number).all()]
+        except Exception as e:
+            print(f"Error getting room blocks: {e}")
+            return []
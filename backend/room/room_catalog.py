@@ -0,0 +1,149 @@
+"""
+Room catalog cache.
+Process-wide immutable snapshot of the rooms table with precomputed filter
+options. Writers bump the version; readers swap to a new snapshot lazily.
+"""
+
+from database.db_manager import get_db_session
+from database.models import Room
+from backend.room.room_bitmap_index import RoomBitmapIndex
+from dataclasses import dataclass
+from types import MappingProxyType
+import threading
+import time
+import config
+
+
+@dataclass(frozen=True)
+class CatalogRoom:
+    """Read-only copy of a room row (same attribute names as Room)."""
+    room_id: int
+    room_number: str
+    room_type: str
+    capacity: int
+    base_price_per_night: float
+    description: str
+    amenities: tuple
+    floor_number: int
+    view_type: str
+    status: str
+    images: tuple
+    
+    def to_dict(self):
+        """Return a new mutable dictionary with list-valued amenities/images."""
+        return {
+            'room_id': self.room_id,
+            'room_number': self.room_number,
+            'room_type': self.room_type,
+            'capacity': self.capacity,
+            'base_price_per_night': self.base_price_per_night,
+            'description': self.description,
+            'amenities': list(self.amenities),
+            'floor_number': self.floor_number,
+            'view_type': self.view_type,
+            'status': self.status,
+            'images': list(self.images)
+        }
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One version of the catalog. Never modified after it is built."""
+    version: int
+    rooms: tuple  # CatalogRoom, ordered by room_number
+    by_id: MappingProxyType
+    filter_options: MappingProxyType
+    index: RoomBitmapIndex
+    built_at: float
+
+
+class RoomCatalog:
+    """Versioned room catalog; reads are lock-free once a snapshot is current."""
+    
+    def __init__(self, max_age=None):
+        self.max_age = config.ROOM_CATALOG_MAX_AGE_SECONDS if max_age is None else max_age
+        self._version = 0
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'builds': 0}
+    
+    @property
+    def version(self):
+        return self._version
+    
+    def invalidate(self):
+        """Bump the version after a committed room change."""
+        with self._lock:
+            self._version += 1
+    
+    def snapshot(self):
+        """Return the current snapshot, rebuilding it if a write bumped the version."""
+        snap = self._snapshot
+        if snap is not None and snap.version == self._version and not self._expired(snap):
+            self.stats['hits'] += 1
+            return snap
+        
+        with self._lock:
+            snap = self._snapshot
+            if snap is not None and snap.version == self._version and not self._expired(snap):
+                return snap
+            # Snapshot carries the version read before loading; a write during the
+            # load leaves it stale and the next reader rebuilds
+            version = self._version
+        
+        snap = self._build(version)
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version <= version:
+                self._snapshot = snap
+        self.stats['builds'] += 1
+        return snap
+    
+    def _expired(self, snap):
+        # Safety net for rows changed outside this process (seed scripts, other workers)
+        return self.max_age > 0 and time.monotonic() - snap.built_at > self.max_age
+    
+    @staticmethod
+    def _build(version):
+        """Load every room once and precompute filter options and bitmap index."""
+        with get_db_session() as session:
+            rows = session.query(Room).order_by(Room.room_number).all()
+            rooms = tuple(CatalogRoom(
+                room_id=r.room_id,
+                room_number=r.room_number,
+                room_type=r.room_type,
+                capacity=r.capacity,
+                base_price_per_night=r.base_price_per_night,
+                description=r.description,
+                amenities=tuple(r.amenities or ()),
+                floor_number=r.floor_number,
+                view_type=r.view_type,
+                status=r.status,
+                images=tuple(r.images or ())
+            ) for r in rows)
+        
+        prices = [r.base_price_per_night for r in rooms]
+        amenities = set()
+        for room in rooms:
+            amenities.update(room.amenities)
+        
+        filter_options = {
+            'room_types': tuple(sorted({r.room_type for r in rooms})),
+            'view_types': tuple(sorted({r.view_type for r in rooms if r.view_type})),
+            'floors': tuple(sorted({r.floor_number for r in rooms if r.floor_number})),
+            'min_price': min(prices) if prices else 0,
+            'max_price': max(prices) if prices else 1000,
+            'amenities': tuple(sorted(amenities))
+        }
+        
+        return CatalogSnapshot(
+            version=version,
+            rooms=rooms,
+            by_id=MappingProxyType({r.room_id: r for r in rooms}),
+            filter_options=MappingProxyType(filter_options),
+            index=RoomBitmapIndex(rooms),
+            built_at=time.monotonic()
+        )
+
+
+# Process-wide catalog shared by all Streamlit sessions
+room_catalog = RoomCatalog()
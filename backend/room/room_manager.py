@@ -5,6 +5,9 @@ Manages room inventory and details.
 
 from database.db_manager import get_db_session, DatabaseManager
 from database.models import Room
+from backend.room.room_catalog import room_catalog
+from backend.room.inventory_manager import InventoryManager
+from backend.room.room_type_inventory import RoomTypeInventory
 from sqlalchemy.orm import Session
 
 
@@ -34,7 +37,10 @@ class RoomManager:
                 )
                 
                 session.add(new_room)
+                session.flush()
+                InventoryManager.record_status_change(session, new_room.room_id, room_number, None, new_room.status)
                 session.commit()
+                room_catalog.invalidate()
                 
                 return True, "Room created successfully"
         except Exception as e:
@@ -49,11 +55,18 @@ class RoomManager:
                 if not room:
                     return False, "Room not found"
                 
+                old_status = room.status
+                old_type = room.room_type
                 for key, value in kwargs.items():
                     if hasattr(room, key):
                         setattr(room, key, value)
                 
+                InventoryManager.record_status_change(session, room.room_id, room.room_number, old_status, room.status)
+                if room.room_type != old_type:
+                    # The room's bookings and blocks now count toward its new type
+                    RoomTypeInventory.apply_room_change(session, [old_type, room.room_type])
                 session.commit()
+                room_catalog.invalidate()
                 return True, "Room updated successfully"
         except Exception as e:
             return False, str(e)
@@ -68,7 +81,11 @@ class RoomManager:
                     return False, "Room not found"
                 
                 session.delete(room)
+                session.flush()
+                InventoryManager.record_status_change(session, room_id, room.room_number, room.status, None)
+                RoomTypeInventory.apply_room_change(session, [room.room_type])  # its bookings and blocks went with it
                 session.commit()
+                room_catalog.invalidate()
                 return True, "Room deleted successfully"
         except Exception as e:
             return False, str(e)
@@ -99,29 +116,20 @@ class RoomManager:
     
     @staticmethod
     def get_all_rooms(room_type=None, status=None):
-        """Get all rooms with optional filters."""
+        """
+        Get all rooms with optional filters, ordered by room number.
+        Served from the room catalog snapshot; items are read-only CatalogRoom
+        records with the same attributes as Room.
+        """
         try:
-            with get_db_session() as session:
-                query = session.query(Room)
-                
-                if room_type:
-                    query = query.filter_by(room_type=room_type)
-                if status:
-                    query = query.filter_by(status=status)
-                
-                rooms = query.all()
-                
-                # ✅ FIX: Force load all attributes
-                result = []
-                for room in rooms:
-                    _ = room.room_id
-                    _ = room.room_number
-                    _ = room.room_type
-                    _ = room.capacity
-                    _ = room.base_price_per_night
-                    result.append(room)
-                
-                return result
+            rooms = room_catalog.snapshot().rooms
+            
+            if room_type:
+                rooms = [r for r in rooms if r.room_type == room_type]
+            if status:
+                rooms = [r for r in rooms if r.status == status]
+            
+            return list(rooms)
         except Exception as e:
             print(f"Error getting rooms: {e}")
             return []
@@ -0,0 +1,207 @@
+"""
+Per-room-type nightly inventory.
+room_type_night_counts holds, for each room type and night, how many rooms
+are sold (confirmed/pending bookings) and blocked. Booking, check-out and
+block changes adjust the counts in their own transaction, so "how many
+Deluxe rooms are left each night" is one range read instead of per-room
+overlap checks. Rooms in service per type come from the room catalog, so
+status changes apply as soon as the catalog refreshes.
+"""
+
+from database.db_manager import get_db_session
+from database.models import Room, Booking, RoomBlock, RoomTypeNightCount
+from backend.booking.availability_checker import AvailabilityChecker
+from backend.room.room_catalog import room_catalog
+from datetime import datetime, timedelta
+from collections import Counter
+
+
+class RoomTypeInventory:
+    """Maintains and reads per-type nightly sold/blocked counts."""
+    
+    @staticmethod
+    def nights(start, end):
+        """Nights covered by a stay or block: each date from start up to end's date (at least one)."""
+        first = start.date() if isinstance(start, datetime) else start
+        last = end.date() if isinstance(end, datetime) else end
+        return [first + timedelta(days=i) for i in range(max((last - first).days, 1))]
+    
+    @staticmethod
+    def apply_booking_change(session, booking, old_status, room_type=None):
+        """
+        Count or uncount a booking's nights in the caller's transaction.
+        Call after booking.booking_status is set (old_status None for a new
+        booking); only moves into or out of confirmed/pending change counts.
+        """
+        active = AvailabilityChecker.ACTIVE_BOOKING_STATUSES
+        delta = int(booking.booking_status in active) - int(old_status in active)
+        if delta == 0:
+            return
+        
+        if room_type is None:
+            room_type = session.query(Room.room_type).filter_by(room_id=booking.room_id).scalar()
+        RoomTypeInventory._adjust(session, room_type, booking.check_in_date, booking.check_out_date, 'sold', delta)
+    
+    @staticmethod
+    def apply_block_change(session, room_type, start_date, end_date, delta):
+        """Count (delta 1) or uncount (delta -1) a block's nights in the caller's transaction."""
+        RoomTypeInventory._adjust(session, room_type, start_date, end_date, 'blocked', delta)
+    
+    @staticmethod
+    def apply_room_change(session, room_types):
+        """Recount room_types in the caller's transaction after a room changed type or was deleted."""
+        session.flush()
+        if RoomTypeInventory._is_built(session):
+            RoomTypeInventory._rebuild(session, room_types)
+    
+    @staticmethod
+    def _is_built(session):
+        """Counts are built on first use; an empty table means they never were."""
+        return session.query(RoomTypeNightCount.room_type).first() is not None
+    
+    @staticmethod
+    def _adjust(session, room_type, start, end, column, delta):
+        """Add delta to one counter over the nights of [start, end); counts are built on first use."""
+        session.flush()
+        if not RoomTypeInventory._is_built(session):
+            # A full build from the flushed rows already includes this change
+            RoomTypeInventory._rebuild(session)
+            return
+        
+        nights = RoomTypeInventory.nights(start, end)
+        in_range = (
+            RoomTypeNightCount.room_type == room_type,
+            RoomTypeNightCount.night >= nights[0],
+            RoomTypeNightCount.night <= nights[-1]
+        )
+        existing = {row[0] for row in session.query(RoomTypeNightCount.night).filter(*in_range).all()}
+        counter = getattr(RoomTypeNightCount, column)
+        session.query(RoomTypeNightCount).filter(*in_range).update({
+            counter: counter + delta,
+            RoomTypeNightCount.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+        for night in nights:
+            if night not in existing:
+                session.add(RoomTypeNightCount(room_type=room_type, night=night, **{
+                    'sold': 0, 'blocked': 0, column: delta
+                }))
+    
+    @staticmethod
+    def _expected_counts(session, room_types=None):
+        """Sold/blocked per (room_type, night) recomputed from bookings and blocks."""
+        bookings = session.query(Room.room_type, Booking.check_in_date, Booking.check_out_date).join(
+            Room, Room.room_id == Booking.room_id
+        ).filter(Booking.booking_status.in_(AvailabilityChecker.ACTIVE_BOOKING_STATUSES))
+        blocks = session.query(Room.room_type, RoomBlock.start_date, RoomBlock.end_date).join(
+            Room, Room.room_id == RoomBlock.room_id
+        )
+        if room_types is not None:
+            bookings = bookings.filter(Room.room_type.in_(room_types))
+            blocks = blocks.filter(Room.room_type.in_(room_types))
+        
+        sold, blocked = Counter(), Counter()
+        for counts, rows in ((sold, bookings.all()), (blocked, blocks.all())):
+            for room_type, start, end in rows:
+                counts.update((room_type, night) for night in RoomTypeInventory.nights(start, end))
+        return sold, blocked
+    
+    @staticmethod
+    def _rebuild(session, room_types=None):
+        """
+        Bring stored counts for room_types (all if None) in line with bookings
+        and blocks, touching only rows that differ.
+        Returns the number of rows inserted, updated or deleted. Rows that
+        incremental updates brought back to zero are dropped but not counted.
+        """
+        sold, blocked = RoomTypeInventory._expected_counts(session, room_types)
+        expected = {key: (sold[key], blocked[key]) for key in set(sold) | set(blocked)}
+        
+        stored = session.query(RoomTypeNightCount)
+        if room_types is not None:
+            stored = stored.filter(RoomTypeNightCount.room_type.in_(room_types))
+        
+        fixed = 0
+        for row in stored.all():
+            counts = expected.pop((row.room_type, row.night), (0, 0))
+            if counts == (0, 0):
+                session.delete(row)
+                fixed += (row.sold, row.blocked) != (0, 0)
+            elif (row.sold, row.blocked) != counts:
+                row.sold, row.blocked = counts
+                fixed += 1
+        for (room_type, night), (sold_count, blocked_count) in expected.items():
+            session.add(RoomTypeNightCount(room_type=room_type, night=night, sold=sold_count, blocked=blocked_count))
+            fixed += 1
+        session.flush()
+        return fixed
+    
+    @staticmethod
+    def repair_counts(room_types=None):
+        """
+        Consistency repair: recompute counts for room_types (all if None) from
+        bookings and blocks and fix rows that drifted. Counts that were never
+        built are built for every type, which is not a repair.
+        Returns: (success, rows_fixed, message)
+        """
+        try:
+            with get_db_session() as session:
+                if not RoomTypeInventory._is_built(session):
+                    RoomTypeInventory._rebuild(session)
+                    return True, 0, "Inventory counts built"
+                fixed = RoomTypeInventory._rebuild(session, room_types)
+                return True, fixed, f"{fixed} inventory row(s) repaired" if fixed else "Inventory counts are consistent"
+        except Exception as e:
+            return False, 0, str(e)
+    
+    @staticmethod
+    def get_availability(start, end, room_types=None):
+        """
+        Nightly inventory for nights [start, end) in one range read.
+        Returns {room_type: [{'night', 'rooms', 'sold', 'blocked', 'available'}]}
+        for every room type (or just room_types), one entry per night.
+        """
+        try:
+            catalog_rooms = room_catalog.snapshot().rooms
+            # Rooms that can be sold: everything not in maintenance
+            in_service = Counter(r.room_type for r in catalog_rooms if r.status != 'maintenance')
+            types = sorted(room_types if room_types is not None else {r.room_type for r in catalog_rooms})
+            nights = RoomTypeInventory.nights(start, end)
+            
+            with get_db_session() as session:
+                if not RoomTypeInventory._is_built(session):
+                    RoomTypeInventory._rebuild(session)
+                rows = session.query(RoomTypeNightCount).filter(
+                    RoomTypeNightCount.room_type.in_(types),
+                    RoomTypeNightCount.night >= nights[0],
+                    RoomTypeNightCount.night <= nights[-1]
+                ).all()
+                counts = {(r.room_type, r.night): (r.sold, r.blocked) for r in rows}
+            
+            availability = {}
+            for room_type in types:
+                rooms = in_service.get(room_type, 0)
+                availability[room_type] = []
+                for night in nights:
+                    sold, blocked = counts.get((room_type, night), (0, 0))
+                    availability[room_type].append({
+                        'night': night,
+                        'rooms': rooms,
+                        'sold': sold,
+                        'blocked': blocked,
+                        'available': max(rooms - sold - blocked, 0)
+                    })
+            return availability
+        except Exception as e:
+            print(f"Error getting room type inventory: {e}")
+            return {}
+    
+    @staticmethod
+    def rooms_left(room_type, check_in, check_out):
+        """Fewest rooms of room_type left on any night of the stay (0 means sold out)."""
+        nights = RoomTypeInventory.get_availability(check_in, check_out, [room_type]).get(room_type)
+        return min(n['available'] for n in nights) if nights else 0
+    
+    @staticmethod
+    def is_sold_out(room_type, check_in, check_out):
+        """True if room_type has no room left on some night of the stay."""
+        return RoomTypeInventory.rooms_left(room_type, check_in, check_out) == 0
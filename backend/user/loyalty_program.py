@@ -1,10 +1,17 @@
 """
 Loyalty points program logic.
 Manages earning and redemption of loyalty points.
+Every change is an append-only ledger entry; users.loyalty_points is the
+cached balance, changed only by atomic conditional UPDATEs. A user's first
+ledger write records the balance from before the ledger as an 'opening'
+entry, so the ledger always sums to the true balance.
+Run the expiry and reconcile job: python -m backend.user.loyalty_program
 """
 
 from database.db_manager import get_db_session
-from database.models import User
+from database.models import User, LoyaltyLedgerEntry
+from sqlalchemy import update, func, case
+from datetime import datetime, timedelta
 import config
 
 
@@ -12,15 +19,34 @@ class LoyaltyProgram:
     """Manages loyalty program."""
     
     @staticmethod
-    def add_points(user_id, points):
+    def add_points(user_id, points, booking_id=None, description=None):
         """Add loyalty points to user account."""
+        if not isinstance(points, int) or points <= 0:
+            return False, "Points must be a positive whole number"
+        
         try:
             with get_db_session() as session:
-                user = session.query(User).filter_by(user_id=user_id).first()
-                if not user:
+                # Write first so the lock is taken before anything is read
+                updated = session.execute(
+                    update(User).where(User.user_id == user_id).values(
+                        loyalty_points=func.coalesce(User.loyalty_points, 0) + points
+                    )
+                ).rowcount
+                if not updated:
                     return False, "User not found"
                 
-                user.loyalty_points += points
+                LoyaltyProgram._record_opening_balance(session, user_id, points)
+                now = datetime.utcnow()
+                session.add(LoyaltyLedgerEntry(
+                    user_id=user_id,
+                    booking_id=booking_id,
+                    entry_type='earn',
+                    points=points,
+                    remaining=points,
+                    description=description or f"Earned {points} points",
+                    created_at=now,
+                    expires_at=now + timedelta(days=config.LOYALTY_POINTS_EXPIRY_DAYS)
+                ))
                 session.commit()
                 
                 return True, f"Added {points} points"
@@ -28,25 +54,196 @@ class LoyaltyProgram:
             return False, str(e)
     
     @staticmethod
-    def redeem_points(user_id, points):
+    def redeem_points(user_id, points, booking_id=None):
         """Redeem loyalty points for discount."""
+        if not isinstance(points, int) or points <= 0:
+            return False, 0, "Points must be a positive whole number"
+        
         try:
             with get_db_session() as session:
-                user = session.query(User).filter_by(user_id=user_id).first()
-                if not user:
-                    return False, 0, "User not found"
+                # Check and deduct in one statement: concurrent redemptions cannot overdraw
+                updated = session.execute(
+                    update(User).where(
+                        User.user_id == user_id,
+                        User.loyalty_points >= points
+                    ).values(loyalty_points=User.loyalty_points - points)
+                ).rowcount
                 
-                if user.loyalty_points < points:
-                    return False, 0, "Insufficient points"
+                if not updated:
+                    exists = session.query(User.user_id).filter_by(user_id=user_id).first()
+                    return False, 0, "Insufficient points" if exists else "User not found"
+                
+                LoyaltyProgram._record_opening_balance(session, user_id, -points)
+                LoyaltyProgram._consume_lots(session, user_id, points)
                 
-                user.loyalty_points -= points
                 discount_amount = points / config.POINTS_TO_DOLLAR_RATE
+                session.add(LoyaltyLedgerEntry(
+                    user_id=user_id,
+                    booking_id=booking_id,
+                    entry_type='redeem',
+                    points=-points,
+                    description=f"Redeemed {points} points for ${discount_amount}"
+                ))
                 session.commit()
                 
                 return True, discount_amount, f"Redeemed {points} points for ${discount_amount}"
         except Exception as e:
             return False, 0, str(e)
     
+    @staticmethod
+    def _record_opening_balance(session, user_id, change):
+        """
+        On a user's first ledger write, record the balance from before it
+        (the cached balance minus this change, already applied) as a
+        non-expiring opening entry. Call after the balance UPDATE, which
+        holds the write lock.
+        """
+        if session.query(LoyaltyLedgerEntry.entry_id).filter_by(user_id=user_id).first():
+            return
+        balance = session.query(User.loyalty_points).filter_by(user_id=user_id).scalar() or 0
+        session.add(LoyaltyLedgerEntry(
+            user_id=user_id,
+            entry_type='opening',
+            points=balance - change,
+            description="Opening balance"
+        ))
+        session.flush()
+    
+    @staticmethod
+    def _consume_lots(session, user_id, points):
+        """
+        Use up unspent earn entries oldest first so expiry only removes points
+        that were never redeemed. Balance from before the ledger has no lots
+        and never expires.
+        """
+        lots = session.query(LoyaltyLedgerEntry.entry_id, LoyaltyLedgerEntry.remaining).filter(
+            LoyaltyLedgerEntry.user_id == user_id,
+            LoyaltyLedgerEntry.remaining > 0
+        ).order_by(LoyaltyLedgerEntry.expires_at, LoyaltyLedgerEntry.entry_id).all()
+        
+        for lot in lots:
+            if points <= 0:
+                break
+            take = min(points, lot.remaining)
+            updated = session.execute(
+                update(LoyaltyLedgerEntry).where(
+                    LoyaltyLedgerEntry.entry_id == lot.entry_id,
+                    LoyaltyLedgerEntry.remaining >= take
+                ).values(remaining=LoyaltyLedgerEntry.remaining - take)
+            ).rowcount
+            if updated:
+                points -= take
+    
+    @staticmethod
+    def expire_points(now=None, batch_size=None):
+        """
+        Expire unspent points whose earn entries are past expires_at.
+        Works in batches of earn entries, one transaction per batch.
+        Returns: (success, points_expired, message)
+        """
+        now = now or datetime.utcnow()
+        batch_size = batch_size or config.LOYALTY_EXPIRY_BATCH_SIZE
+        total = 0
+        last_id = 0
+        
+        try:
+            while True:
+                with get_db_session() as session:
+                    lots = session.query(
+                        LoyaltyLedgerEntry.entry_id,
+                        LoyaltyLedgerEntry.user_id,
+                        LoyaltyLedgerEntry.remaining
+                    ).filter(
+                        LoyaltyLedgerEntry.expires_at <= now,
+                        LoyaltyLedgerEntry.remaining > 0,
+                        LoyaltyLedgerEntry.entry_id > last_id
+                    ).order_by(LoyaltyLedgerEntry.entry_id).limit(batch_size).all()
+                    
+                    if not lots:
+                        break
+                    
+                    per_user = {}
+                    for lot in lots:
+                        # Skip lots a concurrent redemption touched; next run picks them up
+                        updated = session.execute(
+                            update(LoyaltyLedgerEntry).where(
+                                LoyaltyLedgerEntry.entry_id == lot.entry_id,
+                                LoyaltyLedgerEntry.remaining == lot.remaining
+                            ).values(remaining=0)
+                        ).rowcount
+                        if updated:
+                            per_user[lot.user_id] = per_user.get(lot.user_id, 0) + lot.remaining
+                    
+                    for user_id, points in per_user.items():
+                        session.execute(
+                            update(User).where(User.user_id == user_id).values(
+                                loyalty_points=case(
+                                    (User.loyalty_points > points, User.loyalty_points - points),
+                                    else_=0
+                                )
+                            )
+                        )
+                        session.add(LoyaltyLedgerEntry(
+                            user_id=user_id,
+                            entry_type='expire',
+                            points=-points,
+                            description=f"{points} points expired",
+                            created_at=now
+                        ))
+                    
+                    session.commit()
+                    total += sum(per_user.values())
+                    last_id = lots[-1].entry_id
+            
+            return True, total, f"Expired {total} points"
+        except Exception as e:
+            print(f"Error expiring loyalty points: {e}")
+            return False, total, str(e)
+    
+    @staticmethod
+    def reconcile_balances():
+        """
+        Reset cached balances to the ledger sum with one GROUP BY.
+        Users without an opening entry (no ledger writes yet, or ledger rows
+        written before opening entries were recorded) first get one for the
+        difference between their cached balance and the ledger, so balances
+        from before the ledger are kept.
+        Returns: (success, balances_corrected)
+        """
+        try:
+            with get_db_session() as session:
+                sums = dict(session.query(
+                    LoyaltyLedgerEntry.user_id,
+                    func.sum(LoyaltyLedgerEntry.points)
+                ).group_by(LoyaltyLedgerEntry.user_id).all())
+                opened = {user_id for (user_id,) in session.query(LoyaltyLedgerEntry.user_id).filter(
+                    LoyaltyLedgerEntry.entry_type == 'opening'
+                ).distinct()}
+                balances = dict(session.query(User.user_id, User.loyalty_points).all())
+                
+                for user_id, balance in balances.items():
+                    if user_id in opened or (user_id not in sums and not balance):
+                        continue
+                    session.add(LoyaltyLedgerEntry(
+                        user_id=user_id,
+                        entry_type='opening',
+                        points=(balance or 0) - sums.get(user_id, 0),
+                        description="Opening balance"
+                    ))
+                    sums[user_id] = balance or 0
+                
+                corrected = 0
+                for user_id, points in sums.items():
+                    if balances.get(user_id) != points:
+                        session.execute(update(User).where(User.user_id == user_id).values(loyalty_points=points))
+                        corrected += 1
+                
+                session.commit()
+                return True, corrected
+        except Exception as e:
+            print(f"Error reconciling loyalty balances: {e}")
+            return False, 0
+    
     @staticmethod
     def calculate_points_earned(amount):
         """Calculate points earned from booking amount."""
@@ -54,10 +251,47 @@ class LoyaltyProgram:
     
     @staticmethod
     def get_points_balance(user_id):
-        """Get current points balance."""
+        """Get current points balance (cached on the user row)."""
         try:
             with get_db_session() as session:
-                user = session.query(User).filter_by(user_id=user_id).first()
-                return user.loyalty_points if user else 0
+                balance = session.query(User.loyalty_points).filter_by(user_id=user_id).scalar()
+                return balance or 0
         except:
             return 0
+    
+    @staticmethod
+    def get_points_history(user_id, limit=20):
+        """Get the user's most recent ledger entries as dictionaries, newest first."""
+        try:
+            with get_db_session() as session:
+                entries = session.query(LoyaltyLedgerEntry).filter_by(user_id=user_id).order_by(
+                    LoyaltyLedgerEntry.entry_id.desc()
+                ).limit(limit).all()
+                
+                return [{
+                    'entry_id': e.entry_id,
+                    'entry_type': e.entry_type,
+                    'points': e.points,
+                    'booking_id': e.booking_id,
+                    'description': e.description,
+                    'created_at': e.created_at,
+                    'expires_at': e.expires_at
+                } for e in entries]
+        except Exception as e:
+            print(f"Error getting points history: {e}")
+            return []
+
+
+def main():
+    """Expire points past their expiry date, then reconcile cached balances."""
+    from database.db_manager import DatabaseManager
+    DatabaseManager.setup_database()
+    
+    success, expired, message = LoyaltyProgram.expire_points()
+    print(("✅ " if success else "❌ ") + message)
+    success, corrected = LoyaltyProgram.reconcile_balances()
+    print(f"✅ Reconciled balances: {corrected} corrected" if success else "❌ Balance reconcile failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,10 @@ Handles customer reviews for rooms and stays.
 """
 
 from database.db_manager import get_db_session
-from database.models import Review, Booking
+from database.models import Review, Booking, RoomRatingSummary, Room, User
+from sqlalchemy import func, case, and_, or_
 from datetime import datetime
+import config
 
 
 class ReviewManager:
@@ -14,6 +16,9 @@ class ReviewManager:
     @staticmethod
     def create_review(user_id, room_id, booking_id, rating, comment):
         """Create new review."""
+        if not isinstance(rating, int) or isinstance(rating, bool) or rating not in range(1, 6):
+            return False, "Rating must be a whole number between 1 and 5"
+        
         try:
             with get_db_session() as session:
                 # Check if review already exists
@@ -36,6 +41,9 @@ class ReviewManager:
                 )
                 
                 session.add(new_review)
+                session.flush()
+                
+                ReviewManager._apply_rating_delta(session, room_id, rating, 1)
                 session.commit()
                 
                 return True, "Review submitted successfully"
@@ -51,18 +59,266 @@ class ReviewManager:
         except:
             return []
     
+    # Feed sort orders: list of (column, descending). review_id is the tiebreaker.
+    _FEED_SORTS = {
+        'newest': [(Review.review_date, True), (Review.review_id, True)],
+        'highest': [(Review.rating, True), (Review.review_date, True), (Review.review_id, True)],
+        'lowest': [(Review.rating, False), (Review.review_date, True), (Review.review_id, True)],
+    }
+    
+    @staticmethod
+    def get_review_feed(status='approved', user_id=None, room_id=None, room_type=None,
+                        min_rating=None, rating=None, sort_by='newest', cursor=None, page_size=None):
+        """
+        Get one keyset-paginated page of reviews joined with guest, room and booking.
+        Pass the returned next_cursor back to fetch the following page; the cost
+        of a page does not depend on how many reviews come before it.
+        Returns dict with 'reviews' (list of dicts) and 'next_cursor' (None on last page).
+        """
+        page_size = page_size or config.ITEMS_PER_PAGE
+        sort_columns = ReviewManager._FEED_SORTS.get(sort_by, ReviewManager._FEED_SORTS['newest'])
+        
+        try:
+            with get_db_session() as session:
+                query = session.query(
+                    Review.review_id,
+                    Review.room_id,
+                    Review.rating,
+                    Review.comment,
+                    Review.review_date,
+                    Review.status,
+                    Review.admin_response,
+                    User.first_name,
+                    User.last_name,
+                    Room.room_number,
+                    Room.room_type,
+                    Booking.booking_reference
+                ).join(User, User.user_id == Review.user_id) \
+                 .join(Room, Room.room_id == Review.room_id) \
+                 .outerjoin(Booking, Booking.booking_id == Review.booking_id)
+                
+                if status:
+                    query = query.filter(Review.status == status)
+                if user_id is not None:
+                    query = query.filter(Review.user_id == user_id)
+                if room_id is not None:
+                    query = query.filter(Review.room_id == room_id)
+                if room_type:
+                    query = query.filter(Room.room_type == room_type)
+                if min_rating:
+                    query = query.filter(Review.rating >= min_rating)
+                if rating:
+                    query = query.filter(Review.rating == rating)
+                
+                if cursor:
+                    query = query.filter(ReviewManager._keyset_after(sort_columns, cursor))
+                
+                query = query.order_by(*[col.desc() if desc else col.asc() for col, desc in sort_columns])
+                rows = query.limit(page_size + 1).all()
+                
+                reviews = [{
+                    'review_id': row.review_id,
+                    'room_id': row.room_id,
+                    'rating': row.rating,
+                    'comment': row.comment,
+                    'review_date': row.review_date,
+                    'status': row.status,
+                    'admin_response': row.admin_response,
+                    'guest_first_name': row.first_name or '',
+                    'guest_last_name': row.last_name or '',
+                    'room_number': row.room_number,
+                    'room_type': row.room_type,
+                    'booking_reference': row.booking_reference or 'N/A'
+                } for row in rows[:page_size]]
+                
+                next_cursor = None
+                if len(rows) > page_size:
+                    last = rows[page_size - 1]
+                    next_cursor = tuple(getattr(last, col.key) for col, _ in sort_columns)
+                
+                return {'reviews': reviews, 'next_cursor': next_cursor}
+        except Exception as e:
+            print(f"Error getting review feed: {e}")
+            return {'reviews': [], 'next_cursor': None}
+    
+    @staticmethod
+    def _keyset_after(sort_columns, cursor):
+        """Build the row-value comparison 'sort key comes after cursor'."""
+        clauses = []
+        for i, (col, desc) in enumerate(sort_columns):
+            equal_prefix = [c == v for (c, _), v in zip(sort_columns[:i], cursor[:i])]
+            clauses.append(and_(*equal_prefix, col < cursor[i] if desc else col > cursor[i]))
+        return or_(*clauses)
+    
+    @staticmethod
+    def count_reviews(user_id=None, status=None):
+        """Count reviews, optionally for one user and/or status."""
+        try:
+            with get_db_session() as session:
+                query = session.query(func.count(Review.review_id))
+                if user_id is not None:
+                    query = query.filter(Review.user_id == user_id)
+                if status:
+                    query = query.filter(Review.status == status)
+                return query.scalar() or 0
+        except Exception as e:
+            print(f"Error counting reviews: {e}")
+            return 0
+    
+    @staticmethod
+    def get_overall_rating(room_type=None):
+        """
+        Get combined rating across all rooms (optionally one room type)
+        from the room rating summaries.
+        Returns dict: {'average', 'count', 'histogram'}
+        """
+        try:
+            with get_db_session() as session:
+                query = session.query(Room.room_id)
+                if room_type:
+                    query = query.filter(Room.room_type == room_type)
+                room_ids = [room_id for (room_id,) in query.all()]
+        except Exception as e:
+            print(f"Error getting rooms for rating: {e}")
+            room_ids = []
+        
+        ratings = ReviewManager.get_ratings_for_rooms(room_ids).values()
+        count = sum(r['count'] for r in ratings)
+        histogram = {star: sum(r['histogram'][star] for r in ratings) for star in range(1, 6)}
+        total = sum(star * n for star, n in histogram.items())
+        
+        return {
+            'average': round(total / count, 1) if count else 0.0,
+            'count': count,
+            'histogram': histogram
+        }
+    
     @staticmethod
     def get_average_rating(room_id):
-        """Calculate average rating for room."""
+        """Get average rating for room from the rating summary."""
+        return ReviewManager.get_ratings_for_rooms([room_id])[room_id]['average']
+    
+    @staticmethod
+    def get_ratings_for_rooms(room_ids):
+        """
+        Get rating summaries for many rooms in one lookup.
+        Rooms without a summary row yet (reviews from before summaries were
+        kept) are aggregated on the fly; rows are only written by review
+        changes and rebuild_rating_summaries().
+        Returns dict: room_id -> {'average', 'count', 'histogram'}
+        """
+        room_ids = list(set(room_ids))
+        empty = {'average': 0.0, 'count': 0, 'histogram': {star: 0 for star in range(1, 6)}}
+        
         try:
-            reviews = ReviewManager.get_room_reviews(room_id)
-            if not reviews:
-                return 0.0
-            
-            total = sum(r.rating for r in reviews)
-            return round(total / len(reviews), 1)
-        except:
-            return 0.0
+            with get_db_session() as session:
+                summaries = {
+                    s.room_id: ReviewManager._summary_to_dict(s) for s in session.query(RoomRatingSummary).filter(
+                        RoomRatingSummary.room_id.in_(room_ids)
+                    ).all()
+                } if room_ids else {}
+                
+                missing = [room_id for room_id in room_ids if room_id not in summaries]
+                if missing:
+                    rows = ReviewManager._aggregate_ratings(session, missing)
+                    for room_id in missing:
+                        summaries[room_id] = ReviewManager._counts_to_dict(*rows.get(room_id, (0, 0, 0, 0, 0, 0, 0)))
+                
+                return summaries
+        except Exception as e:
+            print(f"Error getting room ratings: {e}")
+            return {room_id: dict(empty) for room_id in room_ids}
+    
+    @staticmethod
+    def rebuild_rating_summaries():
+        """
+        Rebuild all room rating summaries from the reviews table.
+        Returns: (success, rooms_rebuilt)
+        """
+        try:
+            with get_db_session() as session:
+                session.query(RoomRatingSummary).delete(synchronize_session=False)
+                summaries = ReviewManager._rebuild_summaries(session)
+                return True, len(summaries)
+        except Exception as e:
+            print(f"Error rebuilding rating summaries: {e}")
+            return False, 0
+    
+    @staticmethod
+    def _counts_to_dict(count, rating_sum, *stars):
+        """Build the public rating dict from a review count, rating sum and 1-5 star counts."""
+        count = count or 0
+        return {
+            'average': round(rating_sum / count, 1) if count else 0.0,
+            'count': count,
+            'histogram': {star: stars[star - 1] or 0 for star in range(1, 6)}
+        }
+    
+    @staticmethod
+    def _summary_to_dict(summary):
+        """Convert a RoomRatingSummary row to the public rating dict."""
+        return ReviewManager._counts_to_dict(
+            summary.review_count, summary.rating_sum,
+            *[getattr(summary, f'stars_{star}') for star in range(1, 6)]
+        )
+    
+    @staticmethod
+    def _aggregate_ratings(session, room_ids=None):
+        """
+        One GROUP BY over approved reviews of room_ids (all if None).
+        Returns dict: room_id -> (count, rating_sum, stars_1, ..., stars_5)
+        """
+        query = session.query(
+            Review.room_id,
+            func.count(Review.review_id),
+            func.coalesce(func.sum(Review.rating), 0),
+            *[func.sum(case((Review.rating == star, 1), else_=0)) for star in range(1, 6)]
+        ).filter(Review.status == 'approved')
+        if room_ids is not None:
+            query = query.filter(Review.room_id.in_(room_ids))
+        return {row[0]: tuple(row[1:]) for row in query.group_by(Review.room_id).all()}
+    
+    @staticmethod
+    def _rebuild_summaries(session, room_ids=None):
+        """
+        Recompute summaries for room_ids (all reviewed rooms if None) and
+        store them in the caller's session. Existing rows for room_ids are replaced.
+        """
+        rows = ReviewManager._aggregate_ratings(session, room_ids)
+        if room_ids is not None:
+            session.query(RoomRatingSummary).filter(
+                RoomRatingSummary.room_id.in_(room_ids)
+            ).delete(synchronize_session=False)
+        
+        summaries = []
+        for room_id in (room_ids if room_ids is not None else rows.keys()):
+            count, rating_sum, *stars = rows.get(room_id, (0, 0, 0, 0, 0, 0, 0))
+            summary = RoomRatingSummary(room_id=room_id, review_count=count, rating_sum=rating_sum)
+            for star in range(1, 6):
+                setattr(summary, f'stars_{star}', stars[star - 1] or 0)
+            session.add(summary)
+            summaries.append(summary)
+        
+        session.flush()
+        return summaries
+    
+    @staticmethod
+    def _apply_rating_delta(session, room_id, rating, delta):
+        """
+        Add (delta=1) or remove (delta=-1) one approved rating from the room
+        summary in the caller's transaction. The review change must already be
+        flushed so a missing summary row is rebuilt including it.
+        """
+        star_column = getattr(RoomRatingSummary, f'stars_{rating}')
+        updated = session.query(RoomRatingSummary).filter_by(room_id=room_id).update({
+            RoomRatingSummary.review_count: RoomRatingSummary.review_count + delta,
+            RoomRatingSummary.rating_sum: RoomRatingSummary.rating_sum + delta * rating,
+            star_column: star_column + delta,
+            RoomRatingSummary.updated_at: datetime.utcnow()
+        }, synchronize_session=False)
+        
+        if not updated:
+            ReviewManager._rebuild_summaries(session, [room_id])
     
     @staticmethod
     def moderate_review(review_id, action, admin_response=None):
@@ -73,12 +329,21 @@ class ReviewManager:
                 if not review:
                     return False, "Review not found"
                 
+                old_status = review.status
                 if action in ['approved', 'rejected']:
                     review.status = action
                 
                 if admin_response:
                     review.admin_response = admin_response
                 
+                session.flush()
+                
+                # Keep the room rating summary in step with approval changes
+                if old_status != 'approved' and review.status == 'approved':
+                    ReviewManager._apply_rating_delta(session, review.room_id, review.rating, 1)
+                elif old_status == 'approved' and review.status != 'approved':
+                    ReviewManager._apply_rating_delta(session, review.room_id, review.rating, -1)
+                
                 session.commit()
                 return True, f"Review {action}"
         except Exception as e:
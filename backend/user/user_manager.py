@@ -5,8 +5,11 @@ UPDATED: Added ID fields to user profile
 """
 
 from database.db_manager import get_db_session
-from database.models import User, Booking
+from database.models import User, Booking, UserStatsSummary
+from sqlalchemy import func, case, and_, or_, text
 from datetime import datetime
+import re
+import config
 
 
 class UserManager:
@@ -80,30 +83,31 @@ class UserManager:
         except Exception as e:
             return False, str(e)
     
+    # Booking statuses counted in each summary bucket
+    _ACTIVE_STATUSES = ('confirmed', 'pending')
+    _SPEND_STATUSES = ('confirmed', 'completed')
+    
     @staticmethod
     def get_user_statistics(user_id):
         """
         Get user booking statistics.
-        FIXED: Correctly counts active bookings (excluding cancelled)
+        Reads the user's stats summary row (rebuilt on first access if missing).
+        'total_bookings' counts only active (confirmed/pending) bookings.
         """
         try:
             with get_db_session() as session:
                 user = session.query(User).filter_by(user_id=user_id).first()
-                all_bookings = session.query(Booking).filter_by(user_id=user_id).all()
-                
-                # FIX: Separate bookings by status
-                active_bookings = [b for b in all_bookings if b.booking_status in ['confirmed', 'pending']]
-                completed_bookings = [b for b in all_bookings if b.booking_status == 'completed']
-                cancelled_bookings = [b for b in all_bookings if b.booking_status == 'cancelled']
-                
-                # FIX: Total spent includes only confirmed and completed
-                total_spent = sum(b.total_amount for b in all_bookings if b.booking_status in ['confirmed', 'completed'])
+                summary = session.get(UserStatsSummary, user_id) if user else None
+                if user and summary is None:
+                    summary = UserManager._rebuild_stats(session, [user_id])[0]
+                    session.commit()
                 
                 stats = {
-                    'total_bookings': len(active_bookings),  # ✅ FIXED: Only active bookings
-                    'completed_bookings': len(completed_bookings),
-                    'cancelled_bookings': len(cancelled_bookings),
-                    'total_spent': total_spent,
+                    'total_bookings': summary.active_bookings if summary else 0,
+                    'completed_bookings': summary.completed_bookings if summary else 0,
+                    'cancelled_bookings': summary.cancelled_bookings if summary else 0,
+                    'total_spent': summary.total_spent if summary else 0,
+                    'last_stay': summary.last_stay if summary else None,
                     'loyalty_points': user.loyalty_points if user else 0,
                     'account_age_days': (datetime.utcnow() - user.created_at).days if user else 0
                 }
@@ -116,6 +120,251 @@ class UserManager:
                 'completed_bookings': 0,
                 'cancelled_bookings': 0,
                 'total_spent': 0,
+                'last_stay': None,
                 'loyalty_points': 0,
                 'account_age_days': 0
             }
+    
+    @staticmethod
+    def rebuild_user_stats():
+        """
+        Rebuild all user stats summaries from the bookings table.
+        Returns: (success, users_rebuilt)
+        """
+        try:
+            with get_db_session() as session:
+                session.query(UserStatsSummary).delete(synchronize_session=False)
+                summaries = UserManager._rebuild_stats(session)
+                return True, len(summaries)
+        except Exception as e:
+            print(f"Error rebuilding user stats: {e}")
+            return False, 0
+    
+    @staticmethod
+    def _rebuild_stats(session, user_ids=None):
+        """
+        Recompute summaries for user_ids (all users with bookings if None) with
+        one GROUP BY over bookings and store them in the caller's session.
+        Existing rows for user_ids are replaced.
+        """
+        status = Booking.booking_status
+        query = session.query(
+            Booking.user_id,
+            func.sum(case((status.in_(UserManager._ACTIVE_STATUSES), 1), else_=0)),
+            func.sum(case((status == 'completed', 1), else_=0)),
+            func.sum(case((status == 'cancelled', 1), else_=0)),
+            func.sum(case((status.in_(UserManager._SPEND_STATUSES), Booking.total_amount), else_=0)),
+            func.max(case((status == 'completed', Booking.check_out_date), else_=None))
+        )
+        
+        if user_ids is not None:
+            query = query.filter(Booking.user_id.in_(user_ids))
+            session.query(UserStatsSummary).filter(
+                UserStatsSummary.user_id.in_(user_ids)
+            ).delete(synchronize_session=False)
+        
+        rows = {row[0]: row for row in query.group_by(Booking.user_id).all()}
+        
+        summaries = []
+        for user_id in (user_ids if user_ids is not None else rows.keys()):
+            row = rows.get(user_id)
+            summary = UserStatsSummary(
+                user_id=user_id,
+                active_bookings=(row[1] or 0) if row else 0,
+                completed_bookings=(row[2] or 0) if row else 0,
+                cancelled_bookings=(row[3] or 0) if row else 0,
+                total_spent=(row[4] or 0.0) if row else 0.0,
+                last_stay=row[5] if row else None
+            )
+            session.add(summary)
+            summaries.append(summary)
+        
+        session.flush()
+        return summaries
+    
+    @staticmethod
+    def apply_booking_status_change(session, booking, old_status):
+        """
+        Move one booking between stats buckets in the caller's transaction.
+        Call after booking.booking_status is set (old_status None for a new
+        booking). A missing summary row is rebuilt from the flushed bookings.
+        """
+        new_status = booking.booking_status
+        if old_status == new_status:
+            return
+        
+        session.flush()
+        
+        # Un-completing a stay may change last_stay; recompute that user instead
+        if old_status == 'completed':
+            UserManager._rebuild_stats(session, [booking.user_id])
+            return
+        
+        def bucket_delta(statuses):
+            return int(new_status in statuses) - int(old_status in statuses)
+        
+        values = {
+            UserStatsSummary.active_bookings:
+                UserStatsSummary.active_bookings + bucket_delta(UserManager._ACTIVE_STATUSES),
+            UserStatsSummary.completed_bookings:
+                UserStatsSummary.completed_bookings + bucket_delta(('completed',)),
+            UserStatsSummary.cancelled_bookings:
+                UserStatsSummary.cancelled_bookings + bucket_delta(('cancelled',)),
+            UserStatsSummary.total_spent:
+                UserStatsSummary.total_spent + bucket_delta(UserManager._SPEND_STATUSES) * booking.total_amount,
+            UserStatsSummary.updated_at: datetime.utcnow()
+        }
+        if new_status == 'completed':
+            values[UserStatsSummary.last_stay] = case(
+                (or_(UserStatsSummary.last_stay.is_(None),
+                     UserStatsSummary.last_stay < booking.check_out_date), booking.check_out_date),
+                else_=UserStatsSummary.last_stay
+            )
+        
+        updated = session.query(UserStatsSummary).filter_by(
+            user_id=booking.user_id
+        ).update(values, synchronize_session=False)
+        
+        if not updated:
+            UserManager._rebuild_stats(session, [booking.user_id])
+    
+    @staticmethod
+    def _directory_search_filter(session, search):
+        """
+        Build the guest search predicate.
+        Emails use an index range scan on the email prefix; names use the
+        users_fts prefix index, or LIKE 'term%' if FTS5 is unavailable.
+        """
+        term = (search or '').strip()
+        if not term:
+            return None
+        
+        if '@' in term:
+            prefixes = {term, term.lower()}
+            return or_(*[and_(User.email >= p, User.email < p + '\uffff') for p in prefixes])
+        
+        tokens = re.findall(r'\w+', term)
+        if not tokens:
+            return None
+        
+        has_fts = session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+        )).first() if session.bind.dialect.name == 'sqlite' else None
+        
+        if has_fts:
+            match = " ".join(f'"{token}"*' for token in tokens)
+            return User.user_id.in_(
+                text("SELECT rowid FROM users_fts WHERE users_fts MATCH :match").bindparams(match=match)
+            )
+        
+        like = f"{term}%"
+        return or_(User.first_name.like(like), User.last_name.like(like), User.email.like(like))
+    
+    @staticmethod
+    def get_guest_directory(search=None, cursor=None, page_size=None):
+        """
+        Get one keyset-paginated page of guests (newest first) with booking
+        count and lifetime spend from a single grouped query.
+        Returns dict with 'users' (list of dicts) and 'next_cursor'.
+        """
+        page_size = page_size or config.ITEMS_PER_PAGE
+        
+        try:
+            with get_db_session() as session:
+                page_query = session.query(User.user_id, User.created_at)
+                
+                search_filter = UserManager._directory_search_filter(session, search)
+                if search_filter is not None:
+                    page_query = page_query.filter(search_filter)
+                
+                if cursor:
+                    created_at, user_id = cursor
+                    page_query = page_query.filter(or_(
+                        User.created_at < created_at,
+                        and_(User.created_at == created_at, User.user_id < user_id)
+                    ))
+                
+                page = page_query.order_by(
+                    User.created_at.desc(), User.user_id.desc()
+                ).limit(page_size + 1).subquery()
+                
+                spend = case(
+                    (Booking.booking_status.in_(['confirmed', 'completed']), Booking.total_amount),
+                    else_=0
+                )
+                rows = session.query(
+                    User,
+                    func.count(Booking.booking_id),
+                    func.coalesce(func.sum(spend), 0)
+                ).join(page, page.c.user_id == User.user_id) \
+                 .outerjoin(Booking, Booking.user_id == User.user_id) \
+                 .group_by(User.user_id) \
+                 .order_by(User.created_at.desc(), User.user_id.desc()).all()
+                
+                users = []
+                for user, booking_count, total_spent in rows[:page_size]:
+                    users.append({
+                        'user_id': user.user_id,
+                        'first_name': user.first_name,
+                        'last_name': user.last_name,
+                        'email': user.email,
+                        'phone_number': user.phone_number or 'N/A',
+                        'address': user.address or 'N/A',
+                        'city': user.city or 'N/A',
+                        'country': user.country or 'N/A',
+                        'national_id': user.national_id,
+                        'passport_number': user.passport_number,
+                        'nationality': user.nationality,
+                        'date_of_birth': user.date_of_birth,
+                        'id_expiry_date': user.id_expiry_date,
+                        'loyalty_points': user.loyalty_points,
+                        'account_status': user.account_status,
+                        'created_at': user.created_at,
+                        'booking_count': booking_count,
+                        'total_spent': total_spent
+                    })
+                
+                next_cursor = None
+                if len(rows) > page_size:
+                    last = rows[page_size - 1][0]
+                    next_cursor = (last.created_at, last.user_id)
+                
+                return {'users': users, 'next_cursor': next_cursor}
+        except Exception as e:
+            print(f"Error getting guest directory: {e}")
+            return {'users': [], 'next_cursor': None}
+    
+    @staticmethod
+    def get_guest_directory_stats(search=None):
+        """
+        Get summary counts for the guests matching search.
+        Returns dict: total_users, active_users, users_with_id, total_bookings
+        """
+        try:
+            with get_db_session() as session:
+                search_filter = UserManager._directory_search_filter(session, search)
+                
+                query = session.query(
+                    func.count(User.user_id),
+                    func.coalesce(func.sum(case((User.account_status == 'active', 1), else_=0)), 0),
+                    func.coalesce(func.sum(case(
+                        (or_(User.national_id.isnot(None), User.passport_number.isnot(None)), 1), else_=0
+                    )), 0)
+                )
+                bookings = session.query(func.count(Booking.booking_id))
+                
+                if search_filter is not None:
+                    query = query.filter(search_filter)
+                    bookings = bookings.join(User, User.user_id == Booking.user_id).filter(search_filter)
+                
+                total_users, active_users, users_with_id = query.one()
+                
+                return {
+                    'total_users': total_users,
+                    'active_users': active_users,
+                    'users_with_id': users_with_id,
+                    'total_bookings': bookings.scalar() or 0
+                }
+        except Exception as e:
+            print(f"Error getting guest directory stats: {e}")
+            return {'total_users': 0, 'active_users': 0, 'users_with_id': 0, 'total_bookings': 0}
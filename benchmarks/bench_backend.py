@@ -0,0 +1,272 @@
+"""
+Backend benchmark suite with baseline regression checks.
+Run: python -m benchmarks.bench_backend [--sizes small medium large] [--output bench_results.json] [--update-baseline]
+
+Each dataset size is generated once with database.synthetic_data (cached in
+--data-dir) and every run works on a scratch copy in its own process, since
+DATABASE_PATH is read at import time. Cases cover availability, the calendar,
+room filtering, pricing, booking creation, the check-in search, invoices and
+the dashboard aggregates. Each case is warmed up once, then called until
+--budget seconds are spent; the median latency and the SQL statements issued
+by one call are reported and written as JSON.
+
+With a stored baseline (benchmarks/baseline.json) the run exits with status 1
+when a case got slower by more than --latency-tolerance (and --min-delta-ms)
+or issues more queries than --query-tolerance allows. Latencies depend on the
+machine: refresh the baseline with --update-baseline on the machine that
+runs the comparison. Cases whose query count follows the data (see
+DATA_DEPENDENT_QUERIES) are compared on latency only.
+"""
+
+from database.db_manager import get_db_session
+from database.models import engine, Room, User, Booking, Payment
+from backend.booking.availability_checker import AvailabilityChecker
+from backend.booking.availability_calendar import AvailabilityCalendar
+from backend.booking.advanced_filters import AdvancedFilter
+from backend.booking.pricing_calculator import PricingCalculator
+from backend.booking.booking_manager import BookingManager
+from backend.booking.checkin_manager import CheckInManager
+from backend.payment.invoice_generator import InvoiceGenerator
+from backend.analytics.occupancy_analytics import OccupancyAnalytics
+from backend.analytics.demand_forecast import DemandForecast
+from backend.room.inventory_manager import InventoryManager
+from sqlalchemy import event
+from contextlib import redirect_stdout
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DATASETS = {
+    'small': dict(rooms=200, bookings=5000),
+    'medium': dict(rooms=1000, bookings=50000),
+    'large': dict(rooms=5000, bookings=500000),
+}
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / 'solivie_bench'
+# Cases issuing a query per matching row (search_booking loads each confirmed
+# booking's guest and room). Datasets are generated relative to today, so
+# their counts drift from day to day without any code change.
+DATA_DEPENDENT_QUERIES = {'checkin.search_booking'}
+
+
+class QueryCounter:
+    """Counts SQL statements sent through the engine."""
+    
+    def __init__(self, bind):
+        self.count = 0
+        event.listen(bind, 'before_cursor_execute', self._on_execute)
+    
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def measure(fn, counter, budget, max_calls=None):
+    """
+    Warm up once, then call fn until budget seconds are spent (at least once,
+    at most max_calls times). Returns (median ms, queries of one call, calls).
+    """
+    fn()
+    samples, spent, queries = [], 0.0, 0
+    while not samples or (spent < budget and (max_calls is None or len(samples) < max_calls)):
+        before = counter.count
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+        spent += samples[-1]
+        if len(samples) == 1:
+            queries = counter.count - before
+    return statistics.median(samples) * 1000, queries, len(samples)
+
+
+def build_cases(invoice_dir):
+    """
+    (name, fn, max_calls) for every case, with inputs picked from the
+    dataset: a stay a month out, a paid booking and a guest.
+    """
+    today = datetime.combine(date.today(), datetime.min.time())
+    check_in, check_out = today + timedelta(days=30), today + timedelta(days=33)
+    month_ago = today - timedelta(days=30)
+    
+    with get_db_session() as session:
+        room = session.query(Room).filter(Room.status == 'available').order_by(Room.room_id).first()
+        room_id, base_price, capacity = room.room_id, room.base_price_per_night, room.capacity
+        booking_id, reference, user_id = session.query(
+            Booking.booking_id, Booking.booking_reference, Booking.user_id
+        ).join(Payment, Payment.booking_id == Booking.booking_id).filter(
+            Booking.booking_status == 'confirmed'
+        ).order_by(Booking.booking_id).first()
+    
+    # Stays that overlap neither existing bookings nor each other
+    stay_in, stay_out = today + timedelta(days=60), today + timedelta(days=62)
+    free_rooms = [r['room_id'] for r in AvailabilityChecker.get_available_rooms(stay_in, stay_out)]
+    next_room = iter(free_rooms)
+    
+    def create_booking():
+        success, _, message = BookingManager.create_booking(user_id, next(next_room), stay_in, stay_out, 2)
+        assert success, message
+    
+    def generate_invoice():
+        with get_db_session() as session:
+            booking = session.query(Booking).filter_by(booking_id=booking_id).first()
+            payment = session.query(Payment).filter_by(booking_id=booking_id).first()
+            user = session.query(User).filter_by(user_id=user_id).first()
+            room = session.query(Room).filter_by(room_id=booking.room_id).first()
+            path = os.path.join(invoice_dir, InvoiceGenerator.get_invoice_filename(reference))
+            success, result = InvoiceGenerator.generate_booking_invoice(booking, payment, user, room, path)
+            assert success, result
+    
+    return [
+        ('availability.get_available_rooms', lambda: AvailabilityChecker.get_available_rooms(check_in, check_out), None),
+        ('availability.is_room_available', lambda: AvailabilityChecker.is_room_available(room_id, check_in, check_out), None),
+        ('calendar.get_month_availability', lambda: AvailabilityCalendar.get_month_availability(check_in.year, check_in.month), None),
+        ('filter.filter_rooms', lambda: AdvancedFilter.filter_rooms(check_in, check_out, amenities=['WiFi'], min_capacity=2), None),
+        ('pricing.calculate_total_price', lambda: PricingCalculator.calculate_total_price(base_price, check_in, check_out, 2, capacity), None),
+        ('checkin.search_booking', lambda: CheckInManager.search_booking(reference), None),
+        ('invoice.generate_booking_invoice', generate_invoice, None),
+        ('dashboard.occupancy_rate', lambda: AvailabilityChecker.get_occupancy_rate(month_ago, today), None),
+        ('dashboard.daily_series', lambda: OccupancyAnalytics.get_daily_series(month_ago, today), None),
+        ('dashboard.inventory_summary', InventoryManager.get_inventory_summary, None),
+        ('dashboard.demand_forecast', DemandForecast.build, None),
+        # Writes last, so read cases see the same data on every run
+        ('booking.create_booking', create_booking, len(free_rooms) - 1),
+    ]
+
+
+def run_worker(output, budget):
+    """Run every case against the database in DATABASE_PATH and write {case: result} to output."""
+    counter = QueryCounter(engine)
+    results = {}
+    with tempfile.TemporaryDirectory() as invoice_dir:
+        for name, fn, max_calls in build_cases(invoice_dir):
+            # Backend code prints progress (emails, warnings); keep the report readable
+            with redirect_stdout(io.StringIO()):
+                ms, queries, calls = measure(fn, counter, budget, max_calls)
+            results[name] = {'ms': round(ms, 3), 'queries': queries, 'calls': calls}
+            print(f"   {name:<36} {ms:10,.2f} ms {queries:8,} queries", flush=True)
+    Path(output).write_text(json.dumps(results, indent=2))
+
+
+def ensure_dataset(size, seed, data_dir):
+    """Generate the size's dataset once per seed and day (stay dates are relative to today)."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    path = data_dir / f"{size}-seed{seed}-{date.today().isoformat()}.db"
+    if not path.exists():
+        partial = path.with_suffix('.partial')
+        partial.unlink(missing_ok=True)
+        dataset = DATASETS[size]
+        subprocess.run(
+            [sys.executable, '-m', 'database.synthetic_data', '--rooms', str(dataset['rooms']),
+             '--bookings', str(dataset['bookings']), '--seed', str(seed)],
+            env={**os.environ, 'DATABASE_PATH': str(partial)}, check=True, stdout=subprocess.DEVNULL
+        )
+        partial.rename(path)
+    return path
+
+
+def run_size(size, seed, data_dir, budget):
+    """Benchmark one dataset size on a scratch copy in a child process. Returns {case: result}."""
+    dataset = ensure_dataset(size, seed, data_dir)
+    with tempfile.TemporaryDirectory() as scratch:
+        database = Path(scratch) / 'hotel_system.db'
+        shutil.copyfile(dataset, database)
+        output = Path(scratch) / 'results.json'
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_backend', '--worker', str(output), '--budget', str(budget)],
+            env={**os.environ, 'DATABASE_PATH': str(database), 'EMAIL_ENABLED': 'False'}, check=True
+        )
+        return json.loads(output.read_text())
+
+
+def compare(baseline, results, latency_tolerance, query_tolerance, min_delta_ms):
+    """
+    Regressions of results against baseline ({size: {case: {'ms', 'queries'}}}).
+    A case regresses when it is slower by more than latency_tolerance (a
+    fraction) and min_delta_ms, or issues more than query_tolerance (a
+    fraction) extra queries; DATA_DEPENDENT_QUERIES cases are checked on
+    latency only. Cases missing from the baseline are skipped.
+    Returns a list of messages.
+    """
+    regressions = []
+    for size, cases in results.items():
+        for name, result in cases.items():
+            expected = baseline.get(size, {}).get(name)
+            if expected is None:
+                continue
+            slower = result['ms'] - expected['ms']
+            if slower > expected['ms'] * latency_tolerance and slower > min_delta_ms:
+                regressions.append(f"{size} {name}: {result['ms']:,.2f} ms vs {expected['ms']:,.2f} ms baseline")
+            if name in DATA_DEPENDENT_QUERIES:
+                continue
+            if result['queries'] > expected['queries'] * (1 + query_tolerance):
+                regressions.append(f"{size} {name}: {result['queries']:,} queries vs {expected['queries']:,} baseline")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', nargs='+', choices=list(DATASETS), default=['small', 'medium'])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--data-dir', type=Path, default=DEFAULT_DATA_DIR, help="cache of generated datasets")
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds of timed calls per case")
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--latency-tolerance', type=float, default=0.5, help="allowed slowdown (0.5 = 50%%)")
+    parser.add_argument('--query-tolerance', type=float, default=0.0, help="allowed extra queries (0.1 = 10%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=5.0, help="ignore slowdowns smaller than this")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        run_worker(args.worker, args.budget)
+        return
+    
+    results = {}
+    for size in args.sizes:
+        dataset = DATASETS[size]
+        print("=" * 60)
+        print(f"⏱️ Backend benchmark: {size} ({dataset['rooms']:,} rooms, {dataset['bookings']:,} bookings)")
+        print("=" * 60)
+        results[size] = run_size(size, args.seed, args.data_dir, args.budget)
+    
+    args.output.write_text(json.dumps({
+        'run_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': args.seed,
+        'results': results
+    }, indent=2))
+    print(f"\nResults written to {args.output}")
+    
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+    
+    regressions = compare(json.loads(args.baseline.read_text()), results, args.latency_tolerance,
+                          args.query_tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+        for message in regressions:
+            print(f"   {message}")
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
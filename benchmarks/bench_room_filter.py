@@ -0,0 +1,124 @@
+"""
+Room attribute filtering: per-room scan vs bitmap index.
+Run: python -m benchmarks.bench_room_filter [--rooms 10000] [--repeat 200]
+
+Builds synthetic in-memory rooms and runs the same mix of multi-criteria
+filters through a per-room Python scan (one pass per criterion, amenities
+checked against each room's list) and through RoomBitmapIndex. Results are
+checked for equality before timings are reported. No database is used.
+"""
+
+import argparse
+import random
+import time
+from backend.room.room_catalog import CatalogRoom
+from backend.room.room_bitmap_index import RoomBitmapIndex
+
+ROOM_TYPES = ['Single', 'Double', 'Deluxe', 'Suite', 'Family', 'Penthouse']
+VIEW_TYPES = ['City View', 'Garden View', 'Sea View', 'Pool View', None]
+AMENITIES = ['WiFi', 'TV', 'Air Conditioning', 'Mini Fridge', 'Coffee Maker', 'Balcony',
+             'Bathtub', 'Room Service', 'Safe', 'Desk', 'Jacuzzi', 'Kitchenette',
+             'Sofa Bed', 'Iron', 'Hair Dryer', 'Smart TV', 'Soundproofing', 'Butler Service']
+STATUSES = ['available'] * 8 + ['occupied', 'cleaning', 'maintenance']
+
+QUERIES = [
+    dict(amenities=['WiFi']),
+    dict(amenities=['WiFi', 'Balcony', 'Bathtub']),
+    dict(room_types=['Deluxe', 'Suite'], view_types=['Sea View'], min_capacity=2),
+    dict(room_types=['Double'], floor_numbers=[3, 4, 5], amenities=['Coffee Maker', 'Safe']),
+    dict(view_types=['Garden View', 'Pool View'], amenities=['Jacuzzi'], min_capacity=4),
+    dict(min_capacity=1),
+]
+
+
+def make_rooms(count, seed=42):
+    """Generate count synthetic CatalogRoom records."""
+    rng = random.Random(seed)
+    rooms = []
+    for i in range(count):
+        room_type = rng.choice(ROOM_TYPES)
+        rooms.append(CatalogRoom(
+            room_id=i + 1,
+            room_number=f"{i + 1:05d}",
+            room_type=room_type,
+            capacity=rng.randint(1, 6),
+            base_price_per_night=float(rng.randint(50, 600)),
+            description='',
+            amenities=tuple(rng.sample(AMENITIES, rng.randint(2, 10))),
+            floor_number=rng.randint(1, 40),
+            view_type=rng.choice(VIEW_TYPES),
+            status=rng.choice(STATUSES),
+            images=()
+        ))
+    return rooms
+
+
+def scan_filter(rooms, room_types=None, view_types=None, floor_numbers=None,
+                amenities=None, min_capacity=None):
+    """Per-room filtering as AdvancedFilter did it before the bitmap index."""
+    rooms = [r for r in rooms if r.status == 'available']
+    if room_types:
+        rooms = [r for r in rooms if r.room_type in room_types]
+    if view_types:
+        rooms = [r for r in rooms if r.view_type in view_types]
+    if floor_numbers:
+        rooms = [r for r in rooms if r.floor_number in floor_numbers]
+    if min_capacity:
+        rooms = [r for r in rooms if r.capacity >= min_capacity]
+    if amenities:
+        rooms = [r for r in rooms if all(a in r.amenities for a in amenities)]
+    return rooms
+
+
+def bitmap_filter(index, **criteria):
+    return index.rooms_for(index.match(status='available', **criteria))
+
+
+def timed(fn, repeat):
+    """Best-of-3 average seconds per call over repeat calls."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    
+    rooms = make_rooms(args.rooms)
+    start = time.perf_counter()
+    index = RoomBitmapIndex(rooms)
+    build_ms = (time.perf_counter() - start) * 1000
+    
+    print("=" * 60)
+    print(f"🛏️ Room filter benchmark ({args.rooms:,} rooms, index built in {build_ms:.1f} ms)")
+    print("=" * 60)
+    
+    total_scan = total_bitmap = 0.0
+    for criteria in QUERIES:
+        expected = scan_filter(rooms, **criteria)
+        assert bitmap_filter(index, **criteria) == expected, criteria
+        
+        scan = timed(lambda: scan_filter(rooms, **criteria), args.repeat)
+        bitmap = timed(lambda: bitmap_filter(index, **criteria), args.repeat)
+        total_scan += scan
+        total_bitmap += bitmap
+        
+        label = ", ".join(f"{k}={v}" for k, v in criteria.items())
+        print(f"\n{label}")
+        print(f"   Matches: {len(expected):,}")
+        print(f"   Scan:    {scan * 1e6:9,.1f} µs")
+        print(f"   Bitmap:  {bitmap * 1e6:9,.1f} µs  ({scan / bitmap:.1f}x)")
+    
+    print(f"\nAll queries: scan {total_scan * 1e3:.2f} ms, bitmap {total_bitmap * 1e3:.2f} ms "
+          f"({total_scan / total_bitmap:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
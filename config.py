@@ -14,7 +14,7 @@ load_dotenv()
 # PATHS
 # ============================================================================
 BASE_DIR = Path(__file__).resolve().parent
-DATABASE_PATH = BASE_DIR / "database" / "hotel_system.db"
+DATABASE_PATH = Path(os.getenv("DATABASE_PATH", BASE_DIR / "database" / "hotel_system.db"))
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 # ============================================================================
@@ -30,6 +30,12 @@ REQUIRE_LOWERCASE = True
 REQUIRE_NUMBERS = True
 REQUIRE_SPECIAL_CHARS = False
 
+# Login throttling (sliding window, failed attempts only)
+LOGIN_ATTEMPT_WINDOW_SECONDS = 900
+LOGIN_MAX_ATTEMPTS_PER_ACCOUNT = 5
+LOGIN_MAX_ATTEMPTS_PER_IP = 50
+LOGIN_THROTTLE_PERSIST = os.getenv("LOGIN_THROTTLE_PERSIST", "False").lower() == "true"
+
 # ============================================================================
 # EMAIL CONFIGURATION ENHANCED
 # ============================================================================
@@ -63,9 +69,75 @@ SEND_CANCELLATION_CONFIRMATION = True
 SEND_CHECK_IN_REMINDER = True
 CHECK_IN_REMINDER_HOURS = 24  # Send reminder 24h before check-in
 
+# ============================================================================
+# AUDIT LOG
+# ============================================================================
+# Buffer audit entries and write them in batches on a background thread
+AUDIT_LOG_BUFFERED = os.getenv("AUDIT_LOG_BUFFERED", "True").lower() == "true"
+AUDIT_LOG_BATCH_SIZE = 200
+AUDIT_LOG_FLUSH_INTERVAL_SECONDS = 2.0
+AUDIT_LOG_QUEUE_MAX = 10000
+
+# Retention: older entries move to per-month gzip archives
+AUDIT_LOG_RETENTION_DAYS = 90
+AUDIT_ARCHIVE_CHUNK_SIZE = 5000
+AUDIT_ARCHIVE_DIR = BASE_DIR / "archives" / "audit_logs"
+
+# ============================================================================
+# ROOM CATALOG
+# ============================================================================
+# In-process room snapshot; rebuilt on room writes, or after this many
+# seconds to pick up changes made by other processes (0 disables)
+ROOM_CATALOG_MAX_AGE_SECONDS = 300
+
+# Room status change feed polled by status boards
+ROOM_STATUS_CHANGE_RETENTION_DAYS = 30
+ROOM_STATUS_FEED_LIMIT = 500
+
+# Housekeeping queue re-reads next arrivals at least this often
+HOUSEKEEPING_ARRIVAL_REFRESH_SECONDS = 60
+
+# Search result cache; booking/block writes drop overlapping date ranges,
+# entries also expire after this many seconds (0 disables expiry)
+SEARCH_CACHE_MAX_ENTRIES = 256
+SEARCH_CACHE_TTL_SECONDS = 120
+SEARCH_PAGE_SIZE = 10
+SEARCH_PRICE_BUCKET_SIZE = 100
+
+# ============================================================================
+# ANALYTICS
+# ============================================================================
+# Booking pace matrix: lead times tracked (days before arrival), rows per
+# streamed chunk, and how often reads re-check for changed bookings
+PACE_MAX_LEAD_DAYS = 365
+PACE_FETCH_CHUNK_SIZE = 10000
+PACE_REFRESH_SECONDS = 60
+# Refreshes re-read bookings updated this long before the latest one seen,
+# so changes whose transaction committed late are not missed
+PACE_REREAD_SECONDS = 60
+PACE_REPORT_LEAD_DAYS = 90
+
+# Demand forecast: nights of history behind the seasonal factors, recent
+# nights that set the demand level, and nights forecast ahead
+FORECAST_HISTORY_DAYS = 730
+FORECAST_LEVEL_DAYS = 56
+FORECAST_HORIZON_DAYS = 90
+
+# ============================================================================
+# SYNTHETIC DATA
+# ============================================================================
+# Large-dataset generator (python -m database.synthetic_data); point
+# DATABASE_PATH at a scratch file before running it
+SYNTHETIC_INSERT_CHUNK_SIZE = 50000
+SYNTHETIC_ROOMS_PER_FLOOR = 50
+SYNTHETIC_CANCELLATION_RATE = 0.12
+SYNTHETIC_REVIEW_RATE = 0.3
+
 # ============================================================================
 # BUSINESS RULES
 # ============================================================================
+CHECK_IN_HOUR = 14
+CHECK_OUT_HOUR = 11
 MIN_BOOKING_DAYS = 1
 MAX_BOOKING_DAYS = 30
 MAX_ADVANCE_BOOKING_DAYS = 365
@@ -73,6 +145,14 @@ CANCELLATION_HOURS = 24
 CANCELLATION_FEE_PERCENTAGE = 20
 LOYALTY_POINTS_RATE = 10
 POINTS_TO_DOLLAR_RATE = 100
+LOYALTY_POINTS_EXPIRY_DAYS = 365
+LOYALTY_EXPIRY_BATCH_SIZE = 1000
+GROUP_BOOKING_MAX_ROOMS = 50
+
+# Room assignment optimizer: look-ahead window, and free runs of this many
+# nights or fewer between stays count as unsellable gaps
+ROOM_OPTIMIZER_HORIZON_DAYS = 90
+ROOM_OPTIMIZER_ORPHAN_GAP_NIGHTS = 1
 
 # ============================================================================
 # PRICING
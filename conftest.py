@@ -0,0 +1,7 @@
+"""
+pytest configuration.
+Loaded before collection: the tests package points DATABASE_PATH at a
+scratch database before test_email.py or any test imports config.
+"""
+
+import tests  # noqa: F401
@@ -0,0 +1,178 @@
+"""
+Audit log retention and archive.
+Moves audit entries older than the retention window into per-month
+gzip JSON-lines files and searches hot + archived entries by time range.
+Run: python -m database.audit_archive
+"""
+
+from database.db_manager import get_db_session
+from database.models import AuditLog
+from datetime import datetime, timedelta
+from pathlib import Path
+import gzip
+import json
+import logging
+import os
+import config
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ('log_id', 'user_id', 'action_type', 'description', 'ip_address', 'timestamp')
+
+
+class AuditArchive:
+    """Retention job and hot + archive query API for audit logs."""
+    
+    @staticmethod
+    def _archive_dir(archive_dir=None):
+        path = Path(archive_dir or config.AUDIT_ARCHIVE_DIR)
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+    
+    @staticmethod
+    def _month_file(archive_dir, year, month):
+        return archive_dir / f"audit_logs_{year:04d}_{month:02d}.jsonl.gz"
+    
+    @staticmethod
+    def _month_starts(start, end):
+        """Yield (year, month) for every month overlapping [start, end)."""
+        year, month = start.year, start.month
+        while datetime(year, month, 1) < end:
+            yield year, month
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    
+    @staticmethod
+    def archive_old_entries(retention_days=None, cutoff=None, chunk_size=None, archive_dir=None):
+        """
+        Move entries older than the cutoff to per-month archive files.
+        Each chunk is appended to its month files (as a new gzip member) and
+        fsynced before the same rows are deleted from the hot table. If a run
+        dies between the two steps, the rows are archived again next time;
+        readers dedupe by (log_id, timestamp).
+        Returns: (success, archived_count, message)
+        """
+        if cutoff is None:
+            days = retention_days if retention_days is not None else config.AUDIT_LOG_RETENTION_DAYS
+            cutoff = datetime.utcnow() - timedelta(days=days)
+        chunk_size = chunk_size or config.AUDIT_ARCHIVE_CHUNK_SIZE
+        archive_dir = AuditArchive._archive_dir(archive_dir)
+        
+        archived = 0
+        last_id = 0
+        try:
+            while True:
+                with get_db_session() as session:
+                    rows = session.query(*[getattr(AuditLog, f) for f in _FIELDS]).filter(
+                        AuditLog.timestamp < cutoff,
+                        AuditLog.log_id > last_id
+                    ).order_by(AuditLog.log_id).limit(chunk_size).all()
+                    
+                    if not rows:
+                        break
+                    
+                    by_month = {}
+                    for row in rows:
+                        entry = dict(zip(_FIELDS, row))
+                        ts = entry['timestamp']
+                        entry['timestamp'] = ts.isoformat()
+                        by_month.setdefault((ts.year, ts.month), []).append(entry)
+                    
+                    for (year, month), entries in by_month.items():
+                        path = AuditArchive._month_file(archive_dir, year, month)
+                        with open(path, 'ab') as raw:
+                            with gzip.GzipFile(fileobj=raw, mode='ab') as gz:
+                                for entry in entries:
+                                    gz.write((json.dumps(entry) + "\n").encode('utf-8'))
+                            raw.flush()
+                            os.fsync(raw.fileno())
+                    
+                    ids = [row.log_id for row in rows]
+                    session.query(AuditLog).filter(
+                        AuditLog.log_id.in_(ids)
+                    ).delete(synchronize_session=False)
+                
+                archived += len(rows)
+                last_id = rows[-1].log_id
+            
+            logger.info(f"Archived {archived} audit entries older than {cutoff}")
+            return True, archived, f"Archived {archived} audit entries"
+        except Exception as e:
+            logger.error(f"Audit archive failed: {str(e)}")
+            return False, archived, f"Audit archive failed: {str(e)}"
+    
+    @staticmethod
+    def get_archive_months(archive_dir=None):
+        """List archived (year, month) partitions, oldest first."""
+        archive_dir = AuditArchive._archive_dir(archive_dir)
+        months = []
+        for path in archive_dir.glob("audit_logs_*_*.jsonl.gz"):
+            _, _, year, month = path.name.split('.')[0].split('_')
+            months.append((int(year), int(month)))
+        return sorted(months)
+    
+    @staticmethod
+    def _read_month(archive_dir, year, month):
+        path = AuditArchive._month_file(archive_dir, year, month)
+        if not path.exists():
+            return
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    
+    @staticmethod
+    def query_logs(start, end, action_type=None, user_id=None, limit=None, archive_dir=None):
+        """
+        Search audit entries in [start, end) across the hot table and archive.
+        Only month files overlapping the range are opened. Entries are
+        deduped by (log_id, timestamp): tables created before log_ids were
+        AUTOINCREMENT reuse the ids of archived rows.
+        Returns list of dictionaries, newest first.
+        """
+        archive_dir = AuditArchive._archive_dir(archive_dir)
+        results = {}
+        
+        try:
+            with get_db_session() as session:
+                query = session.query(*[getattr(AuditLog, f) for f in _FIELDS]).filter(
+                    AuditLog.timestamp >= start,
+                    AuditLog.timestamp < end
+                )
+                if action_type:
+                    query = query.filter(AuditLog.action_type == action_type)
+                if user_id is not None:
+                    query = query.filter(AuditLog.user_id == user_id)
+                
+                for row in query.all():
+                    results[(row.log_id, row.timestamp)] = dict(zip(_FIELDS, row))
+            
+            archived = set(AuditArchive.get_archive_months(archive_dir))
+            for year, month in AuditArchive._month_starts(start, end):
+                if (year, month) not in archived:
+                    continue
+                for entry in AuditArchive._read_month(archive_dir, year, month):
+                    ts = datetime.fromisoformat(entry['timestamp'])
+                    if (entry['log_id'], ts) in results or not start <= ts < end:
+                        continue
+                    if action_type and entry['action_type'] != action_type:
+                        continue
+                    if user_id is not None and entry['user_id'] != user_id:
+                        continue
+                    entry['timestamp'] = ts
+                    results[(entry['log_id'], ts)] = entry
+            
+            entries = sorted(results.values(), key=lambda e: (e['timestamp'], e['log_id']), reverse=True)
+            return entries[:limit] if limit else entries
+        except Exception as e:
+            logger.error(f"Audit query failed: {str(e)}")
+            return []
+
+
+def main():
+    """Run the retention job with configured settings."""
+    success, count, message = AuditArchive.archive_old_entries()
+    print(("✅ " if success else "❌ ") + message)
+
+
+if __name__ == "__main__":
+    main()
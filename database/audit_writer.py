@@ -0,0 +1,141 @@
+"""
+Buffered audit log writer.
+Queues audit entries and writes them in batched multi-row inserts on a
+background thread, so request paths never open a transaction just to log.
+"""
+
+from database.models import AuditLog, get_session
+from sqlalchemy import insert
+from datetime import datetime
+import atexit
+import logging
+import queue
+import threading
+import time
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter:
+    """Background batching writer for AuditLog rows."""
+    
+    _STOP = object()
+    
+    def __init__(self, batch_size=None, flush_interval=None, max_queue=None):
+        self.batch_size = batch_size or config.AUDIT_LOG_BATCH_SIZE
+        self.flush_interval = flush_interval or config.AUDIT_LOG_FLUSH_INTERVAL_SECONDS
+        self._queue = queue.Queue(maxsize=max_queue or config.AUDIT_LOG_QUEUE_MAX)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.stats = {'written': 0, 'batches': 0, 'dropped': 0}
+    
+    def submit(self, user_id, action_type, description, ip_address=None):
+        """Queue an audit entry. Timestamp is taken now, not at flush time."""
+        entry = {
+            'user_id': user_id,
+            'action_type': action_type,
+            'description': description,
+            'ip_address': ip_address,
+            'timestamp': datetime.utcnow()
+        }
+        self._ensure_started()
+        
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            # Backpressure: drain synchronously rather than lose entries
+            self.flush()
+            self._queue.put(entry)
+    
+    def flush(self):
+        """Write everything currently queued. Returns number of rows written."""
+        batch = []
+        written = 0
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                continue
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                written += self._write(batch)
+                batch = []
+        
+        if batch:
+            written += self._write(batch)
+        return written
+    
+    def close(self):
+        """Stop the background thread and flush remaining entries."""
+        thread = self._thread
+        if thread and thread.is_alive():
+            self._queue.put(self._STOP)
+            thread.join(timeout=self.flush_interval * 5)
+        self._thread = None
+        self.flush()
+    
+    def pending(self):
+        """Approximate number of queued entries."""
+        return self._queue.qsize()
+    
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        """Collect entries until batch_size or flush_interval, then write."""
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            self._write(batch)
+            if stop:
+                return
+    
+    def _write(self, batch):
+        """Insert batch as one multi-row INSERT in one transaction."""
+        with self._write_lock:
+            session = get_session()
+            try:
+                session.execute(insert(AuditLog), batch)
+                session.commit()
+                self.stats['written'] += len(batch)
+                self.stats['batches'] += 1
+                return len(batch)
+            except Exception as e:
+                session.rollback()
+                self.stats['dropped'] += len(batch)
+                logger.error(f"Failed to write {len(batch)} audit entries: {str(e)}")
+                return 0
+            finally:
+                session.close()
+
+
+# Process-wide writer; flushed on interpreter shutdown
+audit_writer = AuditLogWriter()
+atexit.register(audit_writer.close)
@@ -8,6 +8,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import text 
 from contextlib import contextmanager
 import logging
+import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -43,8 +44,27 @@ class DatabaseManager:
             return False
     
     @staticmethod
-    def log_action(user_id, action_type, description, ip_address=None):
-        """Log user actions for audit trail."""
+    def log_action(user_id, action_type, description, ip_address=None, session=None):
+        """
+        Log user actions for audit trail.
+        With `session`, the entry is added to the caller's transaction and
+        committed with it. Otherwise it is queued on the buffered writer
+        (AUDIT_LOG_BUFFERED) or written in its own transaction.
+        """
+        if session is not None:
+            session.add(AuditLog(
+                user_id=user_id,
+                action_type=action_type,
+                description=description,
+                ip_address=ip_address
+            ))
+            return True
+        
+        if config.AUDIT_LOG_BUFFERED:
+            from database.audit_writer import audit_writer
+            audit_writer.submit(user_id, action_type, description, ip_address)
+            return True
+        
         try:
             with get_db_session() as session:
                 log = AuditLog(
@@ -1,10 +1,11 @@
 """
 SQLAlchemy ORM models for all database tables.
-Defines User, Room, Booking, Payment, Review, AdminUser, PromoCode, and AuditLog.
+Defines User, Room, Booking, Payment, Review, AdminUser, PromoCode, AuditLog,
+and the supporting summary/tracking tables.
 UPDATED: Added National ID and Check-in/Check-out fields
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, JSON, Date
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, Boolean, ForeignKey, JSON, Date, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -40,6 +41,11 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Keyset pagination of the guest directory (newest first)
+    __table_args__ = (
+        Index('ix_users_created_id', 'created_at', 'user_id'),
+    )
+    
     bookings = relationship("Booking", back_populates="user", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="user", cascade="all, delete-orphan")
 
@@ -57,13 +63,14 @@ class Room(Base):
     amenities = Column(JSON)
     floor_number = Column(Integer)
     view_type = Column(String(50))
-    status = Column(String(20), default='available')
+    status = Column(String(20), default='available', index=True)
     images = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     bookings = relationship("Booking", back_populates="room", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="room", cascade="all, delete-orphan")
+    blocks = relationship("RoomBlock", back_populates="room", cascade="all, delete-orphan")
 
 
 class Booking(Base):
@@ -95,10 +102,47 @@ class Booking(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Per-room date lookups (next arrival, overlap checks); changed-since reads
+    __table_args__ = (
+        Index('ix_bookings_room_checkin', 'room_id', 'check_in_date'),
+        Index('ix_bookings_updated_at', 'updated_at'),
+    )
+    
     user = relationship("User", back_populates="bookings")
     room = relationship("Room", back_populates="bookings")
     payment = relationship("Payment", back_populates="booking", uselist=False, cascade="all, delete-orphan")
     review = relationship("Review", back_populates="booking", uselist=False, cascade="all, delete-orphan")
+    room_lock = relationship("RoomAssignmentLock", uselist=False, cascade="all, delete-orphan")
+
+
+class RoomAssignmentLock(Base):
+    """Booking whose room must not be changed by the room assignment optimizer."""
+    __tablename__ = 'room_assignment_locks'
+    
+    booking_id = Column(Integer, ForeignKey('bookings.booking_id'), primary_key=True)
+    locked_by = Column(Integer, ForeignKey('admin_users.admin_id'))
+    reason = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class RoomBlock(Base):
+    """Date range a room is out of order (maintenance, renovation); end_date is exclusive."""
+    __tablename__ = 'room_blocks'
+    
+    block_id = Column(Integer, primary_key=True, autoincrement=True)
+    room_id = Column(Integer, ForeignKey('rooms.room_id'), nullable=False)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    reason = Column(String(255))
+    created_by = Column(Integer, ForeignKey('admin_users.admin_id'))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Same overlap lookup as bookings (room_id, start)
+    __table_args__ = (
+        Index('ix_room_blocks_room_start', 'room_id', 'start_date'),
+    )
+    
+    room = relationship("Room", back_populates="blocks")
 
 
 class Payment(Base):
@@ -132,11 +176,103 @@ class Review(Base):
     status = Column(String(20), default='approved')
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Keyset pagination of review feeds: newest first, highest rated (scanned
+    # backwards) and lowest rated, each newest first within a rating
+    __table_args__ = (
+        Index('ix_reviews_status_date_id', 'status', 'review_date', 'review_id'),
+        Index('ix_reviews_status_rating_date_id', 'status', 'rating', 'review_date', 'review_id'),
+        Index('ix_reviews_status_rating_date_desc_id', status, rating, review_date.desc(), review_id.desc()),
+    )
+    
     user = relationship("User", back_populates="reviews")
     room = relationship("Room", back_populates="reviews")
     booking = relationship("Booking", back_populates="review")
 
 
+class RoomRatingSummary(Base):
+    """Per-room aggregate of approved review ratings."""
+    __tablename__ = 'room_rating_summaries'
+    
+    room_id = Column(Integer, ForeignKey('rooms.room_id'), primary_key=True)
+    review_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    stars_1 = Column(Integer, default=0, nullable=False)
+    stars_2 = Column(Integer, default=0, nullable=False)
+    stars_3 = Column(Integer, default=0, nullable=False)
+    stars_4 = Column(Integer, default=0, nullable=False)
+    stars_5 = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserStatsSummary(Base):
+    """Per-user booking counts and spend, kept in step with booking status changes."""
+    __tablename__ = 'user_stats_summaries'
+    
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    active_bookings = Column(Integer, default=0, nullable=False)  # confirmed + pending
+    completed_bookings = Column(Integer, default=0, nullable=False)
+    cancelled_bookings = Column(Integer, default=0, nullable=False)
+    total_spent = Column(Float, default=0.0, nullable=False)  # confirmed + completed
+    last_stay = Column(DateTime)  # latest check-out of a completed booking
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class LoyaltyLedgerEntry(Base):
+    """Append-only loyalty points history; users.loyalty_points caches the sum."""
+    __tablename__ = 'loyalty_ledger'
+    
+    entry_id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False, index=True)
+    booking_id = Column(Integer, ForeignKey('bookings.booking_id'))
+    entry_type = Column(String(20), nullable=False)  # opening, earn, redeem, expire
+    points = Column(Integer, nullable=False)  # signed change to the balance
+    remaining = Column(Integer, default=0, nullable=False)  # unspent points of an earn entry
+    description = Column(String(255))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime)
+    
+    # Expiry job scans open earn entries; redemption consumes them oldest first
+    __table_args__ = (
+        Index('ix_loyalty_ledger_open_lots', 'user_id', 'remaining', 'expires_at'),
+        Index('ix_loyalty_ledger_expiry', 'expires_at', 'remaining'),
+    )
+
+
+class RoomStatusCount(Base):
+    """Number of rooms in each status, kept in step with room status changes."""
+    __tablename__ = 'room_status_counts'
+    
+    status = Column(String(20), primary_key=True)
+    room_count = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RoomTypeNightCount(Base):
+    """Rooms of one type sold (confirmed/pending bookings) and blocked on one night."""
+    __tablename__ = 'room_type_night_counts'
+    
+    room_type = Column(String(50), primary_key=True)
+    night = Column(Date, primary_key=True)  # the night starting on this date
+    sold = Column(Integer, default=0, nullable=False)
+    blocked = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class RoomStatusChange(Base):
+    """Append-only feed of room status transitions; seq only ever increases."""
+    __tablename__ = 'room_status_changes'
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    room_id = Column(Integer, nullable=False, index=True)  # no FK: outlives deleted rooms
+    room_number = Column(String(10))
+    old_status = Column(String(20))  # None when the room was created
+    new_status = Column(String(20))  # None when the room was deleted
+    changed_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # AUTOINCREMENT keeps SQLite from reusing seq values after pruning
+    __table_args__ = ({'sqlite_autoincrement': True},)
+
+
 class AdminUser(Base):
     """Admin and staff accounts."""
     __tablename__ = 'admin_users'
@@ -176,6 +312,18 @@ class AuditLog(Base):
     description = Column(Text)
     ip_address = Column(String(50))
     timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Never reuse ids of archived (deleted) rows
+    __table_args__ = ({'sqlite_autoincrement': True},)
+
+
+class LoginAttempt(Base):
+    """Failed login attempts used by the login throttle."""
+    __tablename__ = 'login_attempts'
+    
+    attempt_id = Column(Integer, primary_key=True, autoincrement=True)
+    throttle_key = Column(String(300), nullable=False, index=True)
+    attempted_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
 # Database engine and session
@@ -186,9 +334,62 @@ SessionLocal = sessionmaker(bind=engine)
 def init_database():
     """Create all database tables."""
     Base.metadata.create_all(engine)
+    
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    
+    create_user_search_index()
     print("Database initialized successfully!")
 
 
+def create_user_search_index():
+    """
+    Create the FTS5 index over user names and emails (SQLite only), kept in
+    sync by triggers. Returns False if FTS5 is not available.
+    """
+    if engine.dialect.name != 'sqlite':
+        return False
+    
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'users_fts'"
+            )).first()
+            
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+                "first_name, last_name, email, content='users', content_rowid='user_id')"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN "
+                "INSERT INTO users_fts(rowid, first_name, last_name, email) "
+                "VALUES (new.user_id, new.first_name, new.last_name, new.email); END"
+            ))
+            conn.execute(text(
+                "CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN "
+                "INSERT INTO users_fts(users_fts, rowid, first_name, last_name, email) "
+                "VALUES ('delete', old.user_id, old.first_name, old.last_name, old.email); END"
+            ))
+            # Only re-index when indexed columns change (balance updates skip FTS)
+            conn.execute(text("DROP TRIGGER IF EXISTS users_fts_au"))
+            conn.execute(text(
+                "CREATE TRIGGER users_fts_au AFTER UPDATE OF first_name, last_name, email ON users BEGIN "
+                "INSERT INTO users_fts(users_fts, rowid, first_name, last_name, email) "
+                "VALUES ('delete', old.user_id, old.first_name, old.last_name, old.email); "
+                "INSERT INTO users_fts(rowid, first_name, last_name, email) "
+                "VALUES (new.user_id, new.first_name, new.last_name, new.email); END"
+            ))
+            
+            if not exists:
+                conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        return True
+    except Exception as e:
+        print(f"User search index unavailable: {e}")
+        return False
+
+
 def get_session():
     """Get a new database session."""
     return SessionLocal()
@@ -0,0 +1,363 @@
+"""
+Generate a large synthetic dataset for performance work.
+Rooms, guests, bookings (with seasonality and realistic status mixes),
+payments, reviews and audit rows are generated with numpy from a fixed seed
+and loaded with chunked Core executemany inserts, then every summary table
+is rebuilt once. Point DATABASE_PATH at a scratch file first:
+
+Run: DATABASE_PATH=/tmp/hotel_large.db python -m database.synthetic_data --rooms 10000 --bookings 1000000
+"""
+
+from database.models import (init_database, get_session, engine, Room, User, Booking, Payment, Review,
+                             AuditLog, AdminUser, PromoCode)
+from database.seed_data import seed_admin_users, seed_promo_codes
+from backend.auth.authentication import AuthenticationManager
+from backend.user.user_manager import UserManager
+from backend.user.review_manager import ReviewManager
+from backend.room.inventory_manager import InventoryManager
+from backend.room.room_type_inventory import RoomTypeInventory
+from sqlalchemy import func
+from datetime import date, datetime
+import argparse
+import time
+import numpy as np
+import config
+
+FIRST_NAMES = ['James', 'Mary', 'Ahmed', 'Sara', 'Wei', 'Yuki', 'Carlos', 'Ana', 'Omar', 'Lena',
+               'David', 'Fatima', 'Ivan', 'Nora', 'Kofi', 'Maya', 'Lucas', 'Aisha', 'Tom', 'Elena']
+LAST_NAMES = ['Smith', 'Garcia', 'Hassan', 'Chen', 'Tanaka', 'Silva', 'Khan', 'Muller', 'Rossi', 'Novak',
+              'Brown', 'Ali', 'Kim', 'Lopez', 'Mensah', 'Ivanova', 'Martin', 'Haddad', 'Costa', 'Berg']
+CITIES = [('New York', 'USA'), ('London', 'UK'), ('Cairo', 'Egypt'), ('Tokyo', 'Japan'), ('Paris', 'France'),
+          ('Dubai', 'UAE'), ('Madrid', 'Spain'), ('Berlin', 'Germany'), ('Toronto', 'Canada'), ('Sydney', 'Australia')]
+AUDIT_ACTIONS = ['user_login', 'booking_create', 'booking_cancel', 'booking_room_reassign']
+AUDIT_ACTION_WEIGHTS = [0.7, 0.22, 0.05, 0.03]
+RATING_WEIGHTS = [0.03, 0.05, 0.12, 0.35, 0.45]  # 1 to 5 stars
+
+
+def _next_id(column):
+    """First free primary key value, so generated rows can reference each other."""
+    session = get_session()
+    try:
+        return (session.query(func.max(column)).scalar() or 0) + 1
+    finally:
+        session.close()
+
+
+def _timestamps(days, seconds=0):
+    """datetime64[s] values for day numbers (days since 1970-01-01) plus seconds."""
+    return (np.asarray(days, dtype=np.int64) * 86400 + seconds).astype('datetime64[s]')
+
+
+def _insert(table, columns):
+    """Insert equal-length column arrays into table with chunked executemany. Returns rows inserted."""
+    names = list(columns)
+    total = len(columns[names[0]])
+    chunk_size = config.SYNTHETIC_INSERT_CHUNK_SIZE
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        for start in range(0, total, chunk_size):
+            values = [columns[name][start:start + chunk_size] for name in names]
+            values = [v.tolist() if isinstance(v, np.ndarray) else list(v) for v in values]
+            conn.execute(table.__table__.insert(), [dict(zip(names, row)) for row in zip(*values)])
+    return total
+
+
+def season_weights(days):
+    """
+    Relative demand for arrivals on each day number: peak months
+    (PEAK_SEASON_MONTHS) and Friday/Saturday arrivals are busier, January
+    and February quieter. Scaled so the busiest day is 1.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    month = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12 + 1
+    weekday = (days + 3) % 7  # Monday 0; 1970-01-01 was a Thursday
+    weights = np.where(np.isin(month, config.PEAK_SEASON_MONTHS), 1.0, 0.7)
+    weights = np.where(np.isin(month, [1, 2]), 0.5, weights)
+    weights = weights * np.where(np.isin(weekday, [4, 5]), 1.0, 0.85)
+    return weights
+
+
+def generate_rooms(rng, num_rooms):
+    """Rooms in the seed_rooms layout (every type on every floor), SYNTHETIC_ROOMS_PER_FLOOR per floor."""
+    first_id = _next_id(Room.room_id)
+    session = get_session()
+    try:
+        first_floor = (session.query(func.max(Room.floor_number)).scalar() or 0) + 1
+    finally:
+        session.close()
+    
+    per_floor = config.SYNTHETIC_ROOMS_PER_FLOOR
+    types = list(config.ROOM_TYPES)
+    position = np.arange(num_rooms)
+    floor = first_floor + position // per_floor
+    type_index = position % len(types)
+    details = [config.ROOM_TYPES[types[i]] for i in type_index]
+    now = datetime.utcnow()
+    
+    _insert(Room, {
+        'room_id': first_id + position,
+        'room_number': [str(f * 100 + p + 1) for f, p in zip(floor.tolist(), (position % per_floor).tolist())],
+        'room_type': [types[i] for i in type_index],
+        'capacity': [d['capacity'] for d in details],
+        'base_price_per_night': [float(d['base_price']) for d in details],
+        'description': [d['description'] for d in details],
+        'amenities': [d['amenities'] for d in details],
+        'floor_number': floor,
+        'view_type': rng.choice(['City', 'Garden', 'Sea'], num_rooms),
+        # A few rooms out of service
+        'status': np.where(rng.random(num_rooms) < 0.01, 'maintenance', 'available'),
+        'images': [[]] * num_rooms,
+        'created_at': [now] * num_rooms,
+        'updated_at': [now] * num_rooms
+    })
+    return first_id + position, type_index
+
+
+def generate_users(rng, num_users, first_day, today):
+    """Guest accounts sharing one password hash ("password123"), joined over the date range."""
+    first_id = _next_id(User.user_id)
+    user_ids = first_id + np.arange(num_users)
+    password_hash = AuthenticationManager.hash_password('password123')
+    city = rng.integers(0, len(CITIES), num_users)
+    joined = _timestamps(rng.integers(first_day - 365, today, num_users), rng.integers(0, 86400, num_users))
+    
+    _insert(User, {
+        'user_id': user_ids,
+        'email': [f"guest{user_id}@example.com" for user_id in user_ids.tolist()],
+        'password_hash': [password_hash] * num_users,
+        'first_name': np.array(FIRST_NAMES)[rng.integers(0, len(FIRST_NAMES), num_users)],
+        'last_name': np.array(LAST_NAMES)[rng.integers(0, len(LAST_NAMES), num_users)],
+        'phone_number': [f"+1{n:010d}" for n in rng.integers(2000000000, 9999999999, num_users).tolist()],
+        'city': [CITIES[c][0] for c in city.tolist()],
+        'country': [CITIES[c][1] for c in city.tolist()],
+        'loyalty_points': np.zeros(num_users, dtype=np.int64),
+        'account_status': np.where(rng.random(num_users) < 0.02, 'suspended', 'active'),
+        'created_at': joined,
+        'updated_at': joined
+    })
+    return user_ids
+
+
+def _stays(rng, num_rooms, num_bookings, first_day, last_day):
+    """
+    Non-overlapping stays per room between first_day and last_day (day numbers).
+    Each room gets a chain of stays and gaps; chains are thinned by
+    season_weights so quiet periods have longer gaps.
+    Returns (room position, check-in day, nights) arrays, at most num_bookings long.
+    """
+    span = last_day - first_day
+    keep_rate = float(season_weights(np.arange(first_day, last_day)).mean())
+    per_room = num_bookings / num_rooms / keep_rate
+    slots = int(np.ceil(per_room * 1.3)) + 2
+    
+    nights = np.minimum(rng.geometric(0.4, (num_rooms, slots)), config.MAX_BOOKING_DAYS)
+    gap_mean = max(span / per_room - 2.5, 0.0)
+    gaps = rng.geometric(1 / (gap_mean + 1), (num_rooms, slots)) - 1
+    offset = rng.integers(0, int(gap_mean) + 2, (num_rooms, 1))
+    check_in = first_day + offset + np.cumsum(gaps + nights, axis=1) - nights
+    
+    keep = check_in + nights <= last_day
+    keep &= rng.random(check_in.shape) < season_weights(np.where(keep, check_in, first_day))
+    rooms, slot = np.nonzero(keep)
+    if len(rooms) > num_bookings:
+        chosen = np.sort(rng.choice(len(rooms), num_bookings, replace=False))
+        rooms, slot = rooms[chosen], slot[chosen]
+    return rooms, check_in[rooms, slot], nights[rooms, slot]
+
+
+def generate_bookings(rng, room_ids, room_types, user_ids, num_bookings, first_day, last_day, today):
+    """
+    Bookings with payments. Past stays are mostly completed, current ones
+    checked in, future ones confirmed or pending; SYNTHETIC_CANCELLATION_RATE
+    of all bookings are cancelled before arrival.
+    Returns a dict of booking columns for the review generator.
+    """
+    rooms, check_in, nights = _stays(rng, len(room_ids), num_bookings, first_day, last_day)
+    count = len(rooms)
+    
+    # Booked 0 to MAX_ADVANCE_BOOKING_DAYS ahead, most within a month or two
+    lead = np.minimum(rng.exponential(35, count).astype(np.int64), config.MAX_ADVANCE_BOOKING_DAYS)
+    created_day = np.minimum(check_in - lead, today)
+    order = np.lexsort((check_in, created_day))  # ids in booking order
+    rooms, check_in, nights, created_day = rooms[order], check_in[order], nights[order], created_day[order]
+    check_out = check_in + nights
+    created = _timestamps(created_day, rng.integers(8 * 3600, 23 * 3600, count))
+    
+    types = list(config.ROOM_TYPES)
+    base_price = np.array([float(config.ROOM_TYPES[t]['base_price']) for t in types])[room_types[rooms]]
+    month = check_in.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12 + 1
+    season = np.where(np.isin(month, config.PEAK_SEASON_MONTHS), 1 + config.PEAK_SEASON_INCREASE / 100, 1.0)
+    total = np.round(base_price * season * nights * (1 + config.TAX_PERCENTAGE / 100), 2)
+    
+    past = check_out <= today
+    in_house = (check_in <= today) & ~past
+    cancelled = (rng.random(count) < config.SYNTHETIC_CANCELLATION_RATE) & (created_day < check_in) & ~in_house
+    pending = ~past & ~in_house & ~cancelled & (rng.random(count) < 0.06)
+    status = np.select([cancelled, past, pending], ['cancelled', 'completed', 'pending'], 'confirmed')
+    
+    # Cancelled some time between booking and arrival (and not after today)
+    cancel_day = created_day + (rng.random(count) * (np.minimum(check_in, today) - created_day)).astype(np.int64)
+    updated = np.where(cancelled, _timestamps(cancel_day, 10 * 3600), created)
+    updated = np.where(past & ~cancelled, _timestamps(check_out, config.CHECK_OUT_HOUR * 3600), updated)
+    arrived = (past | in_house) & ~cancelled
+    no_time = np.array('NaT', dtype='datetime64[s]')
+    
+    booking_ids = _next_id(Booking.booking_id) + np.arange(count)
+    check_in_at = _timestamps(check_in, config.CHECK_IN_HOUR * 3600)
+    check_out_at = _timestamps(check_out, config.CHECK_OUT_HOUR * 3600)
+    capacity = np.array([config.ROOM_TYPES[t]['capacity'] for t in types])[room_types[rooms]]
+    guests = user_ids[rng.integers(0, len(user_ids), count)]
+    
+    _insert(Booking, {
+        'booking_id': booking_ids,
+        'user_id': guests,
+        'room_id': room_ids[rooms],
+        'check_in_date': check_in_at,
+        'check_out_date': check_out_at,
+        'num_guests': 1 + (rng.random(count) * capacity).astype(np.int64),
+        'total_amount': total,
+        'booking_status': status,
+        'booking_reference': [f"SYN{booking_id:09d}" for booking_id in booking_ids.tolist()],
+        'actual_check_in': np.where(arrived, check_in_at, no_time),
+        'actual_check_out': np.where(past & ~cancelled, check_out_at, no_time),
+        'id_verified': arrived,
+        'created_at': created,
+        'updated_at': updated
+    })
+    
+    # One payment per booking that got past pending; cancelled ones refunded
+    paid = ~pending
+    payment_ids = _next_id(Payment.payment_id) + np.arange(int(paid.sum()))
+    _insert(Payment, {
+        'payment_id': payment_ids,
+        'booking_id': booking_ids[paid],
+        'amount': total[paid],
+        'payment_method': np.array(config.PAYMENT_METHODS)[rng.integers(0, len(config.PAYMENT_METHODS), int(paid.sum()))],
+        'transaction_id': [f"TXNSYN{payment_id:010d}" for payment_id in payment_ids.tolist()],
+        'payment_status': np.where(cancelled[paid], 'refunded', 'completed'),
+        'payment_date': created[paid] + 120,
+        'created_at': created[paid] + 120
+    })
+    
+    return {
+        'booking_id': booking_ids,
+        'user_id': guests,
+        'room_id': room_ids[rooms],
+        'check_out': check_out,
+        'completed': past & ~cancelled
+    }
+
+
+def generate_reviews(rng, bookings, today):
+    """Approved reviews for SYNTHETIC_REVIEW_RATE of completed stays, written within two weeks of check-out."""
+    reviewed = bookings['completed'] & (rng.random(len(bookings['completed'])) < config.SYNTHETIC_REVIEW_RATE)
+    count = int(reviewed.sum())
+    if count == 0:
+        return 0
+    written = np.minimum(bookings['check_out'][reviewed] + rng.integers(0, 14, count), today)
+    written_at = _timestamps(written, rng.integers(8 * 3600, 23 * 3600, count))
+    return _insert(Review, {
+        'review_id': _next_id(Review.review_id) + np.arange(count),
+        'user_id': bookings['user_id'][reviewed],
+        'room_id': bookings['room_id'][reviewed],
+        'booking_id': bookings['booking_id'][reviewed],
+        'rating': rng.choice(np.arange(1, 6), count, p=RATING_WEIGHTS),
+        'comment': rng.choice(['Great stay', 'Lovely room', 'Friendly staff', 'Could be cleaner', 'Noisy at night'], count),
+        'review_date': written_at,
+        'status': np.full(count, 'approved'),
+        'created_at': written_at
+    })
+
+
+def generate_audit_logs(rng, user_ids, num_rows, first_day, today):
+    """Audit trail rows spread over the date range."""
+    action = rng.choice(len(AUDIT_ACTIONS), num_rows, p=AUDIT_ACTION_WEIGHTS)
+    return _insert(AuditLog, {
+        'log_id': _next_id(AuditLog.log_id) + np.arange(num_rows),
+        'user_id': user_ids[rng.integers(0, len(user_ids), num_rows)],
+        'action_type': np.array(AUDIT_ACTIONS)[action],
+        'description': np.array(['User logged in', 'Booking created', 'Booking cancelled', 'Booking moved'])[action],
+        'ip_address': [f"10.{a}.{b}.{c}" for a, b, c in rng.integers(0, 256, (num_rows, 3)).tolist()],
+        'timestamp': np.sort(_timestamps(rng.integers(first_day, today + 1, num_rows), rng.integers(0, 86400, num_rows)))
+    })
+
+
+def rebuild_summaries():
+    """Rebuild user stats, rating summaries, room status counts and nightly room-type counts once."""
+    print("Rebuilding summary tables...")
+    print(f"  User stats: {UserManager.rebuild_user_stats()[1]} users")
+    print(f"  Rating summaries: {ReviewManager.rebuild_rating_summaries()[1]} rooms")
+    print(f"  {InventoryManager.rebuild_status_counts()[1]}")
+    print(f"  {RoomTypeInventory.repair_counts()[2]}")
+
+
+def generate(num_rooms=1000, num_users=None, num_bookings=100000, num_audit=None, years_back=2, seed=42,
+             append=False):
+    """
+    Generate and load a synthetic dataset. Bookings run from years_back
+    years ago to MAX_ADVANCE_BOOKING_DAYS ahead. Refuses to add to a
+    database that already has bookings unless append.
+    Returns a dict of row counts per table.
+    """
+    init_database()
+    session = get_session()
+    try:
+        has_bookings = session.query(Booking.booking_id).first() is not None
+        has_admins = session.query(AdminUser.admin_id).first() is not None
+        has_promos = session.query(PromoCode.promo_id).first() is not None
+    finally:
+        session.close()
+    if has_bookings and not append:
+        raise ValueError(f"{config.DATABASE_PATH} already has bookings; set DATABASE_PATH to a scratch file or pass --append")
+    if not has_admins:
+        seed_admin_users()
+    if not has_promos:
+        seed_promo_codes()
+    
+    rng = np.random.default_rng(seed)
+    today = int(np.datetime64(date.today(), 'D').astype(np.int64))
+    first_day = today - 365 * years_back
+    last_day = today + config.MAX_ADVANCE_BOOKING_DAYS
+    num_users = num_users or max(num_bookings // 4, 1)
+    num_audit = num_bookings if num_audit is None else num_audit
+    
+    started = time.perf_counter()
+    room_ids, room_types = generate_rooms(rng, num_rooms)
+    print(f"✅ {len(room_ids)} rooms ({time.perf_counter() - started:.1f}s)")
+    user_ids = generate_users(rng, num_users, first_day, today)
+    print(f"✅ {len(user_ids)} users ({time.perf_counter() - started:.1f}s)")
+    
+    bookings = generate_bookings(rng, room_ids, room_types, user_ids, num_bookings, first_day, last_day, today)
+    counts = {'rooms': len(room_ids), 'users': len(user_ids), 'bookings': len(bookings['booking_id'])}
+    print(f"✅ {counts['bookings']} bookings with payments ({time.perf_counter() - started:.1f}s)")
+    counts['reviews'] = generate_reviews(rng, bookings, today)
+    print(f"✅ {counts['reviews']} reviews ({time.perf_counter() - started:.1f}s)")
+    counts['audit_logs'] = generate_audit_logs(rng, user_ids, num_audit, first_day, today)
+    print(f"✅ {counts['audit_logs']} audit rows ({time.perf_counter() - started:.1f}s)")
+    
+    rebuild_summaries()
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Generate a large synthetic hotel dataset.")
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=None, help="default: a quarter of the bookings")
+    parser.add_argument('--bookings', type=int, default=100000)
+    parser.add_argument('--audit', type=int, default=None, help="audit rows (default: one per booking)")
+    parser.add_argument('--years-back', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--append', action='store_true', help="add to a database that already has bookings")
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"🌱 Generating synthetic data into {config.DATABASE_PATH}")
+    print("=" * 60)
+    generate(args.rooms, args.users, args.bookings, args.audit, args.years_back, args.seed, args.append)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,13 @@ Enhanced with Dark Luxury Theme
 """
 import streamlit as st
 from backend.room.room_manager import RoomManager
-from database.db_manager import get_db_session
-from database.models import Room, User, Booking
+from backend.room.room_block_manager import RoomBlockManager
+from backend.room.room_type_inventory import RoomTypeInventory
+from backend.user.user_manager import UserManager
 from utils.ui_components import SolivieUI
 from utils.helpers import format_currency
 from utils.constants import RoomStatus
-from datetime import date
+from datetime import date, timedelta
 import config
 
 
@@ -205,7 +206,7 @@ with tab1:
     """, unsafe_allow_html=True)
     
     # Sub-tabs
-    room_tab1, room_tab2, room_tab3 = st.tabs(["📋 View Rooms", "➕ Add Room", "✏️ Edit Room"])
+    room_tab1, room_tab2, room_tab3, room_tab4 = st.tabs(["📋 View Rooms", "➕ Add Room", "✏️ Edit Room", "🚧 Room Blocks"])
     
     # ===== SUB-TAB 1: VIEW ROOMS =====
     with room_tab1:
@@ -239,29 +240,11 @@ with tab1:
         
         # Get rooms
         with st.spinner("🛏️ Loading rooms..."):
-            with get_db_session() as session:
-                query = session.query(Room)
-                
-                if filter_type != "All":
-                    query = query.filter_by(room_type=filter_type)
-                if filter_status != "All":
-                    query = query.filter_by(status=filter_status)
-                
-                rooms = query.all()
-                
-                rooms_data = []
-                for room in rooms:
-                    rooms_data.append({
-                        'room_id': room.room_id,
-                        'room_number': room.room_number,
-                        'room_type': room.room_type,
-                        'capacity': room.capacity,
-                        'floor_number': room.floor_number,
-                        'view_type': room.view_type,
-                        'description': room.description,
-                        'base_price_per_night': room.base_price_per_night,
-                        'status': room.status
-                    })
+            rooms = RoomManager.get_all_rooms(
+                room_type=filter_type if filter_type != "All" else None,
+                status=filter_status if filter_status != "All" else None
+            )
+            rooms_data = [room.to_dict() for room in rooms]
         
         st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
         
@@ -508,22 +491,10 @@ with tab1:
         """, unsafe_allow_html=True)
         
         # Get all rooms for selection
-        with get_db_session() as session:
-            all_rooms = session.query(Room).order_by(Room.room_number).all()
-            
-            rooms_dict = {}
-            for r in all_rooms:
-                rooms_dict[f"Room {r.room_number} - {r.room_type}"] = {
-                    'room_id': r.room_id,
-                    'room_number': r.room_number,
-                    'room_type': r.room_type,
-                    'capacity': r.capacity,
-                    'floor_number': r.floor_number,
-                    'view_type': r.view_type,
-                    'description': r.description,
-                    'base_price_per_night': r.base_price_per_night,
-                    'status': r.status
-                }
+        rooms_dict = {
+            f"Room {r.room_number} - {r.room_type}": r.to_dict()
+            for r in RoomManager.get_all_rooms()
+        }
         
         if not rooms_dict:
             st.markdown("""
@@ -655,6 +626,88 @@ with tab1:
                 
                 if delete_btn:
                     st.warning("⚠️ Delete functionality requires confirmation. Contact developer for safe deletion implementation.")
+    
+    # ===== SUB-TAB 4: ROOM BLOCKS =====
+    with room_tab4:
+        st.markdown("""
+        <div class='solivie-card' style='margin-bottom: 1.5rem;'>
+            <h4 style='color: #C4935B; margin: 0;'>🚧 Out-of-Order Room Blocks</h4>
+            <p style='color: #9BA8A5; margin: 0.5rem 0 0 0;'>
+                Blocked dates are unavailable in search and the calendar; the room status is unchanged.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        block_rooms = {
+            f"Room {r.room_number} - {r.room_type}": r.room_id
+            for r in RoomManager.get_all_rooms()
+        }
+        
+        with st.form("add_block_form", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                block_room = st.selectbox("🏨 Room *", list(block_rooms.keys()), key="block_room")
+            
+            with col2:
+                block_start = st.date_input("📅 From *", value=date.today(), key="block_start")
+            
+            with col3:
+                block_end = st.date_input("📅 Until (exclusive) *", value=date.today() + timedelta(days=1), key="block_end")
+            
+            block_reason = st.text_input("📝 Reason", key="block_reason", placeholder="Bathroom renovation")
+            
+            if st.form_submit_button("🚧 BLOCK ROOM", use_container_width=True, type="primary"):
+                if not block_room:
+                    st.error("❌ No rooms to block")
+                else:
+                    success, _, message = RoomBlockManager.create_block(
+                        block_rooms[block_room],
+                        block_start,
+                        block_end,
+                        block_reason,
+                        st.session_state.get('admin_id')
+                    )
+                    
+                    if success:
+                        st.success(f"✅ {message}")
+                        st.rerun()
+                    else:
+                        st.error(f"❌ {message}")
+        
+        blocks = RoomBlockManager.get_blocks()
+        
+        if not blocks:
+            st.info("📭 No current or upcoming room blocks")
+        else:
+            for block in blocks:
+                col_a, col_b = st.columns([5, 1])
+                
+                with col_a:
+                    st.markdown(f"""
+                    **Room {block['room_number']}** • {block['start_date'].strftime('%b %d, %Y')} → 
+                    {block['end_date'].strftime('%b %d, %Y')} • {block['reason'] or 'No reason given'}
+                    """)
+                
+                with col_b:
+                    if st.button("🗑️ Remove", key=f"remove_block_{block['block_id']}", use_container_width=True):
+                        success, message = RoomBlockManager.delete_block(block['block_id'])
+                        if success:
+                            st.rerun()
+                        else:
+                            st.error(f"❌ {message}")
+        
+        st.markdown("---")
+        col_a, col_b = st.columns([3, 1])
+        with col_a:
+            st.markdown("**🔧 Nightly inventory counts** · recount rooms sold and blocked per type from bookings and blocks")
+        with col_b:
+            if st.button("🔧 REPAIR COUNTS", key="repair_inventory", use_container_width=True):
+                success, _, message = RoomTypeInventory.repair_counts()
+                if success:
+                    st.success(f"✅ {message}")
+                else:
+                    st.error(f"❌ {message}")
 
 
 # ============================================================================
@@ -677,7 +730,7 @@ with tab2:
         search = st.text_input(
             "🔍 Search by name or email",
             key="user_search",
-            placeholder="Enter name or email..."
+            placeholder="Name prefix or email prefix..."
         )
     
     with col2:
@@ -685,43 +738,18 @@ with tab2:
         if st.button("🔄 REFRESH", use_container_width=True, type="secondary", key="refresh_users"):
             st.rerun()
     
-    # Get users
+    # Get one page of users with booking counts (single grouped query)
+    if st.session_state.get('user_directory_search') != search:
+        st.session_state.user_directory_search = search
+        st.session_state.user_directory_cursors = [None]
+    
     with st.spinner("👥 Loading users..."):
-        with get_db_session() as session:
-            query = session.query(User)
-            
-            if search:
-                query = query.filter(
-                    (User.first_name.contains(search)) |
-                    (User.last_name.contains(search)) |
-                    (User.email.contains(search))
-                )
-            
-            users = query.order_by(User.created_at.desc()).all()
-            
-            users_data = []
-            for user in users:
-                booking_count = session.query(Booking).filter_by(user_id=user.user_id).count()
-                
-                users_data.append({
-                    'user_id': user.user_id,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                    'email': user.email,
-                    'phone_number': user.phone_number or 'N/A',
-                    'address': user.address or 'N/A',
-                    'city': user.city or 'N/A',
-                    'country': user.country or 'N/A',
-                    'national_id': user.national_id,
-                    'passport_number': user.passport_number,
-                    'nationality': user.nationality,
-                    'date_of_birth': user.date_of_birth,
-                    'id_expiry_date': user.id_expiry_date,
-                    'loyalty_points': user.loyalty_points,
-                    'account_status': user.account_status,
-                    'created_at': user.created_at,
-                    'booking_count': booking_count
-                })
+        directory = UserManager.get_guest_directory(
+            search=search,
+            cursor=st.session_state.user_directory_cursors[-1]
+        )
+        users_data = directory['users']
+        directory_stats = UserManager.get_guest_directory_stats(search)
     
     st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
     
@@ -739,9 +767,9 @@ with tab2:
         """, unsafe_allow_html=True)
     else:
         # Summary metrics
-        active_users = len([u for u in users_data if u['account_status'] == 'active'])
-        total_bookings = sum(u['booking_count'] for u in users_data)
-        users_with_id = len([u for u in users_data if u['national_id'] or u['passport_number']])
+        active_users = directory_stats['active_users']
+        total_bookings = directory_stats['total_bookings']
+        users_with_id = directory_stats['users_with_id']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -753,7 +781,7 @@ with tab2:
                         text-align: center;
                         border: 2px solid #7B9CA8;'>
                 <p style='color: #9BA8A5; margin: 0;'>👥 Total Users</p>
-                <p style='color: #7B9CA8; margin: 0.5rem 0 0 0; font-size: 2.5rem; font-weight: 700;'>{len(users_data)}</p>
+                <p style='color: #7B9CA8; margin: 0.5rem 0 0 0; font-size: 2.5rem; font-weight: 700;'>{directory_stats['total_users']}</p>
             </div>
             """, unsafe_allow_html=True)
         
@@ -847,6 +875,7 @@ with tab2:
                     st.write(f"**Loyalty Points:** {data['loyalty_points']}")
                     st.write(f"**Member Since:** {data['created_at'].strftime('%Y-%m-%d')}")
                     st.write(f"**Total Bookings:** {data['booking_count']}")
+                    st.write(f"**Lifetime Spend:** {format_currency(data['total_spent'])}")
                     st.markdown("</div>", unsafe_allow_html=True)
                 
                 st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
@@ -933,6 +962,8 @@ with tab2:
                     """, unsafe_allow_html=True)
                 
                 st.markdown("</div>", unsafe_allow_html=True)
+        
+        SolivieUI.keyset_pager('user_directory_cursors', directory['next_cursor'], 'user_directory')
 
 
 # ============================================================================
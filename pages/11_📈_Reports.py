@@ -4,12 +4,16 @@ Generate comprehensive reports and statistics
 Enhanced with professional styling and data visualization
 """
 import streamlit as st
+import pandas as pd
 from datetime import datetime, timedelta
 from database.db_manager import get_db_session
-from database.models import Booking, Payment, Room, User
+from database.models import Booking, Payment, User
 from utils.ui_components import SolivieUI
 from utils.helpers import format_currency
-from backend.booking.availability_checker import AvailabilityChecker
+from backend.analytics.occupancy_analytics import OccupancyAnalytics
+from backend.analytics.booking_pace import booking_pace
+from backend.room.inventory_manager import InventoryManager
+import config
 
 
 # ============================================================================
@@ -464,16 +468,20 @@ if st.session_state.get('report_generated', False):
             </h3>
         """, unsafe_allow_html=True)
         
-        occupancy = AvailabilityChecker.get_occupancy_rate(start_dt, end_dt)
+        # Every date in the period is a night, so the series runs to the day after end_date
+        occupancy_series = OccupancyAnalytics.get_daily_series(start_date, end_date + timedelta(days=1))
+        occupancy_summary = occupancy_series['summary']
+        occupancy = occupancy_summary['occupancy']
         
-        with get_db_session() as session:
-            total_rooms = session.query(Room).count()
-            available_rooms = session.query(Room).filter_by(status='available').count()
-            occupied_rooms = session.query(Room).filter_by(status='occupied').count()
-            
-            nights = (end_dt - start_dt).days
-            total_room_nights = total_rooms * nights
-            occupied_room_nights = int((occupancy / 100) * total_room_nights)
+        room_summary = InventoryManager.get_inventory_summary()
+        total_rooms = room_summary.get('total', 0)
+        available_rooms = room_summary.get('available', 0)
+        occupied_rooms = room_summary.get('occupied', 0)
+        
+        nights = days_span
+        in_service_rooms = occupancy_series['days'][0]['rooms']
+        total_room_nights = occupancy_summary['room_nights']
+        occupied_room_nights = occupancy_summary['sold']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -501,7 +509,7 @@ if st.session_state.get('report_generated', False):
             <div class='report-metric' style='border-color: #6B8E7E;'>
                 <div class='metric-label-large'>🌙 Room-Nights</div>
                 <div class='metric-value-large'>{total_room_nights}</div>
-                <div class='metric-subtitle'>{nights} nights × {total_rooms} rooms</div>
+                <div class='metric-subtitle'>{nights} nights × {in_service_rooms} rooms in service</div>
             </div>
             """, unsafe_allow_html=True)
         
@@ -514,6 +522,35 @@ if st.session_state.get('report_generated', False):
             </div>
             """, unsafe_allow_html=True)
         
+        # Daily trend
+        st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+        st.markdown("<h4 style='color: #C4935B;'>📈 Daily Occupancy, ADR & RevPAR</h4>", unsafe_allow_html=True)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"""
+            <div class='summary-card' style='border-color: #C4935B;'>
+                <p style='color: #9BA8A5; margin: 0; font-size: 0.9rem; font-weight: 600;'>💵 ADR</p>
+                <p class='summary-value'>{format_currency(occupancy_summary['adr'])}</p>
+                <p style='color: #7B9CA8; margin: 0; font-size: 0.85rem;'>Revenue per sold room-night</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div class='summary-card' style='border-color: #6B8E7E;'>
+                <p style='color: #9BA8A5; margin: 0; font-size: 0.9rem; font-weight: 600;'>📊 RevPAR</p>
+                <p class='summary-value' style='color: #6B8E7E;'>{format_currency(occupancy_summary['revpar'])}</p>
+                <p style='color: #7B9CA8; margin: 0; font-size: 0.85rem;'>Revenue per available room-night</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        occupancy_df = pd.DataFrame(occupancy_series['days']).set_index('date')
+        st.line_chart(occupancy_df[['occupancy']].rename(columns={'occupancy': 'Occupancy %'}), color="#C4935B")
+        st.line_chart(occupancy_df[['adr', 'revpar']].rename(columns={'adr': 'ADR', 'revpar': 'RevPAR'}),
+                      color=["#6B8E7E", "#7B9CA8"])
+        
         # Current room status
         st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
         st.markdown("<h4 style='color: #C4935B;'>🏨 Current Room Status</h4>", unsafe_allow_html=True)
@@ -553,6 +590,57 @@ if st.session_state.get('report_generated', False):
         
         st.markdown("</div>", unsafe_allow_html=True)
         
+        # ====================================================================
+        # BOOKING PACE
+        # ====================================================================
+        
+        st.markdown("""
+        <div class='report-section'>
+            <h3 style='color: #C4935B; margin: 0 0 2rem 0; font-size: 2rem;'>
+                🚀 Booking Pace & Pickup
+            </h3>
+        """, unsafe_allow_html=True)
+        
+        # Same weekdays a year back (52 weeks)
+        period_end = end_date + timedelta(days=1)
+        pace_df = pd.DataFrame({
+            'This period': booking_pace.get_pickup_curve(start_date, period_end, config.PACE_REPORT_LEAD_DAYS),
+            'Same period last year': booking_pace.get_pickup_curve(
+                start_date - timedelta(days=364), period_end - timedelta(days=364), config.PACE_REPORT_LEAD_DAYS
+            )
+        })
+        pace_df.index.name = 'Days before arrival'
+        
+        st.markdown("<h4 style='color: #C4935B;'>📈 Room-Nights on the Books by Days Before Arrival</h4>", unsafe_allow_html=True)
+        st.line_chart(pace_df, color=["#C4935B", "#7B9CA8"])
+        
+        pickup_start = datetime.now().date()
+        pickup = booking_pace.get_pickup(pickup_start, pickup_start + timedelta(days=30), days=7)
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"""
+            <div class='summary-card' style='border-color: #C4935B;'>
+                <p style='color: #9BA8A5; margin: 0; font-size: 0.9rem; font-weight: 600;'>📘 ON THE BOOKS</p>
+                <p class='summary-value'>{int(pickup['on_books'].sum())}</p>
+                <p style='color: #7B9CA8; margin: 0; font-size: 0.85rem;'>Room-nights, next 30 nights</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div class='summary-card' style='border-color: #6B8E7E;'>
+                <p style='color: #9BA8A5; margin: 0; font-size: 0.9rem; font-weight: 600;'>📥 7-DAY PICKUP</p>
+                <p class='summary-value' style='color: #6B8E7E;'>{int(pickup['pickup'].sum()):+d}</p>
+                <p style='color: #7B9CA8; margin: 0; font-size: 0.85rem;'>Room-nights booked this week</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.bar_chart(pickup[['pickup']].rename(columns={'pickup': '7-day pickup'}), color="#6B8E7E")
+        
+        st.markdown("</div>", unsafe_allow_html=True)
+        
         # ====================================================================
         # USER STATISTICS
         # ====================================================================
@@ -163,6 +163,9 @@ SolivieUI.page_header(
 # LOGIN TABS
 # ============================================================================
 
+# Client IP for login throttling (not exposed by older Streamlit versions)
+client_ip = getattr(getattr(st, 'context', None), 'ip_address', None)
+
 tab1, tab2 = st.tabs(["👤 Customer Login", "👨‍💼 Admin Login"])
 
 
@@ -228,7 +231,11 @@ with tab1:
                 st.error("❌ Please fill in all fields")
             else:
                 with st.spinner("🔄 Authenticating..."):
-                    success, user_id, message = AuthenticationManager.login_user(email, password)
+                    success, user_id, message = AuthenticationManager.login_user(
+                        email,
+                        password,
+                        ip_address=client_ip
+                    )
                     
                     if success:
                         user = UserManager.get_user_profile(user_id)
@@ -244,7 +251,8 @@ with tab1:
                             DatabaseManager.log_action(
                                 user_id,
                                 'user_login',
-                                f'User {email} logged in'
+                                f'User {email} logged in',
+                                ip_address=client_ip
                             )
                             
                             st.success(f"✅ {message}")
@@ -354,7 +362,8 @@ with tab2:
                 with st.spinner("🔄 Verifying credentials..."):
                     success, admin_id, role, message = AuthenticationManager.login_admin(
                         username,
-                        admin_password
+                        admin_password,
+                        ip_address=client_ip
                     )
                     
                     if success:
@@ -5,8 +5,8 @@ Simplified for Cart-Only Booking with Advanced Filters
 import streamlit as st
 from datetime import datetime, timedelta, date
 from backend.booking.availability_checker import AvailabilityChecker
-from backend.booking.pricing_calculator import PricingCalculator
 from backend.booking.advanced_filters import AdvancedFilter
+from backend.booking.group_allocator import GroupAllocator
 from backend.booking.cart_manager import CartManager
 from utils.ui_components import SolivieUI
 from utils.helpers import format_currency
@@ -101,8 +101,10 @@ with col2:
 # INITIALIZE SESSION STATE
 # ============================================================================
 
-if 'search_results' not in st.session_state:
-    st.session_state.search_results = None
+if 'search_query' not in st.session_state:
+    st.session_state.search_query = None
+if 'search_page' not in st.session_state:
+    st.session_state.search_page = 1
 if 'search_nights' not in st.session_state:
     st.session_state.search_nights = 0
 
@@ -114,6 +116,34 @@ if 'search_nights' not in st.session_state:
 filter_options = AdvancedFilter.get_filter_options()
 
 
+# ============================================================================
+# FACET COUNTS
+# ============================================================================
+
+# Counts follow the current widget values (from the last interaction)
+facet_check_in = st.session_state.get('checkin_date', date.today())
+facet_check_out = st.session_state.get('checkout_date', facet_check_in + timedelta(days=2))
+facet_room_type = st.session_state.get('room_type_select', "All")
+facet_max_price = st.session_state.get('max_price_filter', int(filter_options.get('max_price', 1000)))
+
+facets = {}
+if facet_check_out > facet_check_in:
+    facets = AdvancedFilter.get_facets(
+        datetime.combine(facet_check_in, datetime.min.time().replace(hour=14)),
+        datetime.combine(facet_check_out, datetime.min.time().replace(hour=11)),
+        st.session_state.get('guests_number', 2),
+        min_price=st.session_state.get('min_price_filter') or None,
+        max_price=facet_max_price if facet_max_price < filter_options.get('max_price', 1000) else None,
+        room_types=None if facet_room_type == "All" else [facet_room_type],
+        amenities=[a for a in filter_options.get('amenities', []) if st.session_state.get(f"amenity_{a}")] or None,
+        floor_numbers=st.session_state.get('floor_filter') or None,
+        view_types=st.session_state.get('view_filter') or None
+    )
+
+type_counts = dict(facets.get('room_types', {}))
+type_counts["All"] = sum(type_counts.values())
+
+
 # ============================================================================
 # BASIC SEARCH CRITERIA
 # ============================================================================
@@ -154,6 +184,7 @@ with col3:
     room_type = st.selectbox(
         "Room Type",
         ["All"] + list(config.ROOM_TYPES.keys()),
+        format_func=lambda t: f"{t} ({type_counts.get(t, 0)})" if facets else t,
         key="room_type_select"
     )
 
@@ -194,7 +225,7 @@ else:
 st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
 
 with st.expander("🔧 **Advanced Filters** (Optional)", expanded=False):
-    
+
     # Price Range
     st.markdown("""
     <div style='padding: 1rem 0;'>
@@ -224,6 +255,15 @@ with st.expander("🔧 **Advanced Filters** (Optional)", expanded=False):
             key="max_price_filter"
         )
     
+    # Matching rooms per price band (other filters applied)
+    price_buckets = [b for b in facets.get('price_buckets', []) if b['count']]
+    if price_buckets:
+        st.markdown(f"""
+        <p style='color: #9BA8A5; margin: 0.5rem 0 0 0; font-size: 0.9rem;'>
+            {" • ".join(f"{format_currency(b['min'])}–{format_currency(b['max'])}: {b['count']}" for b in price_buckets)}
+        </p>
+        """, unsafe_allow_html=True)
+    
     st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
     
     # Amenities
@@ -242,7 +282,8 @@ with st.expander("🔧 **Advanced Filters** (Optional)", expanded=False):
         for idx, amenity in enumerate(available_amenities):
             col_idx = idx % 3
             with amenity_cols[col_idx]:
-                if st.checkbox(amenity, key=f"amenity_{amenity}"):
+                label = f"{amenity} ({facets['amenities'].get(amenity, 0)})" if facets else amenity
+                if st.checkbox(label, key=f"amenity_{amenity}"):
                     selected_amenities.append(amenity)
     else:
         st.info("ℹ️ No amenity filters available")
@@ -265,6 +306,7 @@ with st.expander("🔧 **Advanced Filters** (Optional)", expanded=False):
             "Select preferred views",
             options=available_views,
             default=[],
+            format_func=lambda v: f"{v} ({facets['view_types'].get(v, 0)})" if facets else v,
             key="view_filter"
         )
     
@@ -280,6 +322,7 @@ with st.expander("🔧 **Advanced Filters** (Optional)", expanded=False):
             "Select preferred floors",
             options=available_floors,
             default=[],
+            format_func=lambda f: f"{f} ({facets['floors'].get(f, 0)})" if facets else f,
             key="floor_filter"
         )
 
@@ -339,38 +382,29 @@ if search_btn:
         "Capacity": "capacity"
     }
     
-    # Execute search
+    search_query = {
+        'check_in': check_in_dt,
+        'check_out': check_out_dt,
+        'num_guests': num_guests,
+        'min_price': min_price if min_price > 0 else None,
+        'max_price': max_price if max_price < filter_options.get('max_price', 1000) else None,
+        'room_types': room_type_list,
+        'amenities': selected_amenities if selected_amenities else None,
+        'floor_numbers': selected_floors if selected_floors else None,
+        'view_types': selected_views if selected_views else None,
+        'sort_by': sort_map.get(sort_by, 'price_low')
+    }
+    
+    # Execute search (matches are cached per query; later pages reuse them)
     with st.spinner("🔍 Searching for available rooms..."):
-        rooms_data = AdvancedFilter.filter_rooms(
-            check_in=check_in_dt,
-            check_out=check_out_dt,
-            min_price=min_price if min_price > 0 else None,
-            max_price=max_price if max_price < filter_options.get('max_price', 1000) else None,
-            room_types=room_type_list,
-            amenities=selected_amenities if selected_amenities else None,
-            floor_numbers=selected_floors if selected_floors else None,
-            view_types=selected_views if selected_views else None,
-            min_capacity=num_guests,
-            sort_by=sort_map.get(sort_by, 'price_low')
-        )
+        first_page = AdvancedFilter.search_page(**search_query)
         
-        if not rooms_data:
+        if not first_page['total']:
             st.warning("❌ No rooms available matching your criteria")
         else:
-            # Calculate total prices for each room
-            for room in rooms_data:
-                total = PricingCalculator.calculate_total_price(
-                    room['base_price'],
-                    check_in_dt,
-                    check_out_dt,
-                    num_guests,
-                    room['capacity']
-                )
-                room['total_price'] = total
-                room['nights'] = nights
-            
-            # Store results in session state
-            st.session_state.search_results = rooms_data
+            # Store query in session state; each render prices only the visible page
+            st.session_state.search_query = search_query
+            st.session_state.search_page = 1
             st.session_state.search_nights = nights
             st.session_state.search_checkin = check_in_dt
             st.session_state.search_checkout = check_out_dt
@@ -381,7 +415,10 @@ if search_btn:
 # DISPLAY SEARCH RESULTS
 # ============================================================================
 
-if st.session_state.search_results:
+if st.session_state.search_query:
+
+    results = AdvancedFilter.search_page(**st.session_state.search_query, page=st.session_state.search_page)
+    st.session_state.search_page = results['page']
     
     st.markdown(f"""
     <div style='background: linear-gradient(145deg, #2A3533 0%, #2C3E3A 100%);
@@ -391,14 +428,17 @@ if st.session_state.search_results:
                 border: 2px solid #6B8E7E;
                 margin: 1.5rem 0;'>
         <h3 style='color: #6B8E7E; margin: 0;'>
-            ✅ Found {len(st.session_state.search_results)} room(s) available for {st.session_state.search_nights} night(s)
+            ✅ Found {results['total']} room(s) available for {st.session_state.search_nights} night(s)
         </h3>
+        <p style='color: #9BA8A5; margin: 0.5rem 0 0 0;'>
+            Page {results['page']} of {results['pages']}
+        </p>
     </div>
     """, unsafe_allow_html=True)
     
-    # Display each room
-    for idx, room in enumerate(st.session_state.search_results):
-        
+    # Display each room on this page
+    for idx, room in enumerate(results['rooms']):
+    
         # Room Card
         st.markdown("""
         <div class='solivie-card' style='padding: 2rem; margin-bottom: 1.5rem;'>
@@ -521,6 +561,27 @@ if st.session_state.search_results:
                         st.error(msg)
         
         st.markdown("</div>", unsafe_allow_html=True)
+    
+    # Page navigation
+    if results['pages'] > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            if st.button("⬅️ PREVIOUS", use_container_width=True, disabled=results['page'] <= 1, key="search_prev"):
+                st.session_state.search_page = results['page'] - 1
+                st.rerun()
+        
+        with col2:
+            st.markdown(f"""
+            <p style='color: #9BA8A5; text-align: center; margin: 0.5rem 0;'>
+                Showing {(results['page'] - 1) * results['page_size'] + 1}–{(results['page'] - 1) * results['page_size'] + len(results['rooms'])} of {results['total']}
+            </p>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            if st.button("NEXT ➡️", use_container_width=True, disabled=results['page'] >= results['pages'], key="search_next"):
+                st.session_state.search_page = results['page'] + 1
+                st.rerun()
 
 else:
     # No search results yet
@@ -546,6 +607,197 @@ else:
     """, unsafe_allow_html=True)
 
 
+# ============================================================================
+# FLEXIBLE DATES
+# ============================================================================
+
+st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
+
+with st.expander("📆 **Flexible Dates** - cheapest stay within a period", expanded=False):
+
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        flex_start = st.date_input(
+            "Earliest Check-in",
+            value=date.today(),
+            min_value=date.today(),
+            key="flex_start"
+        )
+    
+    with col2:
+        flex_end = st.date_input(
+            "Latest Check-out",
+            value=flex_start + timedelta(days=30),
+            min_value=flex_start + timedelta(days=1),
+            key="flex_end"
+        )
+    
+    with col3:
+        flex_nights = st.number_input(
+            "Nights",
+            min_value=1,
+            max_value=config.MAX_BOOKING_DAYS,
+            value=3,
+            key="flex_nights"
+        )
+    
+    with col4:
+        flex_guests = st.number_input(
+            "Guests",
+            min_value=1,
+            max_value=10,
+            value=2,
+            key="flex_guests"
+        )
+    
+    if st.button("💡 FIND CHEAPEST DATES", use_container_width=True, type="primary", key="flex_search"):
+        with st.spinner("🔍 Checking every start date..."):
+            st.session_state.flex_results = AdvancedFilter.find_flexible_stays(
+                flex_start,
+                flex_end,
+                flex_nights,
+                flex_guests,
+                room_types=None if room_type == "All" else [room_type]
+            )
+            st.session_state.flex_guests_searched = flex_guests
+    
+    flex_results = st.session_state.get('flex_results')
+    if flex_results is not None and not flex_results:
+        st.warning(f"❌ No {flex_nights}-night stays available in this period")
+    
+    for idx, option in enumerate(flex_results or []):
+        col_a, col_b, col_c = st.columns([3, 1, 1])
+        
+        with col_a:
+            st.markdown(f"""
+            <p style='color: #F5F5F0; margin: 0.5rem 0;'>
+                <strong>🏨 Room {option['room_number']} - {option['room_type']}</strong><br>
+                <span style='color: #9BA8A5;'>
+                    📅 {option['check_in'].strftime('%a, %b %d')} → {option['check_out'].strftime('%a, %b %d, %Y')}
+                    ({option['nights']} nights)
+                </span>
+            </p>
+            """, unsafe_allow_html=True)
+        
+        with col_b:
+            st.markdown(f"""
+            <p style='color: #6B8E7E; margin: 0.75rem 0; font-size: 1.3rem; font-weight: 700;'>
+                {format_currency(option['total_price'])}
+            </p>
+            """, unsafe_allow_html=True)
+        
+        with col_c:
+            if st.button("🛒 ADD", key=f"flex_add_{idx}_{option['room_id']}", use_container_width=True):
+                success, msg = CartManager.add_to_cart(
+                    st.session_state,
+                    option,
+                    option['check_in'],
+                    option['check_out'],
+                    st.session_state.flex_guests_searched,
+                    option['total_price'],
+                    option['nights']
+                )
+                
+                if success:
+                    st.success(msg)
+                    st.rerun()
+                else:
+                    st.error(msg)
+
+
+# ============================================================================
+# GROUP BOOKING
+# ============================================================================
+
+with st.expander("👨‍👩‍👧‍👦 **Group Booking** - rooms for a whole party", expanded=False):
+
+    st.markdown(f"""
+    <p style='color: #9BA8A5; margin: 0 0 1rem 0;'>
+        Uses the dates above ({check_in.strftime('%b %d')} to {check_out.strftime('%b %d, %Y')}).
+        Enter the guests staying in each room, e.g. <strong>2, 2, 4</strong>.
+    </p>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        group_parties = st.text_input("Guests per Room", value="2, 2", key="group_parties")
+    
+    with col2:
+        group_objective = st.selectbox(
+            "Prefer",
+            ["cheapest", "same_floor", "nearest"],
+            format_func=lambda o: {"cheapest": "Lowest Price", "same_floor": "Same Floor",
+                                   "nearest": "Closest Floors"}[o],
+            key="group_objective"
+        )
+    
+    if st.button("🔎 FIND GROUP ROOMS", use_container_width=True, type="primary", key="group_search"):
+        sizes = [p.strip() for p in group_parties.split(",") if p.strip()]
+        if not sizes or not all(p.isdigit() for p in sizes):
+            st.error("❌ Enter guest counts separated by commas")
+        elif check_out <= check_in:
+            st.error("❌ Check-out must be after check-in")
+        else:
+            group_check_in = datetime.combine(check_in, datetime.min.time().replace(hour=config.CHECK_IN_HOUR))
+            group_check_out = datetime.combine(check_out, datetime.min.time().replace(hour=config.CHECK_OUT_HOUR))
+            success, allocation, message = GroupAllocator.allocate(
+                group_check_in,
+                group_check_out,
+                [int(p) for p in sizes],
+                group_objective,
+                room_types=None if room_type == "All" else [room_type]
+            )
+            if success:
+                allocation['check_in'] = group_check_in
+                allocation['check_out'] = group_check_out
+                allocation['nights'] = (check_out - check_in).days
+                st.session_state.group_allocation = allocation
+            else:
+                st.session_state.group_allocation = None
+                st.error(f"❌ {message}")
+    
+    allocation = st.session_state.get('group_allocation')
+    if allocation:
+        for room in allocation['rooms']:
+            st.markdown(f"""
+            <p style='color: #F5F5F0; margin: 0.5rem 0;'>
+                🏨 <strong>Room {room['room_number']}</strong> - {room['room_type']} • Floor {room['floor_number']}
+                • 👥 {room['party_size']} of {room['capacity']}
+                • <span style='color: #6B8E7E; font-weight: 600;'>{format_currency(room['total_price'])}</span>
+            </p>
+            """, unsafe_allow_html=True)
+        
+        st.markdown(f"""
+        <p style='color: #C4935B; margin: 1rem 0; font-size: 1.2rem; font-weight: 700;'>
+            💰 Group Total ({allocation['nights']} nights): {format_currency(allocation['total_price'])}
+        </p>
+        """, unsafe_allow_html=True)
+        
+        if st.button("🛒 ADD ALL TO CART", use_container_width=True, type="primary", key="group_add"):
+            added = 0
+            for room in allocation['rooms']:
+                success, msg = CartManager.add_to_cart(
+                    st.session_state,
+                    room,
+                    allocation['check_in'],
+                    allocation['check_out'],
+                    room['party_size'],
+                    room['total_price'],
+                    allocation['nights']
+                )
+                if not success:
+                    st.error(f"❌ {msg}")
+                    break
+                added += 1
+            
+            if added == len(allocation['rooms']):
+                st.session_state.group_allocation = None
+                st.success(f"✅ {added} room(s) added to cart!")
+                st.rerun()
+
+
 # ============================================================================
 # FOOTER
 # ============================================================================
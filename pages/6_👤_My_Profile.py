@@ -10,6 +10,7 @@ from backend.booking.booking_manager import BookingManager
 from backend.payment.payment_processor import PaymentProcessor
 from backend.payment.invoice_generator import InvoiceGenerator
 from backend.user.review_manager import ReviewManager
+from backend.user.loyalty_program import LoyaltyProgram
 from database.db_manager import get_db_session
 from database.models import Room, User, Booking, Payment, Review
 from utils.ui_components import SolivieUI
@@ -444,6 +445,24 @@ with tab1:
         </div>
         """, unsafe_allow_html=True)
     
+    # Recent loyalty ledger entries
+    points_history = LoyaltyProgram.get_points_history(st.session_state.user_id, limit=10)
+    if points_history:
+        st.markdown("<div style='height: 1rem;'></div>", unsafe_allow_html=True)
+        with st.expander("📜 Points History"):
+            for entry in points_history:
+                sign_color = '#6B8E7E' if entry['points'] >= 0 else '#C4935B'
+                expires = f" • expires {entry['expires_at'].strftime('%b %d, %Y')}" if entry['expires_at'] else ""
+                st.markdown(f"""
+                <p style='color: #F5F5F0; margin: 0.3rem 0;'>
+                    <span style='color: {sign_color}; font-weight: 700;'>{entry['points']:+d}</span>
+                    {entry['description'] or entry['entry_type'].title()}
+                    <span style='color: #9BA8A5; font-size: 0.85rem;'>
+                        {format_datetime(entry['created_at'])}{expires}
+                    </span>
+                </p>
+                """, unsafe_allow_html=True)
+    
     st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
     
     # Quick Actions
@@ -986,11 +1005,17 @@ with tab4:
         </div>
         """, unsafe_allow_html=True)
         
-        # Get user's reviews
-        with get_db_session() as session:
-            my_reviews = session.query(Review).filter_by(
-                user_id=st.session_state.user_id
-            ).order_by(Review.review_date.desc()).all()
+        # Get one page of user's reviews (joined with room and booking)
+        my_review_count = ReviewManager.count_reviews(user_id=st.session_state.user_id)
+        # Cursors are per user so another login never resumes someone else's page
+        my_cursors_key = f"my_review_cursors_{st.session_state.user_id}"
+        my_cursors = st.session_state.setdefault(my_cursors_key, [None])
+        my_feed = ReviewManager.get_review_feed(
+            status=None,
+            user_id=st.session_state.user_id,
+            cursor=my_cursors[-1]
+        )
+        my_reviews = my_feed['reviews']
         
         if not my_reviews:
             st.markdown("""
@@ -1012,22 +1037,18 @@ with tab4:
                         border: 2px solid #6B8E7E;
                         margin-bottom: 2rem;'>
                 <p style='color: #6B8E7E; margin: 0; font-size: 1.2rem; font-weight: 600;'>
-                    ✅ You have written <strong>{len(my_reviews)}</strong> review(s)
+                    ✅ You have written <strong>{my_review_count}</strong> review(s)
                 </p>
             </div>
             """, unsafe_allow_html=True)
             
             # Display user's reviews
             for review in my_reviews:
-                with get_db_session() as session:
-                    room = session.query(Room).filter_by(room_id=review.room_id).first()
-                    booking = session.query(Booking).filter_by(booking_id=review.booking_id).first()
-                
                 # Status badge
-                if review.status == 'approved':
+                if review['status'] == 'approved':
                     status_badge = "✅ Approved"
                     status_color = "#6B8E7E"
-                elif review.status == 'pending':
+                elif review['status'] == 'pending':
                     status_badge = "🟡 Pending"
                     status_color = "#C4935B"
                 else:
@@ -1038,9 +1059,9 @@ with tab4:
                 <div class='solivie-card' style='margin-bottom: 1.5rem; border: 2px solid {status_color};'>
                     <div style='display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;'>
                         <div>
-                            <h4 style='color: #C4935B; margin: 0;'>🏨 Room {room.room_number} - {room.room_type}</h4>
+                            <h4 style='color: #C4935B; margin: 0;'>🏨 Room {review['room_number']} - {review['room_type']}</h4>
                             <p style='color: #9BA8A5; font-size: 0.9rem; margin: 0.5rem 0 0 0;'>
-                                Booking: {booking.booking_reference}
+                                Booking: {review['booking_reference']}
                             </p>
                         </div>
                         <div>
@@ -1051,14 +1072,16 @@ with tab4:
                         </div>
                     </div>
                     <div style='font-size: 1.5rem; margin-bottom: 1rem;'>
-                        {get_star_rating_display(review.rating)}
+                        {get_star_rating_display(review['rating'])}
                     </div>
-                    <p style='color: #F5F5F0; margin: 1rem 0; line-height: 1.6;'>"{review.comment}"</p>
+                    <p style='color: #F5F5F0; margin: 1rem 0; line-height: 1.6;'>"{review['comment']}"</p>
                     <p style='color: #9BA8A5; font-size: 0.85rem; margin: 0;'>
-                        📅 {review.review_date.strftime('%B %d, %Y at %I:%M %p')}
+                        📅 {review['review_date'].strftime('%B %d, %Y at %I:%M %p')}
                     </p>
                 </div>
                 """, unsafe_allow_html=True)
+            
+            SolivieUI.keyset_pager(my_cursors_key, my_feed['next_cursor'], 'my_reviews')
     
     # ===== SUB-TAB 3: ALL REVIEWS =====
     with review_tab3:
@@ -1087,27 +1110,27 @@ with tab4:
                 key="review_sort"
             )
         
-        # Get approved reviews
-        with get_db_session() as session:
-            query = session.query(Review).filter_by(status='approved')
-            
-            if room_type_filter != "All":
-                query = query.join(Room).filter(Room.room_type == room_type_filter)
-            
-            if sort_by == "Newest First":
-                query = query.order_by(Review.review_date.desc())
-            elif sort_by == "Highest Rating":
-                query = query.order_by(Review.rating.desc())
-            elif sort_by == "Lowest Rating":
-                query = query.order_by(Review.rating.asc())
-            
-            all_reviews = query.all()
+        # Get one page of approved reviews; restart paging when filters change
+        feed_room_type = None if room_type_filter == "All" else room_type_filter
+        feed_sort = {"Newest First": 'newest', "Highest Rating": 'highest', "Lowest Rating": 'lowest'}[sort_by]
+        
+        if st.session_state.get('all_review_filters') != (feed_room_type, feed_sort):
+            st.session_state.all_review_filters = (feed_room_type, feed_sort)
+            st.session_state.all_review_cursors = [None]
+        
+        all_feed = ReviewManager.get_review_feed(
+            room_type=feed_room_type,
+            sort_by=feed_sort,
+            cursor=st.session_state.all_review_cursors[-1]
+        )
+        all_reviews = all_feed['reviews']
         
         if not all_reviews:
             st.info("📭 No reviews available yet")
         else:
-            # Overall rating
-            avg_rating = sum(r.rating for r in all_reviews) / len(all_reviews)
+            # Overall rating from per-room rating summaries
+            overall = ReviewManager.get_overall_rating(feed_room_type)
+            avg_rating = overall['average']
             
             st.markdown(f"""
             <div style='background: linear-gradient(135deg, #3D3528 0%, #2C2820 100%); 
@@ -1116,7 +1139,7 @@ with tab4:
                 <h2 style='margin: 0; color: #C4935B; font-size: 2rem;'>Overall Guest Rating</h2>
                 <h1 style='color: #C4935B; font-size: 4rem; margin: 0.5rem 0;'>{avg_rating:.1f}/5.0</h1>
                 <p style='font-size: 2rem; margin: 0.5rem 0;'>{get_star_rating_display(int(round(avg_rating)))}</p>
-                <p style='color: #9BA8A5; font-size: 1.1rem; margin: 0;'>Based on {len(all_reviews)} review(s)</p>
+                <p style='color: #9BA8A5; font-size: 1.1rem; margin: 0;'>Based on {overall['count']} review(s)</p>
             </div>
             """, unsafe_allow_html=True)
             
@@ -1124,29 +1147,27 @@ with tab4:
             
             # Display all reviews
             for review in all_reviews:
-                with get_db_session() as session:
-                    review_user = session.query(User).filter_by(user_id=review.user_id).first()
-                    room = session.query(Room).filter_by(room_id=review.room_id).first()
-                
                 st.markdown(f"""
                 <div class='solivie-card' style='margin-bottom: 1.5rem;'>
                     <div style='display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;'>
                         <div>
-                            <h4 style='color: #C4935B; margin: 0;'>👤 {review_user.first_name} {review_user.last_name[0]}.</h4>
+                            <h4 style='color: #C4935B; margin: 0;'>👤 {review['guest_first_name']} {review['guest_last_name'][:1]}.</h4>
                             <p style='color: #9BA8A5; font-size: 0.9rem; margin: 0.5rem 0 0 0;'>
-                                Room {room.room_number} - {room.room_type}
+                                Room {review['room_number']} - {review['room_type']}
                             </p>
                         </div>
                         <div style='font-size: 1.5rem;'>
-                            {get_star_rating_display(review.rating)}
+                            {get_star_rating_display(review['rating'])}
                         </div>
                     </div>
-                    <p style='color: #F5F5F0; margin: 1rem 0; line-height: 1.6;'>"{review.comment}"</p>
+                    <p style='color: #F5F5F0; margin: 1rem 0; line-height: 1.6;'>"{review['comment']}"</p>
                     <p style='color: #9BA8A5; font-size: 0.85rem; margin: 0;'>
-                        📅 {review.review_date.strftime('%B %d, %Y')}
+                        📅 {review['review_date'].strftime('%B %d, %Y')}
                     </p>
                 </div>
                 """, unsafe_allow_html=True)
+            
+            SolivieUI.keyset_pager('all_review_cursors', all_feed['next_cursor'], 'all_reviews')
 
 
 # ============================================================================
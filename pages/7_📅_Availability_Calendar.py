@@ -5,6 +5,7 @@ Enhanced with modern design and better UX
 """
 import streamlit as st
 from backend.booking.availability_calendar import AvailabilityCalendar
+from backend.room.room_type_inventory import RoomTypeInventory
 from datetime import datetime, date, timedelta
 import calendar
 from utils.ui_components import SolivieUI
@@ -99,6 +100,12 @@ st.markdown("""
     color: #9BA8A5;
 }
 
+.status-blocked {
+    background: rgba(110, 110, 140, 0.2);
+    border: 2px solid #7A7A9A;
+    color: #A8A8C8;
+}
+
 .room-availability-card {
     background: linear-gradient(145deg, #2A3533 0%, #2C3E3A 100%);
     padding: 1.5rem;
@@ -234,7 +241,7 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     st.markdown("""
@@ -261,6 +268,14 @@ with col3:
     """, unsafe_allow_html=True)
 
 with col4:
+    st.markdown("""
+    <div class='status-badge status-blocked'>
+        🚧 OUT OF ORDER
+    </div>
+    <p style='color: #9BA8A5; margin: 0.5rem 0 0 0; font-size: 0.9rem;'>Blocked for maintenance</p>
+    """, unsafe_allow_html=True)
+
+with col5:
     st.markdown("""
     <div class='status-badge status-past'>
         ⚫ PAST DATE
@@ -269,6 +284,43 @@ with col4:
     """, unsafe_allow_html=True)
 
 
+# ============================================================================
+# ROOMS LEFT BY TYPE
+# ============================================================================
+
+month_start = date(year, month, 1)
+month_end = date(year + month // 12, month % 12 + 1, 1)
+type_inventory = RoomTypeInventory.get_availability(month_start, month_end, [room_type] if room_type else None)
+
+if type_inventory:
+    st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+    st.markdown("""
+    <div class='solivie-card' style='margin-bottom: 1rem;'>
+        <h3 style='color: #C4935B; margin: 0; font-size: 1.3rem;'>
+            🏷️ Rooms Left by Type
+        </h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    type_cols = st.columns(len(type_inventory))
+    for col, (inventory_type, inventory_nights) in zip(type_cols, type_inventory.items()):
+        upcoming = [n for n in inventory_nights if n['night'] >= date.today()]
+        sold_out = [n['night'].strftime('%b %d') for n in upcoming if n['available'] == 0]
+        fewest = min(upcoming, key=lambda n: n['available']) if upcoming else None
+        with col:
+            st.markdown(f"""
+            <div class='solivie-card' style='text-align: center; padding: 1rem;'>
+                <h4 style='color: #F5F5F0; margin: 0;'>{inventory_type}</h4>
+                <p style='color: #9BA8A5; margin: 0.5rem 0 0 0;'>
+                    {f"Fewest left: <strong>{fewest['available']}</strong> of {fewest['rooms']} ({fewest['night'].strftime('%b %d')})" if fewest else "Month has passed"}
+                </p>
+                <p style='color: {"#D4A76A" if sold_out else "#6B8E7E"}; margin: 0.25rem 0 0 0; font-size: 0.9rem;'>
+                    {"Sold out: " + ", ".join(sold_out[:5]) + (" ..." if len(sold_out) > 5 else "") if sold_out else "No sold-out nights"}
+                </p>
+            </div>
+            """, unsafe_allow_html=True)
+
+
 # ============================================================================
 # CALENDAR VIEW
 # ============================================================================
@@ -384,6 +436,11 @@ else:
                     bg_color = "rgba(169, 95, 95, 0.1)"
                     text_color = "#D4A76A"
                     border_color = "#A95F5F"
+                elif status == 'blocked':
+                    emoji = "🚧"
+                    bg_color = "rgba(110, 110, 140, 0.1)"
+                    text_color = "#A8A8C8"
+                    border_color = "#7A7A9A"
                 else:  # pending
                     emoji = "🟡"
                     bg_color = "rgba(196, 147, 91, 0.1)"
@@ -563,7 +620,7 @@ if check_button:
                                 🏨 Room {room['room_number']}
                             </h4>
                             <p style='color: #9BA8A5; margin: 0;'>
-                                {room['room_type']} • <span style='color: #D4A76A;'>🔴 Booked</span>
+                                {room['room_type']} • <span style='color: #D4A76A;'>{"🚧 Out of Order" if any(c['status'] == 'blocked' for c in conflicts) else "🔴 Booked"}</span>
                             </p>
                         </div>
                         """, unsafe_allow_html=True)
@@ -4,10 +4,14 @@ Displays key metrics, statistics, and system overview
 Enhanced with professional styling and better UX
 """
 import streamlit as st
+import pandas as pd
 from datetime import datetime, timedelta
 from database.db_manager import get_db_session
 from database.models import Booking, Room, User, Payment
 from backend.booking.availability_checker import AvailabilityChecker
+from backend.analytics.occupancy_analytics import OccupancyAnalytics
+from backend.analytics.demand_forecast import demand_forecast
+from backend.room.inventory_manager import InventoryManager
 from utils.ui_components import SolivieUI
 from utils.helpers import format_currency, get_percentage
 import config
@@ -284,13 +288,6 @@ with st.spinner("📊 Loading dashboard data..."):
         total_bookings = len(bookings)
         confirmed_bookings = len([b for b in bookings if b.booking_status == 'confirmed'])
         
-        # Rooms
-        total_rooms = session.query(Room).count()
-        available_rooms = session.query(Room).filter_by(status='available').count()
-        occupied_rooms = session.query(Room).filter_by(status='occupied').count()
-        maintenance_rooms = session.query(Room).filter_by(status='maintenance').count()
-        cleaning_rooms = session.query(Room).filter_by(status='cleaning').count()
-        
         # Users
         total_users = session.query(User).count()
         new_users = session.query(User).filter(User.created_at >= start_date).count()
@@ -301,6 +298,26 @@ with st.spinner("📊 Loading dashboard data..."):
         cancelled_bookings = session.query(Booking).filter_by(booking_status='cancelled').count()
         completed_bookings = session.query(Booking).filter_by(booking_status='completed').count()
 
+# Rooms - counts plus status changes since this session's last poll
+if 'room_board' not in st.session_state:
+    # Start a few changes back so the feed is not empty on first load
+    st.session_state.room_board = {'last_seq': max(InventoryManager.get_latest_seq() - 10, 0), 'recent': []}
+
+room_board = InventoryManager.get_status_board(since_seq=st.session_state.room_board['last_seq'])
+if room_board['reset']:
+    st.session_state.room_board['recent'] = []
+st.session_state.room_board['recent'] = (
+    list(reversed(room_board['changes'])) + st.session_state.room_board['recent']
+)[:10]
+st.session_state.room_board['last_seq'] = room_board['last_seq']
+
+room_summary = room_board['summary']
+total_rooms = room_summary.get('total', 0)
+available_rooms = room_summary.get('available', 0)
+occupied_rooms = room_summary.get('occupied', 0)
+maintenance_rooms = room_summary.get('maintenance', 0)
+cleaning_rooms = room_summary.get('cleaning', 0)
+
 # Occupancy
 occupancy = AvailabilityChecker.get_occupancy_rate(start_date, today)
 
@@ -359,6 +376,91 @@ with col4:
     """, unsafe_allow_html=True)
 
 
+# ============================================================================
+# OCCUPANCY TREND
+# ============================================================================
+
+st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+
+st.markdown("""
+<div class='solivie-card' style='margin-bottom: 1.5rem;'>
+    <h3 style='color: #C4935B; margin: 0; font-size: 1.5rem;'>
+        📉 Occupancy & RevPAR Trend
+    </h3>
+</div>
+""", unsafe_allow_html=True)
+
+occupancy_series = OccupancyAnalytics.get_daily_series(start_date, today)
+occupancy_df = pd.DataFrame(occupancy_series['days']).set_index('date')
+
+col1, col2 = st.columns(2)
+
+with col1:
+    st.line_chart(occupancy_df[['occupancy']].rename(columns={'occupancy': 'Occupancy %'}), color="#C4935B")
+
+with col2:
+    st.line_chart(occupancy_df[['adr', 'revpar']].rename(columns={'adr': 'ADR', 'revpar': 'RevPAR'}),
+                  color=["#6B8E7E", "#7B9CA8"])
+
+
+# ============================================================================
+# DEMAND FORECAST
+# ============================================================================
+
+st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
+
+st.markdown(f"""
+<div class='solivie-card' style='margin-bottom: 1.5rem;'>
+    <h3 style='color: #C4935B; margin: 0; font-size: 1.5rem;'>
+        🔮 {config.FORECAST_HORIZON_DAYS}-Day Forecast
+    </h3>
+</div>
+""", unsafe_allow_html=True)
+
+forecast = demand_forecast.get_forecast()
+if forecast:
+    forecast_df = pd.DataFrame({
+        room_type: {n['date']: n['occupancy'] for n in nights} for room_type, nights in forecast.items()
+    })
+    forecast_rooms = sum(n['rooms'] for nights in forecast.values() for n in nights[:30])
+    forecast_sold = sum(n['forecast'] for nights in forecast.values() for n in nights[:30])
+    on_books = sum(n['on_books'] for nights in forecast.values() for n in nights[:30])
+    forecast_revenue = sum(n['revenue'] for nights in forecast.values() for n in nights)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown(f"""
+        <div class='metric-card' style='border-color: #C4935B;'>
+            <div class='metric-label'>🏨 Forecast Occupancy</div>
+            <div class='metric-value'>{get_percentage(forecast_sold, forecast_rooms)}%</div>
+            <div class='metric-subtitle'>Next 30 nights</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class='metric-card' style='border-color: #6B8E7E;'>
+            <div class='metric-label'>📘 On the Books</div>
+            <div class='metric-value'>{on_books}</div>
+            <div class='metric-subtitle'>Room-nights, next 30 nights</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class='metric-card' style='border-color: #7B9CA8;'>
+            <div class='metric-label'>💰 Forecast Revenue</div>
+            <div class='metric-value'>{format_currency(forecast_revenue)}</div>
+            <div class='metric-subtitle'>Next {config.FORECAST_HORIZON_DAYS} nights</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.line_chart(forecast_df, y_label="Forecast occupancy %")
+else:
+    st.info("No forecast available yet")
+
+
 # ============================================================================
 # ROOM & BOOKING STATUS
 # ============================================================================
@@ -431,6 +533,14 @@ with col1:
             <p style='color: #7B9CA8; margin: 0.25rem 0 0 0; font-size: 0.85rem;'>{get_percentage(cleaning_rooms, total_rooms)}%</p>
         </div>
         """, unsafe_allow_html=True)
+    
+    if st.session_state.room_board['recent']:
+        with st.expander("🔄 Recent Room Status Changes"):
+            for change in st.session_state.room_board['recent']:
+                st.caption(
+                    f"Room {change['room_number']}: {change['old_status'] or 'new'} → "
+                    f"{change['new_status'] or 'removed'} · {change['changed_at'].strftime('%b %d, %H:%M')}"
+                )
 
 with col2:
     st.markdown("""
@@ -6,12 +6,15 @@ Enhanced with Dark Luxury Theme
 import streamlit as st
 from backend.booking.booking_manager import BookingManager
 from backend.booking.checkin_manager import CheckInManager
+from backend.booking.room_assignment_optimizer import RoomAssignmentOptimizer
+from backend.room.housekeeping_queue import housekeeping_queue
 from database.db_manager import get_db_session
 from database.models import Booking, Room, User
 from utils.ui_components import SolivieUI
 from utils.helpers import format_currency, format_datetime
 from utils.constants import BookingStatus
-from datetime import datetime
+from datetime import datetime, date, timedelta
+import config
 
 
 # ============================================================================
@@ -187,7 +190,7 @@ SolivieUI.page_header(
 # MAIN TABS
 # ============================================================================
 
-tab1, tab2 = st.tabs(["📋 Manage Bookings", "🏨 Check-In / Check-Out"])
+tab1, tab2, tab3, tab4 = st.tabs(["📋 Manage Bookings", "🏨 Check-In / Check-Out", "🧹 Housekeeping", "🧩 Room Assignment"])
 
 
 # ============================================================================
@@ -1004,6 +1007,198 @@ with tab2:
             """, unsafe_allow_html=True)
 
 
+# ============================================================================
+# TAB 3: HOUSEKEEPING
+# ============================================================================
+
+with tab3:
+    st.markdown("""
+    <div class='solivie-card' style='margin-bottom: 2rem;'>
+        <h3 style='color: #C4935B; margin: 0; font-size: 1.5rem;'>
+            🧹 Housekeeping Turnover Queue
+        </h3>
+        <p style='color: #9BA8A5; margin: 0.5rem 0 0 0;'>
+            Rooms awaiting cleaning, ordered by the next guest arrival
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    staff_id = st.session_state.get('admin_id')
+    housekeeping = housekeeping_queue.get_queue()
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        st.markdown(f"**{len(housekeeping['queue'])}** waiting · **{len(housekeeping['claimed'])}** in progress")
+    with col2:
+        if st.button("🧹 CLAIM NEXT", use_container_width=True, type="primary", key="hk_claim_next",
+                     disabled=not housekeeping['queue']):
+            claimed_room = housekeeping_queue.claim_next(staff_id)
+            if claimed_room:
+                st.success(f"✅ Room {claimed_room['room_number']} claimed")
+            st.rerun()
+    with col3:
+        if st.button("🔄 REFRESH", use_container_width=True, type="secondary", key="refresh_housekeeping"):
+            st.rerun()
+    
+    if housekeeping['claimed']:
+        st.markdown("#### 🧽 In Progress")
+        for room in housekeeping['claimed']:
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                st.markdown(f"**Room {room['room_number']}** · {format_datetime(room['next_arrival']) if room['next_arrival'] else 'No upcoming arrival'} · claimed by #{room['claimed_by']}")
+            with col2:
+                if st.button("✅ DONE", use_container_width=True, type="primary", key=f"hk_done_{room['room_id']}"):
+                    success, _, message = housekeeping_queue.complete([room['room_id']])
+                    if success:
+                        st.rerun()
+                    else:
+                        st.error(f"❌ {message}")
+            with col3:
+                if st.button("↩️ RELEASE", use_container_width=True, type="secondary", key=f"hk_release_{room['room_id']}"):
+                    housekeeping_queue.release(room['room_id'])
+                    st.rerun()
+    
+    st.markdown("#### 📋 Waiting")
+    if not housekeeping['queue']:
+        st.info("✨ No rooms waiting for cleaning")
+    else:
+        for position, room in enumerate(housekeeping['queue'], 1):
+            col1, col2 = st.columns([4, 1])
+            with col1:
+                st.markdown(f"**{position}. Room {room['room_number']}** · {format_datetime(room['next_arrival']) if room['next_arrival'] else 'No upcoming arrival'}")
+            with col2:
+                if st.button("🧹 CLAIM", use_container_width=True, type="secondary", key=f"hk_claim_{room['room_id']}"):
+                    success, message = housekeeping_queue.claim(room['room_id'], staff_id)
+                    if success:
+                        st.rerun()
+                    else:
+                        st.error(f"❌ {message}")
+    
+    all_rooms = housekeeping['claimed'] + housekeeping['queue']
+    if all_rooms:
+        st.markdown("#### ✅ Bulk Complete")
+        room_labels = {f"Room {r['room_number']}": r['room_id'] for r in all_rooms}
+        selected = st.multiselect("Rooms inspected and ready", list(room_labels), key="hk_bulk_rooms")
+        if st.button("✅ MARK AVAILABLE", type="primary", key="hk_bulk_complete", disabled=not selected):
+            success, count, message = housekeeping_queue.complete([room_labels[label] for label in selected])
+            if success:
+                st.success(f"✅ {count} room(s) marked available")
+                st.rerun()
+            else:
+                st.error(f"❌ {message}")
+
+
+# ============================================================================
+# TAB 4: ROOM ASSIGNMENT
+# ============================================================================
+
+with tab4:
+    st.markdown("""
+    <div class='solivie-card' style='margin-bottom: 2rem;'>
+        <h3 style='color: #C4935B; margin: 0; font-size: 1.5rem;'>
+            🧩 Room Assignment Optimizer
+        </h3>
+        <p style='color: #9BA8A5; margin: 0.5rem 0 0 0;'>
+            Moves future bookings between rooms of the same type to close unsellable gaps.
+            Checked-in guests and locked bookings never move.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        ra_start = st.date_input("📅 Arrivals From", value=date.today() + timedelta(days=1),
+                                 min_value=date.today() + timedelta(days=1), key="ra_start")
+    with col2:
+        ra_horizon = st.number_input("🗓️ Days Ahead", min_value=7, max_value=365,
+                                     value=config.ROOM_OPTIMIZER_HORIZON_DAYS, key="ra_horizon")
+    with col3:
+        ra_types = st.multiselect("🛏️ Room Types", list(config.ROOM_TYPES.keys()), key="ra_types",
+                                  placeholder="All room types")
+    
+    if st.button("🔍 PREVIEW REASSIGNMENT", use_container_width=True, type="primary", key="ra_preview"):
+        st.session_state.room_plan = RoomAssignmentOptimizer.plan(ra_start, int(ra_horizon), ra_types or None)
+    
+    room_plan = st.session_state.get('room_plan')
+    if room_plan:
+        if room_plan.get('error'):
+            st.error(f"❌ {room_plan['error']}")
+        
+        st.markdown(f"#### 📊 {room_plan['window_start'].strftime('%b %d')} → {room_plan['window_end'].strftime('%b %d, %Y')}")
+        for summary in room_plan['room_types']:
+            before, after = summary['before'], summary['after']
+            st.markdown(
+                f"**{summary['room_type']}** · {summary['rooms']} rooms · {summary['bookings']} movable bookings · "
+                f"orphan nights {before['orphan_nights']} → {after['orphan_nights']} · "
+                f"free runs {before['free_runs']} → {after['free_runs']} · "
+                f"longest free run {before['longest_free_run']} → {after['longest_free_run']} nights · "
+                f"**{summary['moves']} move(s)**" + (f" · _{summary['note']}_" if summary['note'] else "")
+            )
+        
+        if not room_plan['moves']:
+            st.info("✨ No reassignments needed")
+        else:
+            st.markdown(f"#### 🔀 Proposed Moves ({len(room_plan['moves'])})")
+            for move in room_plan['moves'][:200]:
+                st.markdown(
+                    f"`{move['booking_reference']}` · {move['check_in'].strftime('%b %d')} → "
+                    f"{move['check_out'].strftime('%b %d')} · Room {move['from_room_number']} → "
+                    f"**Room {move['to_room_number']}**"
+                )
+            if len(room_plan['moves']) > 200:
+                st.caption(f"... and {len(room_plan['moves']) - 200} more")
+            
+            if st.button(f"✅ APPLY {len(room_plan['moves'])} MOVES", use_container_width=True, type="primary", key="ra_apply"):
+                success, moved, message = RoomAssignmentOptimizer.apply_plan(
+                    room_plan['moves'], st.session_state.get('admin_id')
+                )
+                if success:
+                    st.session_state.room_plan = None
+                    st.success(f"✅ {message}")
+                    st.rerun()
+                else:
+                    st.error(f"❌ {message}")
+    
+    st.markdown("#### 🔒 Locked Assignments")
+    col1, col2, col3 = st.columns([2, 2, 1])
+    with col1:
+        lock_reference = st.text_input("Booking Reference", key="ra_lock_ref")
+    with col2:
+        lock_reason = st.text_input("Reason", key="ra_lock_reason", placeholder="Guest requested this room")
+    with col3:
+        st.markdown("<div style='height: 1.75rem;'></div>", unsafe_allow_html=True)
+        if st.button("🔒 LOCK", use_container_width=True, type="secondary", key="ra_lock"):
+            with get_db_session() as session:
+                lock_booking = session.query(Booking.booking_id).filter_by(
+                    booking_reference=lock_reference.strip().upper()
+                ).first()
+            if not lock_booking:
+                st.error("❌ Booking not found")
+            else:
+                success, message = RoomAssignmentOptimizer.lock_assignment(
+                    lock_booking.booking_id, st.session_state.get('admin_id'), lock_reason
+                )
+                if success:
+                    st.success(f"✅ {message}")
+                else:
+                    st.error(f"❌ {message}")
+    
+    locks = RoomAssignmentOptimizer.get_locks()
+    if not locks:
+        st.info("📭 No locked bookings")
+    else:
+        for lock in locks:
+            col1, col2 = st.columns([5, 1])
+            with col1:
+                st.markdown(f"`{lock['booking_reference']}` · Room {lock['room_number']} · "
+                            f"{lock['check_in'].strftime('%b %d')} → {lock['check_out'].strftime('%b %d, %Y')} · "
+                            f"{lock['reason'] or 'No reason given'}")
+            with col2:
+                if st.button("🔓 Unlock", use_container_width=True, key=f"ra_unlock_{lock['booking_id']}"):
+                    RoomAssignmentOptimizer.unlock_assignment(lock['booking_id'])
+                    st.rerun()
+
+
 # ============================================================================
 # FOOTER NAVIGATION
 # ============================================================================
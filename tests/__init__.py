@@ -1 +1,19 @@
-"""Tests package initialization."""
+"""
+Tests package initialization.
+Tests run against a scratch copy of database/hotel_system.db, so a test run
+never changes the tracked database. Set DATABASE_PATH to test another file.
+"""
+
+from pathlib import Path
+import atexit
+import os
+import shutil
+import tempfile
+
+if 'DATABASE_PATH' not in os.environ:
+    # config reads DATABASE_PATH at import time, so this runs before any test imports it
+    _scratch_dir = tempfile.mkdtemp(prefix='solivie_tests_')
+    _database = Path(_scratch_dir) / 'hotel_system.db'
+    shutil.copyfile(Path(__file__).resolve().parent.parent / 'database' / 'hotel_system.db', _database)
+    os.environ['DATABASE_PATH'] = str(_database)
+    atexit.register(shutil.rmtree, _scratch_dir, ignore_errors=True)
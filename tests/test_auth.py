@@ -28,6 +28,81 @@ class TestAuthentication(unittest.TestCase):
         self.assertFalse(validate_password("NOLOWERCASE123"))
         self.assertFalse(validate_password("NoNumbers"))
 
+    
+    def test_login_rate_limiter(self):
+        """Test sliding-window login throttling."""
+        from backend.auth.rate_limiter import LoginRateLimiter
+        
+        now = [1000.0]
+        limiter = LoginRateLimiter(window_seconds=60, max_per_account=3, max_per_ip=5,
+                                   persist=False, clock=lambda: now[0])
+        account = limiter.account_key('user', 'Guest@Example.com')
+        ip = limiter.ip_key('10.0.0.1')
+        
+        for _ in range(3):
+            allowed, _, _ = limiter.acquire(account, ip)
+            self.assertTrue(allowed)
+            limiter.record_failure(account, ip)
+        
+        allowed, retry_after, _ = limiter.acquire(account, ip)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 60)
+        
+        # Other accounts from the same IP are capped by the IP window
+        other = limiter.account_key('user', 'other@example.com')
+        self.assertTrue(limiter.acquire(other, ip)[0])
+        self.assertTrue(limiter.acquire(other, ip)[0])
+        self.assertFalse(limiter.acquire(limiter.account_key('user', 'third@example.com'), ip)[0])
+        
+        # Window slides
+        now[0] += 61
+        self.assertTrue(limiter.acquire(account, ip)[0])
+        
+        # Success clears the account window
+        limiter.record_success(account, ip)
+        self.assertTrue(limiter.acquire(account)[0])
+    
+    def test_login_rate_limiter_releases_own_reservation(self):
+        """A successful login frees its own IP slot, not a concurrent attempt's."""
+        from backend.auth.rate_limiter import LoginRateLimiter
+        
+        now = [1000.0]
+        limiter = LoginRateLimiter(window_seconds=60, max_per_account=5, max_per_ip=5,
+                                   persist=False, clock=lambda: now[0])
+        ip = limiter.ip_key('10.0.0.2')
+        first = limiter.account_key('user', 'first@example.com')
+        second = limiter.account_key('user', 'second@example.com')
+        
+        _, _, first_reservation = limiter.acquire(first, ip)
+        now[0] += 1
+        limiter.acquire(second, ip)
+        limiter.record_success(first, ip, first_reservation)
+        
+        # The second attempt is still in flight and keeps its slot
+        self.assertEqual(list(limiter._attempts[ip]), [1001.0])
+    
+    def test_login_rate_limiter_loads_outside_lock(self):
+        """Persisted windows are read before the limiter lock is taken."""
+        from backend.auth.rate_limiter import LoginRateLimiter
+        
+        limiter = LoginRateLimiter(window_seconds=60, max_per_account=3, max_per_ip=5,
+                                   persist=True, clock=lambda: 1000.0)
+        held = []
+        
+        def load(key, now):
+            held.append(limiter._lock.locked())
+            return [990.0]
+        
+        limiter._load_persisted = load
+        account = limiter.account_key('user', 'persisted@example.com')
+        self.assertTrue(limiter.acquire(account, limiter.ip_key('10.0.0.3'))[0])
+        self.assertEqual(held, [False, False])
+        self.assertEqual(list(limiter._attempts[account]), [990.0, 1000.0])
+        
+        # Windows already in memory are not reloaded
+        limiter.acquire(account)
+        self.assertEqual(len(held), 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -26,6 +26,19 @@ class TestBooking(unittest.TestCase):
         self.assertGreater(price, 0)
         self.assertIsInstance(price, float)
     
+    def test_price_breakdown_matches_total(self):
+        """Test the breakdown charges the same calendar nights as the total."""
+        import config
+        
+        # Mon 14:00 to Thu 11:00 outside peak season: three weekday nights
+        check_in = datetime(2031, 3, 3, config.CHECK_IN_HOUR)
+        check_out = datetime(2031, 3, 6, config.CHECK_OUT_HOUR)
+        
+        breakdown = PricingCalculator.get_price_breakdown(100, check_in, check_out, 3, 2)
+        self.assertEqual(breakdown['num_nights'], 3)
+        self.assertEqual(breakdown['subtotal'], 300)
+        self.assertEqual(breakdown['total'], PricingCalculator.calculate_total_price(100, check_in, check_out, 3, 2))
+    
     def test_nights_calculation(self):
         """Test nights calculation."""
         from utils.helpers import calculate_nights
@@ -35,6 +48,750 @@ class TestBooking(unittest.TestCase):
         
         nights = calculate_nights(check_in, check_out)
         self.assertEqual(nights, 4)
+    
+    def test_user_stats_summary(self):
+        """Test incremental user stats match a full rebuild."""
+        from backend.user.user_manager import UserManager
+        from database.db_manager import DatabaseManager
+        from database.models import Booking, UserStatsSummary, get_session
+        
+        DatabaseManager.setup_database()
+        def snapshot(session, user_id):
+            s = session.get(UserStatsSummary, user_id)
+            return (s.active_bookings, s.completed_bookings, s.cancelled_bookings,
+                    round(s.total_spent, 2), s.last_stay)
+        
+        session = get_session()
+        try:
+            booking = session.query(Booking).filter_by(booking_status='confirmed').first()
+            if booking is None:
+                self.skipTest("No confirmed bookings in database")
+            
+            UserManager._rebuild_stats(session, [booking.user_id])
+            before = snapshot(session, booking.user_id)
+            
+            for new_status in ('completed', 'cancelled', 'confirmed'):
+                old_status = booking.booking_status
+                booking.booking_status = new_status
+                UserManager.apply_booking_status_change(session, booking, old_status)
+                session.expire_all()
+                incremental = snapshot(session, booking.user_id)
+                
+                UserManager._rebuild_stats(session, [booking.user_id])
+                self.assertEqual(incremental, snapshot(session, booking.user_id))
+            
+            self.assertEqual(snapshot(session, booking.user_id), before)
+        finally:
+            session.rollback()
+            session.close()
+    
+    def test_room_type_inventory(self):
+        """Test incremental per-type night counts match a rebuild, and repair fixes drift."""
+        from backend.room.room_type_inventory import RoomTypeInventory
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Booking, Room, RoomBlock, RoomTypeNightCount, get_session
+        
+        DatabaseManager.setup_database()
+        def stored(session):
+            session.expire_all()
+            return {(r.room_type, r.night): (r.sold, r.blocked) for r in session.query(RoomTypeNightCount).all()
+                    if r.sold or r.blocked}
+        
+        def expected(session):
+            sold, blocked = RoomTypeInventory._expected_counts(session)
+            return {key: (sold[key], blocked[key]) for key in set(sold) | set(blocked)}
+        
+        session = get_session()
+        try:
+            booking = session.query(Booking).filter_by(booking_status='confirmed').first()
+            if booking is None:
+                self.skipTest("No confirmed bookings in database")
+            room_type = session.get(Room, booking.room_id).room_type
+            check_in, check_out = booking.check_in_date, booking.check_out_date
+            
+            RoomTypeInventory._rebuild(session)
+            self.assertEqual(stored(session), expected(session))
+            night = (room_type, check_in.date())
+            sold_before = stored(session)[night][0]
+            
+            for new_status in ('cancelled', 'pending', 'completed', 'confirmed'):
+                old_status = booking.booking_status
+                booking.booking_status = new_status
+                RoomTypeInventory.apply_booking_change(session, booking, old_status)
+                self.assertEqual(stored(session), expected(session))
+            self.assertEqual(stored(session)[night][0], sold_before)
+            
+            start = datetime(datetime.now().year + 7, 2, 1)
+            end = start + timedelta(days=3)
+            block = RoomBlock(room_id=booking.room_id, start_date=start, end_date=end)
+            session.add(block)
+            RoomTypeInventory.apply_block_change(session, room_type, start, end, 1)
+            self.assertEqual(stored(session)[(room_type, start.date() + timedelta(days=2))], (0, 1))
+            session.delete(block)
+            RoomTypeInventory.apply_block_change(session, room_type, start, end, -1)
+            self.assertNotIn((room_type, start.date()), stored(session))
+            # Rows the block change left at zero are not drift
+            self.assertEqual(RoomTypeInventory._rebuild(session), 0)
+            
+            # Repair fixes a drifted row
+            session.query(RoomTypeNightCount).filter_by(room_type=night[0], night=night[1]).update(
+                {RoomTypeNightCount.sold: sold_before + 5}, synchronize_session=False
+            )
+            self.assertEqual(RoomTypeInventory._rebuild(session), 1)
+            self.assertEqual(stored(session), expected(session))
+            self.assertEqual(RoomTypeInventory._rebuild(session), 0)
+        finally:
+            session.rollback()
+            session.close()
+        
+        # A first build from an empty table is not reported as repairs
+        with get_db_session() as session:
+            session.query(RoomTypeNightCount).delete()
+        self.assertEqual(RoomTypeInventory.repair_counts([room_type])[:2], (True, 0))
+        self.assertEqual(RoomTypeInventory.repair_counts()[:2], (True, 0))
+        
+        availability = RoomTypeInventory.get_availability(check_in, check_out)
+        first_night = availability[room_type][0]
+        self.assertGreaterEqual(first_night['sold'], 1)
+        self.assertEqual(first_night['available'],
+                         max(first_night['rooms'] - first_night['sold'] - first_night['blocked'], 0))
+        self.assertEqual(len(availability[room_type]), len(RoomTypeInventory.nights(check_in, check_out)))
+        self.assertEqual(RoomTypeInventory.rooms_left(room_type, check_in, check_out),
+                         min(n['available'] for n in availability[room_type]))
+    
+    def test_occupancy_series(self):
+        """Test the daily series counts calendar nights and agrees with the SQL occupancy rate."""
+        from backend.analytics.occupancy_analytics import OccupancyAnalytics
+        from backend.booking.availability_checker import AvailabilityChecker
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Booking
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            stays = session.query(Booking.check_in_date, Booking.check_out_date, Booking.total_amount).filter(
+                Booking.booking_status.in_(AvailabilityChecker.SOLD_BOOKING_STATUSES)
+            ).all()
+        if not stays:
+            self.skipTest("No sold bookings in database")
+        
+        start = min(s.check_in_date for s in stays) - timedelta(days=2)
+        end = max(s.check_out_date for s in stays) + timedelta(days=2)
+        series = OccupancyAnalytics.get_daily_series(start, end)
+        days = series['days']
+        self.assertEqual(len(days), (end.date() - start.date()).days)
+        
+        for day in days:
+            expected = sum(1 for s in stays if s.check_in_date.date() <= day['date'] < s.check_out_date.date())
+            self.assertEqual(day['sold'], expected)
+        
+        summary = series['summary']
+        self.assertEqual(summary['sold'], sum(d['sold'] for d in days))
+        # The range covers every stay, so all of each stay's amount is spread into it
+        self.assertAlmostEqual(summary['revenue'], sum(s.total_amount for s in stays
+                                                       if s.check_out_date.date() > s.check_in_date.date()), places=2)
+        self.assertEqual(AvailabilityChecker.get_occupancy_rate(start, end), summary['occupancy'])
+    
+    def test_booking_pace(self):
+        """Test pace cells by lead time, and that incremental refreshes match a full build."""
+        from backend.analytics.booking_pace import BookingPace
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Room, Booking, User
+        from datetime import date
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            room = session.query(Room).first()
+            user = session.query(User).first()
+            if room is None or user is None:
+                self.skipTest("Need a room and a user")
+            room_id, user_id = room.room_id, user.user_id
+        
+        pace = BookingPace(max_lead=60)
+        pace.refresh()
+        # Long past, so every as-of date is known
+        night = date(2019, 3, 11)
+        baseline = pace.get_matrix(night, night + timedelta(days=1)).iloc[0]
+        
+        def cell_changes():
+            pace.refresh()
+            row = pace.get_matrix(night, night + timedelta(days=1)).iloc[0] - baseline
+            full = BookingPace(max_lead=60)
+            full.refresh()
+            self.assertTrue(pace.get_matrix(night, night + timedelta(days=30)).equals(
+                full.get_matrix(night, night + timedelta(days=30))))
+            return [int(row[lead]) for lead in (0, 6, 7, 10, 11, 19, 20)]
+        
+        ids = []
+        try:
+            with get_db_session() as session:
+                for reference, check_in, nights, made in (('PACETEST-A', datetime(2019, 3, 10, 14), 3, datetime(2019, 2, 20)),
+                                                          ('PACETEST-B', datetime(2019, 3, 11, 14), 1, datetime(2019, 3, 1))):
+                    booking = Booking(user_id=user_id, room_id=room_id, check_in_date=check_in,
+                                      check_out_date=check_in + timedelta(days=nights, hours=-3), num_guests=1,
+                                      total_amount=100.0, booking_status='confirmed', booking_reference=reference,
+                                      created_at=made)
+                    session.add(booking)
+                    session.flush()
+                    ids.append(booking.booking_id)
+            # A is on the books from 19 days out, B from 10
+            self.assertEqual(cell_changes(), [2, 2, 2, 2, 1, 1, 0])
+            
+            # Cancelling B on 5 March takes it off the books from 6 days out
+            with get_db_session() as session:
+                session.query(Booking).filter_by(booking_id=ids[1]).update({
+                    Booking.booking_status: 'cancelled', Booking.updated_at: datetime(2019, 3, 5, 9)
+                })
+            pace.refresh(full=True)
+            self.assertEqual(cell_changes(), [1, 1, 2, 2, 1, 1, 0])
+            
+            curve = pace.get_pickup_curve(night, night + timedelta(days=1))
+            self.assertEqual(int(curve[7] - baseline[7]), 2)
+            
+            # A change that commits after a refresh with an earlier timestamp is still read
+            pace.refresh()
+            with get_db_session() as session:
+                session.query(Booking).filter_by(booking_id=ids[1]).update({
+                    Booking.booking_status: 'confirmed', Booking.updated_at: pace._watermark - timedelta(seconds=30)
+                })
+            self.assertEqual(cell_changes(), [2, 2, 2, 2, 1, 1, 0])
+        finally:
+            with get_db_session() as session:
+                session.query(Booking).filter(Booking.booking_id.in_(ids)).delete(synchronize_session=False)
+        
+        # Deleted bookings trigger a full rebuild
+        self.assertEqual(cell_changes(), [0, 0, 0, 0, 0, 0, 0])
+    
+    def test_demand_forecast(self):
+        """Test seasonal factors, and that forecasts stay between what is on the books and capacity."""
+        from backend.analytics.demand_forecast import DemandForecast
+        from backend.room.room_type_inventory import RoomTypeInventory
+        from database.db_manager import DatabaseManager
+        import numpy as np
+        
+        # Four weeks of one type selling 4 rooms on weekends and 2 on weekdays
+        days = np.arange(np.datetime64('2025-01-06'), np.datetime64('2025-02-03'))
+        weekday = DemandForecast._weekday(days)
+        self.assertEqual(list(weekday[:7]), list(range(7)))  # 6 January 2025 was a Monday
+        sold = np.where(weekday >= 5, 4, 2)[None, :]
+        factors = DemandForecast._factors(sold, weekday, 7)[0]
+        self.assertAlmostEqual(factors[5] / factors[0], 2.0)
+        self.assertAlmostEqual(float((factors * np.bincount(weekday) / len(days)).sum()), 1.0)
+        self.assertEqual(list(DemandForecast._factors(np.zeros((1, len(days))), weekday, 7)[0]), [1.0] * 7)
+        
+        DatabaseManager.setup_database()
+        today = datetime.now().date()
+        forecast = DemandForecast.build(today, 14)
+        if not forecast:
+            self.skipTest("No rooms in database")
+        inventory = RoomTypeInventory.get_availability(today, today + timedelta(days=14))
+        for room_type, nights in forecast.items():
+            self.assertEqual([n['date'] for n in nights], [n['night'] for n in inventory[room_type]])
+            for night, stock in zip(nights, inventory[room_type]):
+                self.assertEqual(night['on_books'], stock['sold'])
+                self.assertGreaterEqual(night['forecast'], night['on_books'])
+                self.assertLessEqual(night['forecast'], max(stock['rooms'] - stock['blocked'], stock['sold']))
+    
+    def test_room_catalog_versioning(self):
+        """Test room catalog snapshots are reused until a write bumps the version."""
+        from backend.room.room_catalog import RoomCatalog
+        from database.db_manager import get_db_session
+        from database.models import Room
+        
+        catalog = RoomCatalog(max_age=0)
+        first = catalog.snapshot()
+        self.assertIs(catalog.snapshot(), first)
+        
+        with get_db_session() as session:
+            self.assertEqual(len(first.rooms), session.query(Room).count())
+        
+        catalog.invalidate()
+        second = catalog.snapshot()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(second.filter_options, first.filter_options)
+    
+    
+    def test_room_bitmap_index(self):
+        """Test bitmap filtering matches rooms on every criterion."""
+        from backend.room.room_catalog import CatalogRoom
+        from backend.room.room_bitmap_index import RoomBitmapIndex
+        
+        def room(room_id, room_type, capacity, amenities, floor, view, status='available'):
+            return CatalogRoom(room_id, str(room_id), room_type, capacity, 100.0, '',
+                               tuple(amenities), floor, view, status, ())
+        
+        rooms = [
+            room(1, 'Single', 1, ['WiFi'], 1, 'City View'),
+            room(2, 'Double', 2, ['WiFi', 'TV'], 2, 'Sea View'),
+            room(3, 'Suite', 4, ['WiFi', 'TV', 'Bathtub'], 3, 'Sea View'),
+            room(4, 'Suite', 4, ['WiFi', 'TV', 'Bathtub'], 3, 'Sea View', status='maintenance'),
+        ]
+        index = RoomBitmapIndex(rooms)
+        
+        def ids(**criteria):
+            return [r.room_id for r in index.rooms_for(index.match(status='available', **criteria))]
+        
+        self.assertEqual(ids(), [1, 2, 3])
+        self.assertEqual(ids(amenities=['WiFi', 'TV']), [2, 3])
+        self.assertEqual(ids(view_types=['Sea View'], min_capacity=3), [3])
+        self.assertEqual(ids(room_types=['Single', 'Double'], floor_numbers=[2]), [2])
+        self.assertEqual(ids(amenities=['Jacuzzi']), [])
+    
+    def test_search_pagination(self):
+        """Test paged search matches the full filter and prices only its page."""
+        from backend.booking.advanced_filters import AdvancedFilter
+        from backend.room.room_catalog import CatalogRoom
+        from backend.room.room_bitmap_index import RoomBitmapIndex
+        
+        def room(room_id, price, capacity):
+            return CatalogRoom(room_id, str(room_id), 'Double', capacity, price, '', (), 1, None, 'available', ())
+        
+        index = RoomBitmapIndex([room(1, 200.0, 2), room(2, 100.0, 4), room(3, 150.0, 2), room(4, 100.0, 1)])
+        
+        def ids(mask, sort_by):
+            return [r.room_id for r in index.ordered(mask, sort_by)]
+        
+        self.assertEqual(ids(index.all_bits, 'price_low'), [2, 4, 3, 1])
+        self.assertEqual(ids(index.all_bits, 'price_high'), [1, 3, 2, 4])
+        self.assertEqual(ids(index.all_bits, 'capacity'), [2, 1, 3, 4])
+        self.assertEqual(ids(index.price_bits(100.0, 150.0), 'price_low'), [2, 4, 3])
+        self.assertEqual(ids(index.price_bits(min_price=120.0) & ~index.bits_for([1]), 'price_high'), [3])
+        
+        check_in = datetime(datetime.now().year + 5, 5, 4, 14)
+        check_out = datetime(datetime.now().year + 5, 5, 7, 11)
+        expected = [r['room_id'] for r in AdvancedFilter.filter_rooms(check_in, check_out, min_capacity=1)]
+        if len(expected) < 3:
+            self.skipTest("Not enough available rooms in database")
+        
+        first = AdvancedFilter.search_page(check_in, check_out, 1, page_size=2)
+        self.assertEqual(first['total'], len(expected))
+        self.assertEqual(first['pages'], (len(expected) + 1) // 2)
+        self.assertEqual([r['room_id'] for r in first['rooms']], expected[:2])
+        self.assertTrue(all(r['total_price'] > 0 and r['nights'] == 3 for r in first['rooms']))
+        
+        second = AdvancedFilter.search_page(check_in, check_out, 1, page=2, page_size=2)
+        self.assertEqual([r['room_id'] for r in second['rooms']], expected[2:4])
+        self.assertEqual(AdvancedFilter.search_page(check_in, check_out, 1, page=999, page_size=2)['page'],
+                         first['pages'])
+    
+    def test_search_facets(self):
+        """Test facet counts agree with filtering on each value."""
+        from backend.booking.advanced_filters import AdvancedFilter
+        from database.db_manager import DatabaseManager
+        
+        DatabaseManager.setup_database()
+        check_in = datetime(datetime.now().year + 5, 7, 1, 14)
+        check_out = datetime(datetime.now().year + 5, 7, 3, 11)
+        
+        def count(**filters):
+            return len(AdvancedFilter.filter_rooms(check_in, check_out, min_capacity=2, **filters))
+        
+        facets = AdvancedFilter.get_facets(check_in, check_out, 2)
+        self.assertEqual(facets['total'], count())
+        for room_type, n in facets['room_types'].items():
+            self.assertEqual(n, count(room_types=[room_type]))
+        for amenity, n in facets['amenities'].items():
+            self.assertEqual(n, count(amenities=[amenity]))
+        self.assertEqual(sum(b['count'] for b in facets['price_buckets']), facets['total'])
+        
+        if not facets['room_types']:
+            self.skipTest("No rooms in database")
+        
+        # A chosen room type narrows other facets but not its own counts
+        chosen = max(facets['room_types'], key=facets['room_types'].get)
+        narrowed = AdvancedFilter.get_facets(check_in, check_out, 2, room_types=[chosen])
+        self.assertEqual(narrowed['room_types'], facets['room_types'])
+        self.assertEqual(narrowed['total'], facets['room_types'][chosen])
+        for view, n in narrowed['view_types'].items():
+            self.assertEqual(n, count(room_types=[chosen], view_types=[view]))
+    
+    def test_flexible_date_search(self):
+        """Test flexible-date search matches checking every start date."""
+        from backend.booking.advanced_filters import AdvancedFilter
+        from backend.booking.availability_checker import AvailabilityChecker
+        from backend.booking.pricing_calculator import PricingCalculator
+        from backend.room.room_block_manager import RoomBlockManager
+        from database.db_manager import DatabaseManager
+        import config
+        
+        DatabaseManager.setup_database()
+        year = datetime.now().year + 5
+        window_start, window_end = datetime(year, 2, 1).date(), datetime(year, 2, 12).date()
+        
+        options = AdvancedFilter.find_flexible_stays(window_start, window_end, 3, 2, top_k=10000)
+        if not options:
+            self.skipTest("No rooms in database")
+        
+        # Block the cheapest option's room across part of the window
+        cheapest = options[0]
+        success, block_id, _ = RoomBlockManager.create_block(
+            cheapest['room_id'], datetime(year, 2, 3), datetime(year, 2, 6), "Flexible search test"
+        )
+        self.assertTrue(success)
+        try:
+            options = AdvancedFilter.find_flexible_stays(window_start, window_end, 3, 2, top_k=10000)
+            
+            expected = []
+            for k in range(9):
+                check_in = datetime(year, 2, 1 + k, config.CHECK_IN_HOUR)
+                check_out = datetime(year, 2, 4 + k, config.CHECK_OUT_HOUR)
+                for room in AvailabilityChecker.get_available_rooms(check_in, check_out, capacity=2):
+                    price = PricingCalculator.calculate_total_price(room['base_price'], check_in, check_out,
+                                                                    2, room['capacity'])
+                    expected.append((price, check_in, room['room_number'], room['room_id']))
+            expected.sort(key=lambda o: o[:3])
+            
+            self.assertEqual([(o['total_price'], o['check_in'], o['room_number'], o['room_id']) for o in options],
+                             expected)
+            self.assertEqual(len(AdvancedFilter.find_flexible_stays(window_start, window_end, 3, 2, top_k=5)), 5)
+        finally:
+            RoomBlockManager.delete_block(block_id)
+    
+    def test_group_allocation(self):
+        """Test group allocation is optimal and respects capacities."""
+        from backend.booking.group_allocator import GroupAllocator
+        from backend.room.room_catalog import CatalogRoom
+        from database.db_manager import DatabaseManager
+        from itertools import permutations
+        import random
+        
+        rng = random.Random(7)
+        for _ in range(200):
+            rooms = [(float(rng.randint(50, 300)), f"{i:03d}",
+                      CatalogRoom(i, f"{i:03d}", 'Double', rng.randint(1, 4), 0.0, '', (), 1, None, 'available', ()))
+                     for i in range(6)]
+            parties = [rng.randint(1, 4) for _ in range(rng.randint(1, 4))]
+            
+            best = None
+            for chosen in permutations(rooms, len(parties)):
+                if all(room[2].capacity >= size for room, size in zip(chosen, parties)):
+                    cost = sum(room[0] for room in chosen)
+                    best = cost if best is None else min(best, cost)
+            
+            assignment = GroupAllocator._assign(parties, rooms)
+            if best is None:
+                self.assertIsNone(assignment)
+            else:
+                self.assertEqual(sum(a[1] for a in assignment), best)
+                self.assertTrue(all(room.capacity >= size for size, _, room in assignment))
+                self.assertEqual(len({room.room_id for _, _, room in assignment}), len(parties))
+        
+        DatabaseManager.setup_database()
+        check_in = datetime(datetime.now().year + 5, 4, 6, 14)
+        check_out = datetime(datetime.now().year + 5, 4, 8, 11)
+        success, allocation, _ = GroupAllocator.allocate(check_in, check_out, [2, 2, 1], 'cheapest')
+        if not success:
+            self.skipTest("Not enough free rooms in database")
+        self.assertEqual(sorted(r['party_size'] for r in allocation['rooms']), [1, 2, 2])
+        self.assertEqual(len({r['room_id'] for r in allocation['rooms']}), 3)
+        
+        for objective in ('same_floor', 'nearest'):
+            success, other, _ = GroupAllocator.allocate(check_in, check_out, [2, 2, 1], objective)
+            if success:
+                self.assertGreaterEqual(other['total_price'], allocation['total_price'])
+        success, same_floor, _ = GroupAllocator.allocate(check_in, check_out, [2, 2, 1], 'same_floor')
+        if success:
+            self.assertEqual(len(same_floor['floors']), 1)
+        
+        self.assertFalse(GroupAllocator.allocate(check_in, check_out, [1] * 51)[0])
+    
+    def test_room_assignment_optimizer(self):
+        """Test repacking closes a one-night gap and leaves locked, checked-in and maintenance rooms alone."""
+        from backend.booking.room_assignment_optimizer import RoomAssignmentOptimizer
+        from backend.room.inventory_manager import InventoryManager
+        from backend.room.room_block_manager import RoomBlockManager
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Room, Booking, User, AuditLog
+        from sqlalchemy import func
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            room_type = session.query(Room.room_type).filter_by(status='available').group_by(Room.room_type).having(
+                func.count(Room.room_id) >= 2
+            ).order_by(Room.room_type).limit(1).scalar()
+            user = session.query(User).first()
+            if room_type is None or user is None:
+                self.skipTest("Need two available rooms of one type and a user")
+            room_a, room_b = [r.room_id for r in session.query(Room).filter_by(room_type=room_type, status='available')
+                              .order_by(Room.room_number).limit(2).all()]
+            user_id = user.user_id
+        
+        # Far enough ahead that no seeded booking overlaps
+        start = datetime(datetime.now().year + 6, 1, 5)
+        stay = lambda day, nights: (start + timedelta(days=day, hours=14), start + timedelta(days=day + nights, hours=11))
+        layout = {'OPTTEST-A1': (room_a, stay(0, 2)), 'OPTTEST-B1': (room_b, stay(2, 1)), 'OPTTEST-A2': (room_a, stay(3, 2))}
+        with get_db_session() as session:
+            ids = {}
+            for reference, (room_id, (check_in, check_out)) in layout.items():
+                booking = Booking(user_id=user_id, room_id=room_id, check_in_date=check_in, check_out_date=check_out,
+                                  num_guests=1, total_amount=100.0, booking_status='confirmed',
+                                  booking_reference=reference)
+                session.add(booking)
+                session.flush()
+                ids[reference] = booking.booking_id
+        
+        def rooms_now():
+            with get_db_session() as session:
+                return dict(session.query(Booking.booking_reference, Booking.room_id).filter(
+                    Booking.booking_id.in_(list(ids.values()))
+                ).all())
+        
+        block_id = None
+        try:
+            # Best fit puts the one-night stay into room A's gap
+            plan = RoomAssignmentOptimizer.plan(start.date(), 30, [room_type])
+            summary = plan['room_types'][0]
+            self.assertEqual(summary['before']['orphan_nights'], 1)
+            self.assertEqual(summary['after']['orphan_nights'], 0)
+            self.assertEqual([(m['booking_reference'], m['to_room_id']) for m in plan['moves']], [('OPTTEST-B1', room_a)])
+            self.assertEqual(rooms_now()['OPTTEST-B1'], room_b)  # dry run
+            
+            # Nothing moves into a room in maintenance, not even from a plan made before
+            self.assertTrue(InventoryManager.update_room_status(room_a, 'maintenance')[0])
+            self.assertEqual(RoomAssignmentOptimizer.plan(start.date(), 30, [room_type])['moves'], [])
+            self.assertFalse(RoomAssignmentOptimizer.apply_plan(plan['moves'])[0])
+            self.assertEqual(rooms_now()['OPTTEST-B1'], room_b)
+            self.assertTrue(InventoryManager.update_room_status(room_a, 'available')[0])
+            
+            # Locking B1 packs A2 behind it instead; a checked-in A1 stays put
+            self.assertTrue(RoomAssignmentOptimizer.lock_assignment(ids['OPTTEST-B1'], reason="Requested")[0])
+            self.assertFalse(RoomAssignmentOptimizer.lock_assignment(ids['OPTTEST-B1'])[0])
+            with get_db_session() as session:
+                session.query(Booking).filter_by(booking_id=ids['OPTTEST-A1']).update({Booking.actual_check_in: start})
+            plan = RoomAssignmentOptimizer.plan(start.date(), 30, [room_type])
+            self.assertEqual([(m['booking_reference'], m['to_room_id']) for m in plan['moves']], [('OPTTEST-A2', room_b)])
+            
+            success, moved, _ = RoomAssignmentOptimizer.apply_plan(plan['moves'])
+            self.assertTrue(success)
+            self.assertEqual(moved, 1)
+            self.assertEqual(rooms_now(), {'OPTTEST-A1': room_a, 'OPTTEST-B1': room_b, 'OPTTEST-A2': room_b})
+            self.assertEqual(RoomAssignmentOptimizer.plan(start.date(), 30, [room_type])['moves'], [])
+            
+            # A stale plan is rejected as a whole
+            success, moved, _ = RoomAssignmentOptimizer.apply_plan(plan['moves'])
+            self.assertFalse(success)
+            self.assertEqual(moved, 0)
+            self.assertTrue(RoomAssignmentOptimizer.unlock_assignment(ids['OPTTEST-B1'])[0])
+            
+            # Moves onto a blocked room are rejected
+            success, block_id, _ = RoomBlockManager.create_block(room_a, *stay(2, 1), "Repainting")
+            self.assertTrue(success)
+            clash = [dict(plan['moves'][0], from_room_id=room_b, to_room_id=room_a, booking_id=ids['OPTTEST-B1'])]
+            self.assertFalse(RoomAssignmentOptimizer.apply_plan(clash)[0])
+            self.assertEqual(rooms_now()['OPTTEST-B1'], room_b)
+        finally:
+            InventoryManager.update_room_status(room_a, 'available')
+            if block_id is not None:
+                RoomBlockManager.delete_block(block_id)
+            with get_db_session() as session:
+                for booking in session.query(Booking).filter(Booking.booking_id.in_(list(ids.values()))).all():
+                    session.delete(booking)
+                session.query(AuditLog).filter(
+                    AuditLog.action_type == 'booking_room_reassign',
+                    AuditLog.description.like('Booking OPTTEST-%')
+                ).delete(synchronize_session=False)
+    
+    def test_room_status_board(self):
+        """Test status counts and change feed follow room status updates."""
+        from backend.room.inventory_manager import InventoryManager
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Room
+        from sqlalchemy import func
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            room = session.query(Room).filter_by(status='available').first()
+            if room is None:
+                self.skipTest("No available rooms in database")
+            room_id = room.room_id
+        
+        before = InventoryManager.get_inventory_summary()
+        since = InventoryManager.get_latest_seq()
+        
+        try:
+            success, _ = InventoryManager.update_room_status(room_id, 'maintenance')
+            self.assertTrue(success)
+            
+            after = InventoryManager.get_inventory_summary()
+            self.assertEqual(after['available'], before['available'] - 1)
+            self.assertEqual(after['maintenance'], before['maintenance'] + 1)
+            self.assertEqual(after['total'], before['total'])
+            
+            with get_db_session() as session:
+                counts = dict(session.query(Room.status, func.count(Room.room_id)).group_by(Room.status).all())
+            self.assertEqual(after['maintenance'], counts.get('maintenance', 0))
+            
+            board = InventoryManager.get_status_board(since_seq=since)
+            self.assertEqual([(c['room_id'], c['old_status'], c['new_status']) for c in board['changes']],
+                             [(room_id, 'available', 'maintenance')])
+            self.assertEqual(InventoryManager.get_status_changes(board['last_seq'])['changes'], [])
+        finally:
+            InventoryManager.update_room_status(room_id, 'available')
+    
+    def test_room_blocks(self):
+        """Test a room block makes the room unavailable only for the nights between its dates."""
+        import config
+        from backend.booking.availability_checker import AvailabilityChecker
+        from backend.booking.availability_calendar import AvailabilityCalendar
+        from backend.booking.advanced_filters import AdvancedFilter
+        from backend.room.room_block_manager import RoomBlockManager
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Room, User, Booking
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            room = session.query(Room).filter_by(status='available').first()
+            user = session.query(User).first()
+            if room is None or user is None:
+                self.skipTest("No available rooms or users in database")
+            room_id, user_id = room.room_id, user.user_id
+        
+        # Far enough ahead that no seeded booking overlaps
+        start = datetime(datetime.now().year + 5, 3, 10)
+        end = start + timedelta(days=3)
+        
+        def stay(first, last):
+            return first.replace(hour=config.CHECK_IN_HOUR), last.replace(hour=config.CHECK_OUT_HOUR)
+        
+        success, _, _ = RoomBlockManager.create_block(room_id, end, start, "Invalid")
+        self.assertFalse(success)
+        
+        searched = AdvancedFilter.search_page(*stay(start, end), 1, page_size=10000)['rooms']
+        # A guest leaving on the block's first morning does not stop the block
+        with get_db_session() as session:
+            departing = Booking(user_id=user_id, room_id=room_id, check_in_date=stay(start - timedelta(days=3), start)[0],
+                                check_out_date=stay(start - timedelta(days=3), start)[1], num_guests=1,
+                                total_amount=300.0, booking_status='confirmed', booking_reference='BLKTEST001')
+            session.add(departing)
+            session.flush()
+            departing_id = departing.booking_id
+        
+        success, block_id, message = RoomBlockManager.create_block(room_id, start.date(), end.date(), "Repainting")
+        with get_db_session() as session:
+            session.query(Booking).filter_by(booking_id=departing_id).delete()
+        self.assertTrue(success, message)
+        try:
+            self.assertFalse(AvailabilityChecker.is_room_available(room_id, *stay(start + timedelta(days=1), end + timedelta(days=2))))
+            self.assertFalse(AvailabilityChecker.is_room_available(room_id, *stay(start - timedelta(days=2), start + timedelta(days=1))))
+            # Stays may leave on the block's first day and arrive on its last
+            self.assertTrue(AvailabilityChecker.is_room_available(room_id, *stay(end, end + timedelta(days=2))))
+            self.assertTrue(AvailabilityChecker.is_room_available(room_id, *stay(start - timedelta(days=3), start)))
+            
+            filtered = AdvancedFilter.filter_rooms(*stay(start, end))
+            self.assertNotIn(room_id, [r['room_id'] for r in filtered])
+            # The block drops the cached search for these dates
+            self.assertIn(room_id, [r['room_id'] for r in searched])
+            searched = AdvancedFilter.search_page(*stay(start, end), 1, page_size=10000)['rooms']
+            self.assertNotIn(room_id, [r['room_id'] for r in searched])
+            
+            available, conflicts = AvailabilityCalendar.get_room_availability_range(room_id, start, end)
+            self.assertFalse(available)
+            self.assertEqual([(c['status'], c['reason']) for c in conflicts], [('blocked', 'Repainting')])
+            
+            month = AvailabilityCalendar.get_month_availability(start.year, start.month)
+            days = next(r for r in month['rooms'] if r['room_id'] == room_id)['daily_status']
+            self.assertEqual(days[start.strftime('%Y-%m-%d')]['status'], 'blocked')
+            self.assertEqual(days[end.strftime('%Y-%m-%d')]['status'], 'available')
+            
+            free = AvailabilityCalendar.get_available_dates_for_room(room_id, start - timedelta(days=1), 5)
+            self.assertEqual(len(free), 2)
+        finally:
+            self.assertTrue(RoomBlockManager.delete_block(block_id)[0])
+        
+        self.assertTrue(AvailabilityChecker.is_room_available(room_id, start, end))
+    
+    def test_search_cache(self):
+        """Test search cache hits, LRU bound and date-range invalidation."""
+        from backend.booking.search_cache import SearchCache
+        from backend.room.room_catalog import room_catalog
+        
+        cache = SearchCache(max_entries=2, ttl=0)
+        calls = []
+        
+        def search():
+            calls.append(1)
+            return (1, 2, 3)
+        
+        march = SearchCache.make_key(datetime(2030, 3, 1), datetime(2030, 3, 4), 2, amenities=['TV', 'WiFi'])
+        same = SearchCache.make_key(datetime(2030, 3, 1), datetime(2030, 3, 4), 2, amenities=['WiFi', 'TV'])
+        june = SearchCache.make_key(datetime(2030, 6, 1), datetime(2030, 6, 4), 2)
+        self.assertEqual(march, same)
+        
+        cache.get_or_search(march, search)
+        self.assertEqual(cache.get_or_search(same, search), (1, 2, 3))
+        cache.get_or_search(june, search)
+        self.assertEqual(len(calls), 2)
+        
+        # A booking ending on check-in day leaves March cached; an overlapping one drops it
+        cache.invalidate_range(datetime(2030, 2, 25), datetime(2030, 3, 1))
+        cache.get_or_search(march, search)
+        self.assertEqual(len(calls), 2)
+        cache.invalidate_range(datetime(2030, 3, 3), datetime(2030, 3, 5))
+        cache.get_or_search(march, search)
+        cache.get_or_search(june, search)
+        self.assertEqual(len(calls), 3)
+        
+        # Room writes retire every entry through the catalog version
+        room_catalog.invalidate()
+        cache.get_or_search(june, search)
+        self.assertEqual(len(calls), 4)
+        
+        cache.get_or_search(SearchCache.make_key(datetime(2030, 9, 1), datetime(2030, 9, 2), 1), search)
+        stats = cache.get_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evicted'], 1)
+        self.assertEqual(stats['hits'], 3)
+        self.assertEqual(stats['misses'], 5)
+        self.assertEqual(stats['hit_rate'], 37.5)
+    
+    def test_housekeeping_queue(self):
+        """Test cleaning rooms are served by next arrival and flipped back in bulk."""
+        from backend.room.housekeeping_queue import HousekeepingQueue
+        from backend.room.inventory_manager import InventoryManager
+        from database.db_manager import DatabaseManager, get_db_session
+        from database.models import Room, Booking, User
+        
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            rooms = session.query(Room.room_id).filter_by(status='available').order_by(Room.room_id).limit(2).all()
+            user = session.query(User.user_id).first()
+            if len(rooms) < 2 or user is None:
+                self.skipTest("Need two available rooms and a user")
+            later_id, sooner_id = rooms[0].room_id, rooms[1].room_id
+            
+            # Only the second room has a guest arriving tomorrow
+            arrival = datetime.now().replace(microsecond=0) + timedelta(days=1)
+            booking = Booking(user_id=user.user_id, room_id=sooner_id, booking_reference='TESTHK0001',
+                              check_in_date=arrival, check_out_date=arrival + timedelta(days=1),
+                              num_guests=1, total_amount=100.0, booking_status='confirmed')
+            session.add(booking)
+            session.flush()
+            booking_id = booking.booking_id
+        
+        queue = HousekeepingQueue(arrival_refresh=0)
+        queue.sync()
+        try:
+            InventoryManager.bulk_update_status([later_id, sooner_id], 'cleaning')
+            
+            waiting = [r['room_id'] for r in queue.get_queue()['queue']]
+            self.assertLess(waiting.index(sooner_id), waiting.index(later_id))
+            
+            claimed = queue.claim_next(staff_id=1)
+            self.assertEqual(claimed['room_id'], sooner_id)
+            self.assertNotIn(sooner_id, [r['room_id'] for r in queue.get_queue()['queue']])
+            
+            success, count, _ = queue.complete([later_id, sooner_id])
+            self.assertTrue(success)
+            self.assertEqual(count, 2)
+            remaining = queue.get_queue()
+            self.assertFalse({later_id, sooner_id} & {r['room_id'] for r in remaining['queue'] + remaining['claimed']})
+            with get_db_session() as session:
+                statuses = {r.status for r in session.query(Room).filter(Room.room_id.in_([later_id, sooner_id]))}
+            self.assertEqual(statuses, {'available'})
+        finally:
+            InventoryManager.bulk_update_status([later_id, sooner_id], 'available')
+            with get_db_session() as session:
+                session.query(Booking).filter_by(booking_id=booking_id).delete()
 
 
 if __name__ == '__main__':
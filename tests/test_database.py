@@ -27,6 +27,147 @@ class TestDatabase(unittest.TestCase):
         self.assertIsInstance(count, int)
         self.assertGreaterEqual(count, 0)
 
+    
+    def test_buffered_audit_writer(self):
+        """Test audit entries are written in batches."""
+        from database.audit_writer import AuditLogWriter
+        from database.db_manager import get_db_session
+        from database.models import AuditLog
+        
+        writer = AuditLogWriter(batch_size=2, flush_interval=60)
+        for i in range(3):
+            writer.submit(None, 'test_audit_batch', f'Entry {i}')
+        writer.close()
+        
+        self.assertEqual(writer.stats['written'], 3)
+        self.assertEqual(writer.pending(), 0)
+        
+        with get_db_session() as session:
+            count = session.query(AuditLog).filter_by(action_type='test_audit_batch').delete()
+        self.assertEqual(count, 3)
+
+    
+    def test_audit_archive_roundtrip(self):
+        """Test old audit entries move to the archive and stay queryable."""
+        import tempfile
+        from datetime import datetime
+        from database.audit_archive import AuditArchive
+        from database.db_manager import get_db_session
+        from database.models import AuditLog
+        
+        with get_db_session() as session:
+            for day in (5, 20):
+                session.add(AuditLog(action_type='test_archive', description='old',
+                                     timestamp=datetime(2000, 1, day)))
+            session.add(AuditLog(action_type='test_archive', description='old',
+                                 timestamp=datetime(2000, 2, 1)))
+        
+        with tempfile.TemporaryDirectory() as archive_dir:
+            success, count, _ = AuditArchive.archive_old_entries(
+                cutoff=datetime(2000, 3, 1), chunk_size=2, archive_dir=archive_dir
+            )
+            self.assertTrue(success)
+            self.assertEqual(count, 3)
+            self.assertEqual(AuditArchive.get_archive_months(archive_dir), [(2000, 1), (2000, 2)])
+            
+            with get_db_session() as session:
+                self.assertEqual(session.query(AuditLog).filter_by(action_type='test_archive').count(), 0)
+            
+            entries = AuditArchive.query_logs(datetime(2000, 1, 10), datetime(2000, 3, 1),
+                                              action_type='test_archive', archive_dir=archive_dir)
+            self.assertEqual([e['timestamp'] for e in entries], [datetime(2000, 2, 1), datetime(2000, 1, 20)])
+    
+    def test_audit_archive_keeps_entries_with_reused_ids(self):
+        """Test archived entries survive new hot rows that reuse their log_ids."""
+        import tempfile
+        from datetime import datetime
+        from sqlalchemy.schema import CreateTable
+        from database.audit_archive import AuditArchive
+        from database.db_manager import get_db_session
+        from database.models import AuditLog, engine
+        
+        self.assertIn('AUTOINCREMENT', str(CreateTable(AuditLog.__table__).compile(engine)))
+        
+        with get_db_session() as session:
+            old = [AuditLog(action_type='test_archive_reuse', description='old',
+                            timestamp=datetime(2001, 1, day)) for day in (1, 2, 3)]
+            session.add_all(old)
+            session.flush()
+            reused_ids = [entry.log_id for entry in old]
+        
+        with tempfile.TemporaryDirectory() as archive_dir:
+            success, count, _ = AuditArchive.archive_old_entries(
+                cutoff=datetime(2001, 1, 10), archive_dir=archive_dir
+            )
+            self.assertTrue(success)
+            self.assertGreaterEqual(count, 3)
+            
+            # Tables created without AUTOINCREMENT hand the freed ids out again
+            with get_db_session() as session:
+                session.add_all([AuditLog(log_id=log_id, action_type='test_archive_reuse', description='new',
+                                          timestamp=datetime(2001, 1, 5 + i)) for i, log_id in enumerate(reused_ids)])
+            
+            try:
+                entries = AuditArchive.query_logs(datetime(2001, 1, 1), datetime(2001, 2, 1),
+                                                  action_type='test_archive_reuse', archive_dir=archive_dir)
+                self.assertEqual([e['description'] for e in entries], ['new'] * 3 + ['old'] * 3)
+            finally:
+                with get_db_session() as session:
+                    session.query(AuditLog).filter_by(action_type='test_archive_reuse').delete()
+
+    
+    def test_synthetic_data_generator(self):
+        """Test generated data is deterministic, overlap-free and has its summaries built."""
+        import os
+        import sqlite3
+        import subprocess
+        import sys
+        import tempfile
+        
+        def generate(path):
+            env = dict(os.environ, DATABASE_PATH=path)
+            subprocess.run([sys.executable, '-m', 'database.synthetic_data', '--rooms', '40', '--bookings', '2000',
+                            '--seed', '7'], env=env, check=True, capture_output=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+            return sqlite3.connect(path)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            first, second = generate(os.path.join(tmp, 'a.db')), generate(os.path.join(tmp, 'b.db'))
+            try:
+                stays = "SELECT room_id, check_in_date, check_out_date, booking_status, total_amount FROM bookings ORDER BY booking_id"
+                self.assertEqual(first.execute(stays).fetchall(), second.execute(stays).fetchall())
+                self.assertGreater(first.execute("SELECT COUNT(*) FROM bookings").fetchone()[0], 1500)
+                
+                overlaps = first.execute(
+                    "SELECT COUNT(*) FROM bookings a JOIN bookings b ON a.room_id = b.room_id "
+                    "AND a.booking_id < b.booking_id AND a.check_in_date < b.check_out_date "
+                    "AND a.check_out_date > b.check_in_date "
+                    "WHERE a.booking_status != 'cancelled' AND b.booking_status != 'cancelled'"
+                ).fetchone()[0]
+                self.assertEqual(overlaps, 0)
+                
+                statuses = dict(first.execute("SELECT booking_status, COUNT(*) FROM bookings GROUP BY booking_status"))
+                self.assertTrue({'completed', 'confirmed', 'cancelled'} <= set(statuses))
+                self.assertEqual(
+                    first.execute("SELECT COUNT(*) FROM payments").fetchone()[0],
+                    sum(count for status, count in statuses.items() if status != 'pending')
+                )
+                
+                # Summary tables match their sources
+                self.assertEqual(
+                    first.execute("SELECT SUM(review_count) FROM room_rating_summaries").fetchone()[0],
+                    first.execute("SELECT COUNT(*) FROM reviews WHERE status = 'approved'").fetchone()[0]
+                )
+                self.assertEqual(
+                    first.execute("SELECT SUM(completed_bookings) FROM user_stats_summaries").fetchone()[0],
+                    statuses['completed']
+                )
+                self.assertEqual(first.execute("SELECT SUM(room_count) FROM room_status_counts").fetchone()[0], 40)
+                self.assertGreater(first.execute("SELECT SUM(sold) FROM room_type_night_counts").fetchone()[0], 0)
+            finally:
+                first.close()
+                second.close()
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the admin guest directory.
+"""
+
+import unittest
+from datetime import datetime
+from database.db_manager import DatabaseManager, get_db_session
+from database.models import User, Room, Booking
+from backend.user.user_manager import UserManager
+
+
+class TestGuestDirectory(unittest.TestCase):
+    """Test guest directory paging, search and stats."""
+    
+    def setUp(self):
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            # Pairs of users share a created_at so the user_id tiebreaker is exercised
+            users = [User(email=f'gd.test{i}@zq-example.com', password_hash='x',
+                          first_name=f'Guest{i}', last_name='Zquillion',
+                          account_status='active' if i % 3 else 'suspended',
+                          passport_number='P123' if i < 2 else None,
+                          created_at=datetime(2001, 5, 1 + i // 2))
+                     for i in range(7)]
+            session.add_all(users)
+            session.flush()
+            self.user_ids = [u.user_id for u in users]
+            room = session.query(Room.room_id).order_by(Room.room_id).first()
+            self.room_id = room.room_id if room else None
+    
+    def tearDown(self):
+        with get_db_session() as session:
+            session.query(Booking).filter(Booking.user_id.in_(self.user_ids)).delete(synchronize_session=False)
+            session.query(User).filter(User.user_id.in_(self.user_ids)).delete(synchronize_session=False)
+    
+    def _all_pages(self, search, page_size=3):
+        seen, cursor = [], None
+        while True:
+            page = UserManager.get_guest_directory(search=search, cursor=cursor, page_size=page_size)
+            seen += [u['user_id'] for u in page['users']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                return seen
+    
+    def test_directory_pages_are_continuous(self):
+        """Test keyset pages cover every match once, newest first."""
+        expected = sorted(self.user_ids, key=lambda user_id: (-(self.user_ids.index(user_id) // 2), -user_id))
+        self.assertEqual(self._all_pages('Zquillion'), expected)
+        self.assertEqual(self._all_pages('Zquillion', page_size=7), expected)
+    
+    def test_directory_search(self):
+        """Test name search (prefix, via users_fts) and email prefix search."""
+        self.assertEqual(len(self._all_pages('zquill')), 7)
+        self.assertEqual(self._all_pages('Guest3 Zquillion'), [self.user_ids[3]])
+        self.assertEqual(self._all_pages('gd.test5@zq'), [self.user_ids[5]])
+        self.assertEqual(self._all_pages('GD.TEST5@ZQ-EXAMPLE.COM'), [self.user_ids[5]])
+        self.assertEqual(self._all_pages('gd.test9@zq'), [])
+        
+        # The FTS triggers follow renames and deletes
+        with get_db_session() as session:
+            session.query(User).filter_by(user_id=self.user_ids[0]).update({'last_name': 'Xandrow'})
+        self.assertEqual(self._all_pages('Xandrow'), [self.user_ids[0]])
+        self.assertEqual(len(self._all_pages('Zquillion')), 6)
+        
+        with get_db_session() as session:
+            session.query(User).filter_by(user_id=self.user_ids[0]).delete()
+        self.assertEqual(self._all_pages('Xandrow'), [])
+    
+    def test_directory_stats_after_booking(self):
+        """Test grouped stats and per-guest booking figures include a new booking."""
+        stats = UserManager.get_guest_directory_stats('Zquillion')
+        self.assertEqual(stats, {'total_users': 7, 'active_users': 4, 'users_with_id': 2, 'total_bookings': 0})
+        
+        if self.room_id is None:
+            self.skipTest("No rooms in database")
+        with get_db_session() as session:
+            session.add(Booking(user_id=self.user_ids[4], room_id=self.room_id,
+                                check_in_date=datetime(2001, 6, 1, 14), check_out_date=datetime(2001, 6, 3, 11),
+                                num_guests=1, total_amount=250.0, booking_status='completed',
+                                booking_reference='GDTEST001'))
+        
+        self.assertEqual(UserManager.get_guest_directory_stats('Zquillion')['total_bookings'], 1)
+        self.assertEqual(UserManager.get_guest_directory_stats('Guest1')['total_bookings'], 0)
+        guest = UserManager.get_guest_directory(search='Guest4')['users'][0]
+        self.assertEqual((guest['booking_count'], guest['total_spent']), (1, 250.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Tests for the loyalty points ledger.
+"""
+
+import unittest
+import threading
+from datetime import datetime, timedelta
+from database.db_manager import DatabaseManager, get_db_session
+from database.models import User, LoyaltyLedgerEntry
+from backend.user.loyalty_program import LoyaltyProgram
+
+
+class TestLoyalty(unittest.TestCase):
+    """Test loyalty ledger functions."""
+    
+    def setUp(self):
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            user = User(email='loyalty.test@example.com', password_hash='x',
+                        first_name='Loyalty', last_name='Test', loyalty_points=0)
+            session.add(user)
+            session.flush()
+            self.user_id = user.user_id
+    
+    def tearDown(self):
+        with get_db_session() as session:
+            session.query(LoyaltyLedgerEntry).filter_by(user_id=self.user_id).delete()
+            session.query(User).filter_by(user_id=self.user_id).delete()
+    
+    def _ledger_sum(self):
+        with get_db_session() as session:
+            return sum(e.points for e in session.query(LoyaltyLedgerEntry).filter_by(user_id=self.user_id))
+    
+    def test_concurrent_redemptions(self):
+        """Test parallel redemptions never overdraw or lose updates."""
+        LoyaltyProgram.add_points(self.user_id, 100)
+        results = []
+        lock = threading.Lock()
+        
+        def redeemer():
+            for _ in range(5):
+                success, _, message = LoyaltyProgram.redeem_points(self.user_id, 5)
+                with lock:
+                    results.append((success, message))
+        
+        def earner():
+            for _ in range(10):
+                success, message = LoyaltyProgram.add_points(self.user_id, 1)
+                with lock:
+                    results.append((success, message))
+        
+        threads = [threading.Thread(target=redeemer) for _ in range(16)]
+        threads += [threading.Thread(target=earner) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        errors = [m for ok, m in results if not ok and m != "Insufficient points"]
+        self.assertEqual(errors, [])
+        
+        redeemed = sum(1 for ok, m in results if ok and m.startswith("Redeemed"))
+        balance = LoyaltyProgram.get_points_balance(self.user_id)
+        self.assertGreaterEqual(redeemed, 20)
+        self.assertEqual(balance, 100 + 40 - 5 * redeemed)
+        self.assertGreaterEqual(balance, 0)
+        self.assertEqual(balance, self._ledger_sum())
+    
+    def test_expiry(self):
+        """Test only unredeemed points expire."""
+        LoyaltyProgram.add_points(self.user_id, 50)
+        LoyaltyProgram.redeem_points(self.user_id, 20)
+        
+        success, expired, _ = LoyaltyProgram.expire_points(now=datetime.utcnow() + timedelta(days=400))
+        self.assertTrue(success)
+        self.assertEqual(expired, 30)
+        self.assertEqual(LoyaltyProgram.get_points_balance(self.user_id), 0)
+        self.assertEqual(self._ledger_sum(), 0)
+
+    def _set_cached_balance(self, points):
+        with get_db_session() as session:
+            session.query(User).filter_by(user_id=self.user_id).update({'loyalty_points': points})
+
+    def test_reconcile_after_activity(self):
+        """Test a balance from before the ledger survives activity followed by a reconcile."""
+        self._set_cached_balance(500)
+        success, _, _ = LoyaltyProgram.redeem_points(self.user_id, 100)
+        self.assertTrue(success)
+        self.assertEqual(self._ledger_sum(), 400)
+
+        self.assertTrue(LoyaltyProgram.reconcile_balances()[0])
+        self.assertEqual(LoyaltyProgram.get_points_balance(self.user_id), 400)
+
+        # With an opening entry recorded, drift in the cache is corrected
+        self._set_cached_balance(999)
+        self.assertTrue(LoyaltyProgram.reconcile_balances()[0])
+        self.assertEqual(LoyaltyProgram.get_points_balance(self.user_id), 400)
+
+    def test_reconcile_keeps_balance_of_ledger_without_opening(self):
+        """Test ledger rows written without an opening entry keep the cached balance."""
+        self._set_cached_balance(400)
+        with get_db_session() as session:
+            session.add(LoyaltyLedgerEntry(user_id=self.user_id, entry_type='redeem', points=-100))
+
+        self.assertTrue(LoyaltyProgram.reconcile_balances()[0])
+        self.assertEqual(LoyaltyProgram.get_points_balance(self.user_id), 400)
+        self.assertEqual(self._ledger_sum(), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
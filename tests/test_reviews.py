@@ -0,0 +1,125 @@
+"""
+Tests for reviews and room rating summaries.
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from database.db_manager import DatabaseManager, get_db_session
+from database.models import User, Room, Booking, Review, RoomRatingSummary
+from backend.user.review_manager import ReviewManager
+
+
+class TestReviews(unittest.TestCase):
+    """Test review functions."""
+    
+    def setUp(self):
+        DatabaseManager.setup_database()
+        with get_db_session() as session:
+            user = User(email='review.test@example.com', password_hash='x',
+                        first_name='Review', last_name='Test')
+            room = Room(room_number='RVTEST', room_type='Double', capacity=2,
+                        base_price_per_night=100.0, status='available')
+            session.add_all([user, room])
+            session.flush()
+            self.user_id, self.room_id = user.user_id, room.room_id
+            
+            stay = datetime(2001, 3, 1, 14)
+            bookings = [Booking(user_id=self.user_id, room_id=self.room_id, check_in_date=stay,
+                                check_out_date=stay + timedelta(days=1), num_guests=1, total_amount=100.0,
+                                booking_status='completed', booking_reference=f'RVTEST{i:03d}')
+                        for i in range(12)]
+            session.add_all(bookings)
+            session.flush()
+            self.booking_ids = [b.booking_id for b in bookings]
+    
+    def tearDown(self):
+        with get_db_session() as session:
+            session.query(Review).filter_by(room_id=self.room_id).delete()
+            session.query(RoomRatingSummary).filter_by(room_id=self.room_id).delete()
+            session.query(Booking).filter_by(room_id=self.room_id).delete()
+            session.query(Room).filter_by(room_id=self.room_id).delete()
+            session.query(User).filter_by(user_id=self.user_id).delete()
+    
+    def _review(self, booking_id, rating):
+        success, message = ReviewManager.create_review(self.user_id, self.room_id, booking_id, rating, "Test stay")
+        self.assertTrue(success, message)
+    
+    def test_rating_summary_maintenance(self):
+        """Test the room summary follows new and moderated reviews and matches a rebuild."""
+        for booking_id, rating in zip(self.booking_ids, (5, 4, 4)):
+            self._review(booking_id, rating)
+        
+        rating = ReviewManager.get_ratings_for_rooms([self.room_id])[self.room_id]
+        self.assertEqual(rating, {'average': 4.3, 'count': 3, 'histogram': {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}})
+        
+        with get_db_session() as session:
+            review_id = session.query(Review.review_id).filter_by(booking_id=self.booking_ids[0]).scalar()
+        ReviewManager.moderate_review(review_id, 'rejected')
+        self.assertEqual(ReviewManager.get_average_rating(self.room_id), 4.0)
+        ReviewManager.moderate_review(review_id, 'approved')
+        incremental = ReviewManager.get_ratings_for_rooms([self.room_id])[self.room_id]
+        
+        with get_db_session() as session:
+            ReviewManager._rebuild_summaries(session, [self.room_id])
+        self.assertEqual(ReviewManager.get_ratings_for_rooms([self.room_id])[self.room_id], incremental)
+        self.assertEqual(incremental['count'], 3)
+    
+    def test_create_review_requires_whole_star_rating(self):
+        """Test ratings must be whole numbers from 1 to 5."""
+        for rating in (4.0, 0, 6, '4', True):
+            success, _ = ReviewManager.create_review(self.user_id, self.room_id, self.booking_ids[0], rating, "")
+            self.assertFalse(success, rating)
+        self._review(self.booking_ids[0], 4)
+    
+    def test_ratings_for_rooms_read_only(self):
+        """Test rooms without a summary row are aggregated without writing one."""
+        self._review(self.booking_ids[0], 2)
+        self._review(self.booking_ids[1], 5)
+        with get_db_session() as session:
+            session.query(RoomRatingSummary).filter_by(room_id=self.room_id).delete()
+        
+        rating = ReviewManager.get_ratings_for_rooms([self.room_id])[self.room_id]
+        self.assertEqual((rating['average'], rating['count']), (3.5, 2))
+        with get_db_session() as session:
+            self.assertIsNone(session.get(RoomRatingSummary, self.room_id))
+        
+        success, _ = ReviewManager.rebuild_rating_summaries()
+        self.assertTrue(success)
+        with get_db_session() as session:
+            self.assertEqual(session.get(RoomRatingSummary, self.room_id).review_count, 2)
+    
+    def test_review_feed_keyset_pages(self):
+        """Test every feed sort pages through tied dates and ratings without skips or duplicates."""
+        dates = [datetime(2001, 3, 5), datetime(2001, 3, 6)]
+        with get_db_session() as session:
+            reviews = [Review(user_id=self.user_id, room_id=self.room_id, booking_id=booking_id,
+                              rating=(3, 5)[i % 2] if i < 10 else 1, comment=f"Review {i}",
+                              review_date=dates[i % 3 == 0], status='approved' if i != 11 else 'pending')
+                       for i, booking_id in enumerate(self.booking_ids)]
+            session.add_all(reviews)
+            session.flush()
+            rows = [(r.review_id, r.rating, r.review_date, r.status) for r in reviews]
+        
+        expected_orders = {
+            'newest': lambda r: (-r[2].toordinal(), -r[0]),
+            'highest': lambda r: (-r[1], -r[2].toordinal(), -r[0]),
+            'lowest': lambda r: (r[1], -r[2].toordinal(), -r[0]),
+        }
+        for status in ('approved', None):
+            for sort_by, key in expected_orders.items():
+                expected = [r[0] for r in sorted(rows, key=key) if status is None or r[3] == status]
+                seen, cursor, pages = [], None, 0
+                while True:
+                    page = ReviewManager.get_review_feed(status=status, room_id=self.room_id, sort_by=sort_by,
+                                                         cursor=cursor, page_size=4)
+                    seen += [r['review_id'] for r in page['reviews']]
+                    pages += 1
+                    cursor = page['next_cursor']
+                    if cursor is None:
+                        break
+                self.assertEqual(seen, expected, (status, sort_by))
+                self.assertEqual(pages, -(-len(expected) // 4))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -771,6 +771,25 @@ class SolivieUI:
         </div>
         """, unsafe_allow_html=True)
     
+    @staticmethod
+    def keyset_pager(state_key, next_cursor, key_prefix):
+        """Previous/Next buttons over a stack of keyset cursors in session state"""
+        cursors = st.session_state[state_key]
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        
+        with col_prev:
+            if st.button("⬅️ Previous", disabled=len(cursors) == 1, use_container_width=True, key=f"{key_prefix}_prev"):
+                cursors.pop()
+                st.rerun()
+        
+        with col_page:
+            st.markdown(f"<p style='color: #9BA8A5; text-align: center;'>Page {len(cursors)}</p>", unsafe_allow_html=True)
+        
+        with col_next:
+            if st.button("Next ➡️", disabled=next_cursor is None, use_container_width=True, key=f"{key_prefix}_next"):
+                cursors.append(next_cursor)
+                st.rerun()
+    
     @staticmethod
     def footer():
         """Dark luxury footer"""